@@ -0,0 +1,176 @@
+from array import array
+import pygame
+from config import *
+from fonts import get_font
+from layout import SCALE, ss
+
+# ==========================================
+#   LIVE STATISTICS
+# ==========================================
+# Session totals per player (0 = P1, 1 = P2) and mole hole, kept in flat
+# fixed-size arrays indexed [player * 9 + hole]. Every packet costs a few
+# array increments; nothing grows during a session.
+#
+# WAM:   spawns, hits, misses per hole (a miss is counted on the mole that
+#        was up: wrong key or timeout) and the summed spawn-to-hit time,
+#        measured in Remaining_Time ticks so link jitter doesn't count.
+# REACT: locks, summed distance to the target and exact hits per player.
+
+def _active_index(s1, s2):
+    return 0 if s1 == '1' else 1 if s2 == '1' else None
+
+class LiveStats:
+    """Packet listener accumulating WAM/REACT statistics."""
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.spawns = array('I', [0] * 18)
+        self.hits = array('I', [0] * 18)
+        self.misses = array('I', [0] * 18)
+        self.hit_time = array('d', [0.0] * 18)    # Seconds, spawn -> hit
+        self.spawned_at = array('l', [-1] * 9)    # Remaining_Time at spawn, -1 = no mole
+        self.locks = array('I', [0, 0])
+        self.distance = array('d', [0.0, 0.0])
+        self.exact = array('I', [0, 0])
+        self.version = 0     # Bumped on every change; the overlay redraws on a new version
+        self.prev = None     # Previous packet of the same scene
+        self.scene = None
+
+    def on_packet(self, scene, data):
+        prev = self.prev if scene == self.scene else None
+        self.scene, self.prev = scene, data
+        try:
+            if scene == "WAM" and len(data) >= 18: self._wam(prev, data)
+            elif scene == "REACT" and len(data) >= 9: self._react(prev, data)
+        except ValueError:
+            pass   # Malformed packet: nothing counted
+
+    def _wam(self, prev, data):
+        p = _active_index(data[7], data[8])
+        if p is None: return
+        key = int(data[2]) if data[2].isdigit() else None
+        if data[3] == '1' and not (key is not None and 1 <= key <= 9): return   # Hit on no hole: corrupt
+        remaining = int(data[5])
+        moles, base = data[9:18], p * 9
+        old = prev[9:18] if prev and len(prev) >= 18 else ['0'] * 9
+        changed = False
+
+        for hole in range(9):
+            if moles[hole] == '1' and old[hole] != '1':
+                self.spawns[base + hole] += 1
+                self.spawned_at[hole] = remaining
+                changed = True
+
+        if data[3] == '1' and key is not None:
+            hole = key - 1
+            self.hits[base + hole] += 1
+            if self.spawned_at[hole] >= 0:
+                self.hit_time[base + hole] += (self.spawned_at[hole] - remaining) / MCU_TICK_RATE
+                self.spawned_at[hole] = -1
+            changed = True
+        elif data[4] == '1':
+            # Wrong key: the mole still up; timeout: the mole that just went down
+            up = [h for h in range(9) if moles[h] == '1']
+            gone = [h for h in range(9) if old[h] == '1' and moles[h] != '1']
+            for hole in (up if key is not None else gone):
+                self.misses[base + hole] += 1
+                if hole in gone: self.spawned_at[hole] = -1
+                changed = True
+
+        if changed: self.version += 1
+
+    def _react(self, prev, data):
+        if prev is None or len(prev) < 9: return
+        for p, idx in ((0, 7), (1, 8)):
+            if prev[idx] == '1' and data[idx] == '2':
+                dist = abs(int(data[p + 1]) - int(data[0]))
+                self.locks[p] += 1
+                self.distance[p] += dist
+                if dist == 0: self.exact[p] += 1
+                self.version += 1
+
+    # --- Queries (render thread) ---
+    def hit_rate(self, p):
+        hits = sum(self.hits[p*9:p*9+9])
+        total = hits + sum(self.misses[p*9:p*9+9])
+        return hits / total if total else None
+
+    def avg_hit_time(self, p):
+        hits = sum(self.hits[p*9:p*9+9])
+        return sum(self.hit_time[p*9:p*9+9]) / hits if hits else None
+
+    def avg_distance(self, p):
+        return self.distance[p] / self.locks[p] if self.locks[p] else None
+
+# ==========================================
+#   OVERLAY
+# ==========================================
+class StatsOverlay:
+    """
+    Per-player panels in the bottom corners: a 3x3 miss heatmap with hit
+    rate and reaction time on WAM, accuracy on REACT. Panels are
+    rasterized into a cached surface, again only when stats.version or
+    the scene changes; every other frame is two blits. They are laid out
+    at layout size and scaled to the canvas when rasterized.
+    """
+    PANEL_W, CELL = 240, 46
+    PANEL_H = {"WAM": 200, "REACT": 140}   # REACT boxes reach down to y=600
+    SCENES = ("WAM", "REACT")
+
+    def __init__(self, stats, visible=STATS_OVERLAY):
+        self.stats = stats
+        self.visible = visible
+        self.panels = None
+        self.key = None
+        self.rasterized = 0
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def draw(self, screen, scene):
+        if not self.visible or scene not in self.SCENES: return
+        key = (self.stats.version, scene)
+        if key != self.key:
+            self.panels = [self._panel(p, scene) for p in (0, 1)]
+            self.key = key
+            self.rasterized += 1
+        w, h = self.panels[0].get_size()
+        y = HEIGHT - h - ss(20)
+        screen.blit(self.panels[0], (ss(20), y))
+        screen.blit(self.panels[1], (WIDTH - w - ss(20), y))
+
+    def _panel(self, p, scene):
+        st, color = self.stats, (COLOR_P1, COLOR_P2)[p]
+        surf = pygame.Surface((self.PANEL_W, self.PANEL_H[scene]), pygame.SRCALPHA)
+        surf.fill((0, 0, 0, 140))
+        pygame.draw.rect(surf, color, surf.get_rect(), 1)
+        small, tiny = get_font("consolas", 20), get_font("consolas", 16)
+        if scene == "WAM":
+            surf.blit(small.render(f"P{p+1} MISSES", True, color), (10, 6))
+            base, c = p * 9, self.CELL
+            worst = max(max(st.misses[base:base+9]), 1)
+            for hole in range(9):
+                x, y = 10 + (hole % 3) * (c + 4), 32 + (hole // 3) * (c + 4)
+                heat = st.misses[base + hole] / worst
+                pygame.draw.rect(surf, (int(40 + 215 * heat), int(40 * (1 - heat)), 40), (x, y, c, c))
+                label = tiny.render(f"{st.hits[base + hole]}/{st.misses[base + hole]}", True, COLOR_TEXT)
+                surf.blit(label, label.get_rect(center=(x + c // 2, y + c // 2)))
+            rate, avg = st.hit_rate(p), st.avg_hit_time(p)
+            lines = [("HIT", f"{rate*100:.0f}%" if rate is not None else "--"),
+                     ("T", f"{avg:.2f}s" if avg is not None else "--")]
+            for n, (name, val) in enumerate(lines):
+                surf.blit(tiny.render(name, True, COLOR_INFO), (170, 40 + n * 50))
+                surf.blit(small.render(val, True, COLOR_TEXT), (170, 58 + n * 50))
+        else:
+            surf.blit(small.render(f"P{p+1} ACCURACY", True, color), (10, 6))
+            avg = st.avg_distance(p)
+            lines = [("LOCKS", str(st.locks[p])),
+                     ("AVG DIST", f"{avg:.1f}" if avg is not None else "--"),
+                     ("EXACT", str(st.exact[p]))]
+            for n, (name, val) in enumerate(lines):
+                surf.blit(tiny.render(name, True, COLOR_INFO), (12, 42 + n * 32))
+                surf.blit(small.render(val, True, COLOR_TEXT), (110, 40 + n * 32))
+        if SCALE != 1:
+            surf = pygame.transform.smoothscale(surf, (ss(self.PANEL_W), ss(self.PANEL_H[scene])))
+        return surf
@@ -0,0 +1,117 @@
+import pygame
+import os
+import time
+from config import *
+from logs import get_logger
+
+log = get_logger("audio")
+
+# ==========================================
+#   LOW-LATENCY AUDIO ENGINE
+# ==========================================
+class AudioEngine:
+    """
+    Sound effect playback tuned for fast game events:
+    - Mixer opened with a small buffer (AUDIO_BUFFER samples).
+    - Decoded PCM cached on disk, so MP3 decoding only happens once.
+    - Reserved channels per category (AUDIO_CATEGORIES) with a voice-stealing
+      rule, so a burst of WAM hits can't cut off REACT button clicks.
+    - Trigger statistics for report().
+    """
+    def __init__(self, frequency=AUDIO_FREQUENCY, buffer=AUDIO_BUFFER, cache_dir=AUDIO_CACHE_DIR):
+        # pygame.init() may have opened the mixer with the default (large) buffer
+        if pygame.mixer.get_init():
+            pygame.mixer.quit()
+        pygame.mixer.init(frequency=frequency, size=-16, channels=2, buffer=buffer)
+        self.frequency, self.size, self.channels = pygame.mixer.get_init()
+        self.buffer = buffer
+        self.cache_dir = cache_dir
+        self.sounds = {}
+        self.stats = {}
+
+        # Reserve channels 0..N-1 so auto-allocated play() calls never use them
+        self.pools = {}
+        total = sum(n for n, _ in AUDIO_CATEGORIES.values())
+        pygame.mixer.set_num_channels(total + 2)
+        pygame.mixer.set_reserved(total)
+        idx = 0
+        for cat, (count, rule) in AUDIO_CATEGORIES.items():
+            self.pools[cat] = {"rule": rule, "voices": [[pygame.mixer.Channel(idx + i), None, 0.0]
+                                                        for i in range(count)]}
+            idx += count
+        log.info(f"Mixer {self.frequency} Hz, buffer {buffer} "
+              f"(~{self.buffer_latency_ms():.1f} ms), {total} reserved channels")
+
+    def buffer_latency_ms(self):
+        """Output latency added by the mixer buffer itself."""
+        return self.buffer / self.frequency * 1000.0
+
+    # --- PCM Cache ---
+    def _cache_path(self, name, path):
+        mtime = int(os.path.getmtime(path))
+        tag = f"{self.frequency}_{abs(self.size)}_{self.channels}_{mtime}"
+        return os.path.join(self.cache_dir, f"{name}.{tag}.pcm")
+
+    def load(self, name, path, volume=0.5):
+        """Loads a sound, preferring cached PCM over decoding the file."""
+        cache = self._cache_path(name, path) if self.cache_dir else None
+        if cache and os.path.exists(cache):
+            with open(cache, 'rb') as f:
+                snd = pygame.mixer.Sound(buffer=f.read())
+        else:
+            snd = pygame.mixer.Sound(path)
+            if cache:
+                try:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    with open(cache + ".tmp", 'wb') as f:
+                        f.write(snd.get_raw())
+                    os.replace(cache + ".tmp", cache)
+                except OSError as e:
+                    log.warning(f"PCM cache write failed: {e}")
+        snd.set_volume(volume)
+        self.sounds[name] = snd
+        self.stats[name] = {"played": 0, "stolen": 0, "dropped": 0, "delay_ms": 0.0}
+
+    # --- Playback ---
+    def _pick_voice(self, pool, name):
+        """Returns a voice [channel, sound_name, start_time] or None (drop)."""
+        voices = pool["voices"]
+        for v in voices:
+            if not v[0].get_busy(): return v
+        if pool["rule"] == "retrigger":
+            for v in voices:
+                if v[1] == name: return v
+        if pool["rule"] == "drop":
+            return None
+        return min(voices, key=lambda v: v[2])  # 'oldest' (also retrigger fallback)
+
+    def play(self, name, trigger_time=None):
+        """
+        Plays `name` on its category's reserved channels.
+        trigger_time: time.time() of the packet that caused the sound.
+        """
+        snd = self.sounds.get(name)
+        if snd is None: return
+        stats = self.stats[name]
+        pool = self.pools[SOUND_CATEGORY.get(name, "game")]
+        voice = self._pick_voice(pool, name)
+        if voice is None:
+            stats["dropped"] += 1
+            return
+        if voice[0].get_busy(): stats["stolen"] += 1
+        voice[0].play(snd)
+        voice[1], voice[2] = name, time.perf_counter()
+        stats["played"] += 1
+        if trigger_time:
+            # Running mean of packet -> play() delay
+            delay = (time.time() - trigger_time) * 1000.0
+            stats["delay_ms"] += (delay - stats["delay_ms"]) / stats["played"]
+
+    def print_report(self):
+        """Trigger-to-output = measured packet->play() delay + mixer buffer."""
+        buf = self.buffer_latency_ms()
+        log.info(f"Trigger-to-output latency (mixer buffer {buf:.1f} ms)")
+        for name, s in self.stats.items():
+            if s["played"] or s["dropped"]:
+                log.info(f"  {name:<7} played={s['played']} stolen={s['stolen']} "
+                      f"dropped={s['dropped']} latency~{s['delay_ms'] + buf:.1f} ms")
@@ -0,0 +1,188 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from config import *
+from protocol import format_frame, FrameEncoder, SCENES, KEYFRAME_TAG, DELTA_TAG
+from simulation import SimulationEngine
+from link import FrameReader
+from workers import ingest_packet
+
+# ==========================================
+#   INGEST BENCHMARK AND FUZZ CORPUS (CLI)
+# ==========================================
+# Drives link.FrameReader, the code between ser.read() and ingest_packet(),
+# with byte streams built from simulated matches:
+#
+#   python bench_ingest.py                 # benchmark + fuzz, text report
+#   python bench_ingest.py --json out.json # same numbers, machine-readable
+#   python bench_ingest.py --write-corpus fuzz/   # keep the corrupted streams
+#
+# Benchmark: one stream per message type, plus the mixed match and its
+# keyframe/delta encoding, fed in CHUNK-byte reads (a busy UART FIFO).
+# Best of --repeat runs. Report lines keep their layout across versions:
+#
+#   bench  <case>  packets=<n>  pkt_per_s=<n>  bytes_per_s=<n>  ns_per_pkt=<n>
+#
+# Fuzz: the mixed stream is corrupted (bit flips, dropped bytes, missing or
+# partial line endings, truncated frames, oversize garbage), followed by a
+# clean tail of TAIL_FRAMES frames, and fed in random read sizes. Each case
+# passes if the whole tail comes out intact (resync), the splitter never
+# holds more than UART_MAX_FRAME bytes (bounded memory) and nothing raises:
+#
+#   fuzz   <case>  <PASS|FAIL>  frames_out=<n>  dropped_bytes=<n>  bad_scene=<n>  max_pending=<n>
+
+CHUNK = 64
+TAIL_FRAMES = 50
+
+def match_packets(count, seed=1, scenario="random"):
+    """`count` packets of simulated play (virtual clock)."""
+    packets = []
+    engine = SimulationEngine(lambda scene, data: packets.append((scene, data)), scenario, speed=0, seed=seed)
+    engine.run(max_packets=count)
+    return packets
+
+def encode(packets, delta=False):
+    if not delta:
+        return b''.join(format_frame(scene, data).encode('ascii') for scene, data in packets)
+    encoder = FrameEncoder()
+    return b''.join(encoder.encode(scene, data).encode('ascii') for scene, data in packets)
+
+def chunks(stream, size):
+    return [stream[i:i + size] for i in range(0, len(stream), size)]
+
+# ==========================================
+#   BENCHMARK
+# ==========================================
+def bench_case(packets, delta=False, repeat=5):
+    """Best-of-`repeat` throughput through FrameReader -> ingest_packet."""
+    reads = chunks(encode(packets, delta), CHUNK)
+    size = sum(map(len, reads))
+    best = None
+    for _ in range(repeat):
+        reader = FrameReader(ingest_packet)
+        t0 = time.perf_counter()
+        for read in reads:
+            reader.feed(read)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    n = len(packets)
+    return {"packets": n, "pkt_per_s": round(n / best), "bytes_per_s": round(size / best),
+            "ns_per_pkt": round(best * 1e9 / n)}
+
+def run_bench(count, seed, repeat):
+    mixed = match_packets(count, seed)
+    results = {}
+    for scene in SCENES:
+        of_type = [p for p in mixed if p[0] == scene]
+        if not of_type: continue
+        of_type = (of_type * (count // len(of_type) + 1))[:count]
+        results[scene] = bench_case(of_type, repeat=repeat)
+    results["mixed"] = bench_case(mixed, repeat=repeat)
+    results["mixed_delta"] = bench_case(mixed, delta=True, repeat=repeat)
+    return results
+
+# ==========================================
+#   FUZZ CORPUS
+# ==========================================
+def bit_flips(stream, rng, rate=0.01):
+    out = bytearray(stream)
+    for i in rng.sample(range(len(out)), int(len(out) * rate)):
+        out[i] ^= 1 << rng.randrange(8)
+    return bytes(out)
+
+def drop_bytes(stream, rng, rate=0.01):
+    drop = set(rng.sample(range(len(stream)), int(len(stream) * rate)))
+    return bytes(b for i, b in enumerate(stream) if i not in drop)
+
+def truncate_frames(stream, rng, rate=0.05):
+    out = []
+    for frame in stream.split(b'\r\n'):
+        if frame and rng.random() < rate: frame = frame[:rng.randrange(len(frame))]
+        out.append(frame)
+    return b'\r\n'.join(out)
+
+def oversize_garbage(stream, rng, blobs=20):
+    """Long runs without '*': plain noise, and noise behind a '$' (a frame that never ends)."""
+    out = bytearray(stream)
+    noise = bytes(b for b in range(256) if b not in b'*$')
+    for _ in range(blobs):
+        blob = bytes(rng.choice(noise) for _ in range(UART_MAX_FRAME * 4))
+        if rng.random() < 0.5: blob = b'$' + blob
+        pos = rng.randrange(len(out))
+        out[pos:pos] = blob
+    return bytes(out)
+
+CORRUPTIONS = {
+    "bit_flips":        lambda s, rng: bit_flips(s, rng),
+    "dropped_bytes":    lambda s, rng: drop_bytes(s, rng),
+    "no_line_endings":  lambda s, rng: s.replace(b'\r\n', b''),
+    "cr_only":          lambda s, rng: s.replace(b'\r\n', b'\r'),
+    "truncated_frames": lambda s, rng: truncate_frames(s, rng),
+    "oversize_garbage": lambda s, rng: oversize_garbage(s, rng),
+    "everything":       lambda s, rng: oversize_garbage(truncate_frames(drop_bytes(bit_flips(s, rng), rng), rng), rng),
+}
+
+def fuzz_case(name, stream, tail, rng, corpus_dir=None):
+    corrupted = CORRUPTIONS[name](stream, rng)
+    if corpus_dir:
+        with open(os.path.join(corpus_dir, f"{name}.bin"), 'wb') as f:
+            f.write(corrupted)
+    out = []
+    reader = FrameReader(lambda scene, data, rx_time=None: out.append((scene, data)))
+    data = corrupted + encode(tail)
+    max_pending, pos, error = 0, 0, None
+    try:
+        while pos < len(data):
+            n = rng.randint(1, 256)
+            reader.feed(data[pos:pos + n])
+            max_pending = max(max_pending, len(reader.splitter.pending))
+            pos += n
+    except Exception as e:
+        error = e
+    resynced = out[-len(tail):] == [(scene, [str(v) for v in fields]) for scene, fields in tail]
+    bad_scene = sum(1 for scene, _ in out if scene not in SCENES and scene[:1] not in (KEYFRAME_TAG, DELTA_TAG))
+    ok = error is None and resynced and max_pending <= UART_MAX_FRAME
+    return {"pass": ok, "frames_out": len(out), "dropped_bytes": reader.splitter.dropped,
+            "bad_scene": bad_scene, "max_pending": max_pending, "error": str(error) if error else None}
+
+def run_fuzz(count, seed, corpus_dir=None):
+    rng = random.Random(seed)
+    packets = match_packets(count + TAIL_FRAMES, seed)
+    stream, tail = encode(packets[:count]), packets[count:]
+    if corpus_dir: os.makedirs(corpus_dir, exist_ok=True)
+    return {name: fuzz_case(name, stream, tail, rng, corpus_dir) for name in CORRUPTIONS}
+
+# ==========================================
+#   REPORT
+# ==========================================
+def print_report(bench, fuzz):
+    for case, r in bench.items():
+        print(f"bench  {case:<12} packets={r['packets']}  pkt_per_s={r['pkt_per_s']}  "
+              f"bytes_per_s={r['bytes_per_s']}  ns_per_pkt={r['ns_per_pkt']}")
+    for case, r in fuzz.items():
+        line = (f"fuzz   {case:<16} {'PASS' if r['pass'] else 'FAIL'}  frames_out={r['frames_out']}  "
+                f"dropped_bytes={r['dropped_bytes']}  bad_scene={r['bad_scene']}  max_pending={r['max_pending']}")
+        if r["error"]: line += f"  error={r['error']}"
+        print(line)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest path benchmark and fuzz corpus")
+    parser.add_argument("--packets", type=int, default=20000, help="Packets per benchmark case")
+    parser.add_argument("--fuzz-packets", type=int, default=5000, help="Packets per fuzz stream")
+    parser.add_argument("--repeat", type=int, default=5, help="Benchmark runs per case (best is kept)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", metavar="FILE", help="Also write the results as JSON")
+    parser.add_argument("--write-corpus", metavar="DIR", help="Save the corrupted streams")
+    parser.add_argument("--no-bench", action="store_true", help="Fuzz only")
+    args = parser.parse_args()
+
+    bench = {} if args.no_bench else run_bench(args.packets, args.seed, args.repeat)
+    fuzz = run_fuzz(args.fuzz_packets, args.seed, args.write_corpus)
+    print_report(bench, fuzz)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"format": 1, "chunk": CHUNK, "bench": bench, "fuzz": fuzz}, f, indent=2)
+    sys.exit(0 if all(r["pass"] for r in fuzz.values()) else 1)
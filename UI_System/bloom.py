@@ -0,0 +1,97 @@
+import time
+import pygame
+from config import *
+from logs import get_logger
+from quality import governor, TIER_FULL
+
+log = get_logger("gfx")
+
+# ==========================================
+#   BLOOM
+# ==========================================
+# Real glow instead of per-element shadow tricks:
+#
+#   layer --smoothscale 1/BLOOM_SCALE--> small (composited onto black)
+#         --subtract BLOOM_THRESHOLD---> bright parts only
+#         --BLOOM_PASSES x half/double-> blurred
+#         --x BLOOM_STRENGTH, smoothscale back up--> halo
+#   screen += halo (BLEND_RGB_ADD)
+#
+# Building a halo costs ~10 ms on a 1300x800 layer, so it is only done for
+# static layers and cached: each Scene keeps the halo of its backdrop
+# (text, borders, boxes) until the backdrop is rebuilt. With an idle
+# scheduler in the scene context the build runs in three idle-time steps
+# and the glow appears a few frames after the backdrop changes; per frame
+# that leaves one additive blit (~0.5 ms). FULL tier only.
+#
+# soften() is the small-sprite version (blur with alpha), used to bake a
+# halo into cached draw_glow_text() sprites.
+
+class Bloom:
+    """Downsample-threshold-blur-upscale halos for static layers."""
+    def __init__(self, scale=BLOOM_SCALE, threshold=BLOOM_THRESHOLD,
+                 passes=BLOOM_PASSES, strength=BLOOM_STRENGTH, enabled=BLOOM):
+        self.scale = scale
+        self.threshold = threshold
+        self.passes = passes
+        self.strength = strength
+        self.enabled = enabled
+        self.builds = 0
+        self.build_time = 0.0   # Seconds, every step including abandoned builds
+
+    def active(self):
+        return self.enabled and governor.tier == TIER_FULL
+
+    def halo_steps(self, layer, done):
+        """Builds the halo of `layer` in three steps (generator), then calls done(halo)."""
+        t0 = time.perf_counter()
+        size = layer.get_size()
+        w, h = max(1, size[0] // self.scale), max(1, size[1] // self.scale)
+        small = pygame.Surface((w, h))   # Black: transparent parts add nothing
+        small.blit(pygame.transform.smoothscale(layer, (w, h)), (0, 0))
+        t = self.threshold
+        small.fill((t, t, t), special_flags=pygame.BLEND_RGB_SUB)
+        self.build_time += time.perf_counter() - t0
+        yield
+
+        t0 = time.perf_counter()
+        for _ in range(self.passes):
+            half = pygame.transform.smoothscale(small, (max(1, w // 2), max(1, h // 2)))
+            small = pygame.transform.smoothscale(half, (w, h))
+        # Downsampling and blurring thin lines spreads them thin: gain back up
+        gain, frac = divmod(self.strength, 1.0)
+        base = small.copy()
+        if frac: small.fill((int(255 * frac),) * 3, special_flags=pygame.BLEND_RGB_MULT)
+        else: gain -= 1
+        for _ in range(int(gain)): small.blit(base, (0, 0), special_flags=pygame.BLEND_RGB_ADD)
+        self.build_time += time.perf_counter() - t0
+        yield
+
+        t0 = time.perf_counter()
+        halo = pygame.transform.smoothscale(small, size).convert()
+        self.builds += 1
+        self.build_time += time.perf_counter() - t0
+        done(halo)
+
+    def halo(self, layer):
+        """Opaque halo of `layer` (RGBA or opaque), to be added onto the screen."""
+        out = []
+        for _ in self.halo_steps(layer, out.append): pass
+        return out[0]
+
+    def apply(self, screen, halo, pos=(0, 0)):
+        screen.blit(halo, pos, special_flags=pygame.BLEND_RGB_ADD)
+
+    def print_report(self):
+        if not self.builds: return
+        log.info(f"Bloom: {self.builds} halos built, {self.build_time * 1000:.0f} ms total "
+                 f"(including builds dropped because the backdrop changed)")
+
+def soften(sprite, radius):
+    """Blurred copy of an RGBA sprite (color and alpha), `radius` px of spread."""
+    w, h = sprite.get_size()
+    f = max(2, radius)
+    small = pygame.transform.smoothscale(sprite, (max(1, w // f), max(1, h // f)))
+    return pygame.transform.smoothscale(small, (w, h))
+
+bloom = Bloom()
@@ -0,0 +1,161 @@
+import asyncio
+import socket
+import struct
+import threading
+import time
+from config import *
+from keyframes import KeyframeEncoder, KeyframeDecoder
+from workers import ingest_packet
+from link import set_link_state, LINK_LIVE, LINK_STALLED
+from logs import get_logger
+
+log = get_logger("cast")
+view_log = get_logger("view")
+
+# ==========================================
+#   DELTA CODEC
+# ==========================================
+# Datagram format (ASCII, '|' separated):
+#   Keyframe: K|<seq>|<SCENE>|<F0>,<F1>,...,<FN>
+#   Delta:    D|<seq>|<SCENE>|<idx>:<val>,<idx>:<val>,...
+# A delta is only valid on top of the packet with sequence number seq-1.
+# Only the framing lives here; the state machine is keyframes.py.
+
+class DeltaEncoder(KeyframeEncoder):
+    """
+    Turns a stream of decoded packets into keyframes and compact deltas.
+    Keyframes every `keyframe_interval` packets let late joiners sync quickly.
+    """
+    def __init__(self, keyframe_interval=KEYFRAME_INTERVAL):
+        super().__init__(keyframe_interval)
+
+    def format_keyframe(self, seq, scene, data):
+        return f"K|{seq}|{scene}|{','.join(data)}".encode('ascii')
+
+    def format_delta(self, seq, scene, changes):
+        return f"D|{seq}|{scene}|{','.join(changes)}".encode('ascii')
+
+class DeltaDecoder(KeyframeDecoder):
+    """
+    Rebuilds full packets from keyframe and delta datagrams. Duplicated or
+    reordered datagrams are dropped; on a gap it waits for the next keyframe.
+    """
+    reorder = True
+
+    def decode(self, payload):
+        """Returns (scene, data) or None if the datagram can't be applied."""
+        try:
+            kind, seq, scene, body = payload.decode('ascii').split('|', 3)
+            seq = int(seq)
+        except (UnicodeDecodeError, ValueError):
+            return None
+        if kind == 'K':
+            return self.keyframe(seq, scene, body.split(',') if body else [])
+        if kind == 'D':
+            return self.delta(seq, list(filter(None, body.split(','))), scene)
+        return None
+
+# ==========================================
+#   MULTICAST SOCKETS
+# ==========================================
+def _make_sender(iface):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(iface))
+    sock.setblocking(False)
+    return sock
+
+def _make_receiver(group, port, iface):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(('', port))
+    mreq = struct.pack('4s4s', socket.inet_aton(group), socket.inet_aton(iface))
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+    sock.setblocking(False)
+    return sock
+
+# ==========================================
+#   BROADCASTER (PUBLISHER)
+# ==========================================
+class Broadcaster:
+    """
+    Publishes decoded packets to spectator screens over UDP multicast.
+    publish() only hands the packet to an asyncio loop on its own thread;
+    encoding and the single sendto() per packet happen there, so the
+    serial reader and render loop pay the same cost for 1 or 50 viewers.
+    """
+    def __init__(self, group=BROADCAST_GROUP, port=BROADCAST_PORT, iface=BROADCAST_IFACE,
+                 keyframe_interval=KEYFRAME_INTERVAL, heartbeat=BROADCAST_HEARTBEAT):
+        self.addr = (group, port)
+        self.iface = iface
+        self.heartbeat = heartbeat
+        self.encoder = DeltaEncoder(keyframe_interval)
+        self.loop = None
+        self.queue = None
+        self.sent = 0
+
+    def start(self):
+        """Spawns the broadcaster thread and returns once it is accepting packets."""
+        ready = threading.Event()
+        threading.Thread(target=self._run, args=(ready,), daemon=True).start()
+        ready.wait(2)
+
+    def publish(self, scene, data):
+        """Packet listener callback. Safe to call from any thread; never blocks."""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, (scene, list(data)))
+
+    def _run(self, ready):
+        asyncio.run(self._serve(ready))
+
+    async def _serve(self, ready):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        transport, _ = await self.loop.create_datagram_endpoint(
+            asyncio.DatagramProtocol, sock=_make_sender(self.iface))
+        log.info(f"Broadcasting on {self.addr[0]}:{self.addr[1]}")
+        ready.set()
+
+        while True:
+            try:
+                scene, data = await asyncio.wait_for(self.queue.get(), self.heartbeat)
+                payload = self.encoder.encode(scene, data)
+            except asyncio.TimeoutError:
+                # Idle link: re-send state so newly started viewers can sync
+                if self.encoder.scene is None: continue
+                payload = self.encoder.keyframe()
+            transport.sendto(payload, self.addr)
+            self.sent += 1
+
+# ==========================================
+#   VIEWER WORKER (SUBSCRIBER)
+# ==========================================
+class _ViewerProtocol(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.decoder = DeltaDecoder()
+        self.last_rx = 0
+
+    def datagram_received(self, payload, addr):
+        packet = self.decoder.decode(payload)
+        if packet is None: return
+        self.last_rx = time.time()
+        if shared_state["link"] != LINK_LIVE: set_link_state(LINK_LIVE)
+        ingest_packet(*packet)
+
+async def _view(group, port, iface):
+    loop = asyncio.get_running_loop()
+    _, proto = await loop.create_datagram_endpoint(
+        _ViewerProtocol, sock=_make_receiver(group, port, iface))
+    view_log.info(f"Listening to feed {group}:{port}")
+
+    # Watchdog: the broadcaster sends heartbeats, silence means it's gone
+    while True:
+        await asyncio.sleep(0.5)
+        if shared_state["link"] == LINK_LIVE and time.time() - proto.last_rx > BROADCAST_HEARTBEAT * 3:
+            set_link_state(LINK_STALLED)
+            view_log.info("Feed lost, waiting for keyframe...")
+
+def viewer_worker(group=BROADCAST_GROUP, port=BROADCAST_PORT, iface=BROADCAST_IFACE):
+    """Consumes a spectator feed instead of a serial port."""
+    asyncio.run(_view(group, port, iface))
@@ -0,0 +1,107 @@
+import time
+import threading
+from config import *
+from logs import get_logger
+
+log = get_logger("link")
+
+# ==========================================
+#   HOST -> MCU COMMAND CHANNEL
+# ==========================================
+# See Protocol.md section 6. Commands are short ASCII lines ending in '\r'
+# (what MyusartRead() buffers); replies come back as normal $...* frames.
+#   #SYNC          -> MCU re-sends its current state packet
+#   #PING,<n>      -> $PONG,<n>*
+#   #BAUD,<rate>   -> $BAUD,<rate>,<1|0>*  then both sides switch on ACK
+#   #BAUDOK        -> sent at the new rate; MCU reverts if it never arrives
+#   #DELTA,<1|0>   -> $DELTA,<1|0>*  switch to keyframe/delta frames (section 7)
+
+REPLY_SCENES = ("PONG", "BAUD", "DELTA")
+
+class CommandChannel:
+    """
+    Sends commands over an open serial port. Replies are delivered by the
+    link's reader thread through on_reply(), so the blocking helpers below
+    (ping, upgrade_baud) must run on a different thread.
+    """
+    def __init__(self, ser):
+        self.ser = ser
+        self.lock = threading.Lock()
+        self.ping_id = 0
+        self.replies = {}          # (scene, key) -> (data, perf_counter)
+        self.reply_event = threading.Condition()
+        self.last_rx = 0.0         # Any valid frame (used to confirm a new baud rate)
+
+    def send(self, command):
+        with self.lock:
+            self.ser.write(f"#{command}\r".encode('ascii'))
+            self.ser.flush()
+
+    def on_frame(self):
+        self.last_rx = time.perf_counter()
+
+    def on_reply(self, scene, data):
+        """Called by the reader thread for $PONG / $BAUD frames."""
+        if not data: return
+        with self.reply_event:
+            self.replies[(scene, data[0])] = (data, time.perf_counter())
+            self.reply_event.notify_all()
+
+    def _wait_reply(self, scene, key, timeout):
+        deadline = time.perf_counter() + timeout
+        with self.reply_event:
+            while (scene, key) not in self.replies:
+                left = deadline - time.perf_counter()
+                if left <= 0: return None
+                self.reply_event.wait(left)
+            return self.replies.pop((scene, key))
+
+    # --- Commands ---
+    def request_full_state(self):
+        """Asks the MCU to re-send its current packet (instant resync)."""
+        self.send("SYNC")
+
+    def ping(self, timeout=CMD_TIMEOUT):
+        """Returns the round-trip time in seconds, or None without reply."""
+        self.ping_id = (self.ping_id + 1) % 65536
+        key = str(self.ping_id)
+        t0 = time.perf_counter()
+        self.send(f"PING,{key}")
+        reply = self._wait_reply("PONG", key, timeout)
+        return reply[1] - t0 if reply else None
+
+    def upgrade_baud(self, rate, timeout=CMD_TIMEOUT):
+        """
+        Negotiates a switch to `rate`. Returns True if the link runs at the
+        new rate afterwards; otherwise the port is back at the old rate.
+        """
+        old = self.ser.baudrate
+        self.send(f"BAUD,{rate}")
+        reply = self._wait_reply("BAUD", str(rate), timeout)
+        if not reply or len(reply[0]) < 2 or reply[0][1] != '1':
+            return False  # Not supported (or old firmware without commands)
+
+        self.ser.baudrate = rate
+        switched = time.perf_counter()
+        self.send("BAUDOK")
+        # Confirm with real traffic at the new rate
+        if self.ping(timeout) is not None or self.last_rx > switched:
+            return True
+        log.info(f"No traffic at {rate} baud, falling back to {old}")
+        self.ser.baudrate = old
+        return False
+
+    def enable_delta(self, on=True, timeout=CMD_TIMEOUT):
+        """Asks the MCU for delta frames. Returns True if it acknowledged."""
+        flag = '1' if on else '0'
+        self.send(f"DELTA,{flag}")
+        return self._wait_reply("DELTA", flag, timeout) is not None
+
+    def negotiate(self, rates=BAUD_UPGRADE_RATES):
+        """Tries the fastest supported rate first. Returns the rate in use."""
+        for rate in sorted(rates, reverse=True):
+            if rate <= self.ser.baudrate: break
+            if self.upgrade_baud(rate):
+                log.info(f"Baud rate upgraded to {rate}")
+                return rate
+        return self.ser.baudrate
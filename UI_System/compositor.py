@@ -0,0 +1,115 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+from config import *
+from logs import get_logger
+
+log = get_logger("gfx")
+
+# ==========================================
+#   LAYER COMPOSITOR
+# ==========================================
+# A frame is a stack of layers. The main layer (scene, popups, overlays) is
+# drawn straight onto the screen on the main thread: it shares font objects
+# with everything else and blends against what's under it. Layers that
+# only touch their own state (the background) render into their own
+# surface on a small thread pool instead, one frame ahead:
+#
+#   frame N:  [worker] background N+1 -> layer surface
+#             [main]   blit background N, draw scene N, blit layers above
+#
+# fill/blit/transform release the GIL, so on a multi-core kiosk the
+# background costs the main thread one blit. The picture lags one frame
+# (16 ms of star drift), nothing else changes.
+#
+#   compositor.add("background", draw_background, z=-1)
+#   compositor.compose(screen, draw_scene)
+#
+# Layers below the main layer (z < 0) are opaque; layers above start out
+# transparent every frame and are alpha-blended over the main layer.
+
+def default_threads():
+    """One worker per spare core, at most COMPOSITOR_MAX_THREADS."""
+    return max(0, min(COMPOSITOR_MAX_THREADS, (os.cpu_count() or 1) - 1))
+
+class Layer:
+    """A full-screen layer rendered by render(surface) into its own surface."""
+    def __init__(self, name, render, z):
+        self.name = name
+        self.render = render
+        self.z = z
+        self.surface = None          # Own surface, only when rendered on the pool
+        self.pending = None          # Future of the render into self.surface
+        self.frames = 0
+        self.render_time = 0.0       # Seconds spent rendering (worker)
+        self.wait_time = 0.0         # Seconds the main thread waited for it
+
+    def draw(self, target=None):
+        """Renders into the layer surface, or straight onto `target` (serial)."""
+        t0 = time.perf_counter()
+        if target is None and self.z > 0: self.surface.fill((0, 0, 0, 0))
+        self.render(self.surface if target is None else target)
+        self.render_time += time.perf_counter() - t0
+
+class LayerCompositor:
+    """Renders independent layers on a thread pool and merges them on the main thread."""
+    def __init__(self, size=(WIDTH, HEIGHT), threads=COMPOSITOR_THREADS):
+        self.size = size
+        self.threads = default_threads() if threads is None else threads
+        self.pool = ThreadPoolExecutor(self.threads, thread_name_prefix="layer") if self.threads else None
+        self.layers = []   # Sorted by z
+        self.main_time = 0.0
+        self.frames = 0
+
+    def add(self, name, render, z):
+        """Registers a layer; z < 0 below the main layer, z > 0 above it."""
+        if not z: raise ValueError("z=0 is the main layer")
+        layer = Layer(name, render, z)
+        if self.pool:
+            # Display format, so the merge is a straight copy / blend
+            if z < 0: layer.surface = pygame.Surface(self.size).convert()
+            else: layer.surface = pygame.Surface(self.size, pygame.SRCALPHA).convert_alpha()
+        self.layers.append(layer)
+        self.layers.sort(key=lambda layer: layer.z)
+
+    def compose(self, screen, draw_main):
+        """Draws one frame: finished layers and draw_main(screen) in z order."""
+        main_done = False
+        for layer in self.layers:
+            if layer.z > 0 and not main_done:
+                self._draw_main(screen, draw_main)
+                main_done = True
+            self._merge(screen, layer)
+        if not main_done: self._draw_main(screen, draw_main)
+        self.frames += 1
+
+    def _draw_main(self, screen, draw_main):
+        t0 = time.perf_counter()
+        draw_main(screen)
+        self.main_time += time.perf_counter() - t0
+
+    def _merge(self, screen, layer):
+        layer.frames += 1
+        if not self.pool:
+            layer.draw(screen)   # No spare core: plain serial rendering, no extra blit
+            return
+        t0 = time.perf_counter()
+        if layer.pending is None: layer.draw()   # First frame: nothing rendered ahead yet
+        else: layer.pending.result()
+        layer.wait_time += time.perf_counter() - t0
+        screen.blit(layer.surface, (0, 0))
+        # The blit is done, the surface is free: start on the next frame
+        layer.pending = self.pool.submit(layer.draw)
+
+    def stop(self):
+        if self.pool: self.pool.shutdown(wait=True)
+
+    def print_report(self):
+        if not self.frames: return
+        mode = f"{self.threads} worker thread(s)" if self.pool else "serial"
+        log.info(f"Compositor ({mode}): main layer {self.main_time * 1000 / self.frames:.2f} ms/frame")
+        for layer in self.layers:
+            if not layer.frames: continue
+            log.info(f"  {layer.name:<10} z={layer.z:+d} render {layer.render_time * 1000 / layer.frames:.2f} ms, "
+                     f"main thread waited {layer.wait_time * 1000 / layer.frames:.2f} ms/frame")
@@ -5,11 +5,27 @@ import time
 # ==========================================
 # Serial Port Settings
 # Windows: 'COM3', 'COM4' | Mac/Linux: '/dev/ttyUSB0'
-SERIAL_PORT = 'COM3'   
+# 'AUTO': probe all USB-serial ports and baud rates (see discovery.py)
+SERIAL_PORT = 'AUTO'   
 BAUD_RATE = 2400
+PROBE_PATTERNS = ['/dev/ttyUSB*', '/dev/ttyACM*']   # Emulator links: --port '/tmp/ttyMCU*'
+PROBE_BAUDS = [2400, 9600, 19200, 115200]   # Candidate rates for auto-baud
+PROBE_WINDOW = 0.3          # Seconds to wait for a valid frame per port/baud
+PROBE_SILENT_WINDOW = 0.1   # Give up on a port that sends no bytes at all for this long
+PROBE_NOISE_BYTES = 16      # Give up on a baud rate after this much garbage
+LINK_CACHE_FILE = '.link_cache.json'
+LINK_STALE_TIMEOUT = 1.5    # Seconds without packets before the link counts as STALLED
+LINK_RETRY_INTERVAL = 1.0   # Reconnect poll when no hotplug event arrives (non-Linux)
+CMD_TIMEOUT = 0.5           # Seconds to wait for a command reply ($PONG / $BAUD)
+BAUD_UPGRADE_RATES = [9600, 19200]   # Rates to negotiate after connecting ([] = stay)
+UART_DELTA = True           # Ask command-capable firmware for delta frames
+UART_MAX_FRAME = 256        # Longest unfinished frame kept between reads (bytes)
 
 # Window Resolution & Performance
-WIDTH, HEIGHT = 1300, 800
+CANVAS_SIZE = (1300, 800)   # Internal resolution everything is drawn at (--canvas WxH, see display.py)
+WIDTH, HEIGHT = CANVAS_SIZE
+LAYOUT_SIZE = (1300, 800)   # Resolution the scenes are laid out for; drawing scales to the canvas (layout.py)
+CANVAS_MIN = (320, 200)     # Smallest --canvas accepted
 FPS = 60
 
 # SIMULATION SWITCH
@@ -18,6 +34,116 @@ FPS = 60
 # This can be overridden by command line arguments.
 USE_SIMULATION = True  
 
+# Simulation Engine (see simulation.py)
+SIM_SCENARIO = 'session'   # Built-in scenario name or path to a .json knob file
+SIM_SPEED = 1.0            # 1.0 real time, N = N times faster, 0 = as fast as possible
+SIM_SEED = None            # Fixed seed for reproducible matches
+
+# Spectator Broadcast (UDP Multicast, see broadcast.py)
+# Use '127.0.0.1' as interface to test viewers on the same machine.
+BROADCAST_GROUP = '239.255.18.4'
+BROADCAST_PORT = 5005
+BROADCAST_IFACE = '0.0.0.0'
+KEYFRAME_INTERVAL = 20       # Full state re-sent every N packets
+BROADCAST_HEARTBEAT = 1.0    # Seconds of silence before a keyframe is repeated
+
+# Audio Engine (see audio.py)
+AUDIO_FREQUENCY = 44100
+AUDIO_BUFFER = 256            # Samples per mixer buffer (~6 ms); raise if audio crackles
+AUDIO_CACHE_DIR = '.audio_cache'   # Decoded PCM cache (None disables)
+# Category: (reserved channels, voice stealing rule: oldest | retrigger | drop)
+AUDIO_CATEGORIES = {
+    'ui':      (2, 'retrigger'),   # hint, button, cursor move
+    'game':    (4, 'oldest'),      # place, hit, miss
+    'fanfare': (1, 'drop'),        # win
+}
+SOUND_CATEGORY = {
+    'hint': 'ui', 'button': 'ui', 'move': 'ui',
+    'place': 'game', 'hit': 'game', 'miss': 'game',
+    'win': 'fanfare',
+}
+
+# Client-Side Prediction (see predict.py)
+PREDICTION = True            # Extrapolate timers/rolling counters between packets
+MCU_TICK_RATE = 10000        # Timer2 ticks per second (100 us)
+REACT_ROLL_TICKS = 1000      # REACT display number rolls +1 every 0.1 s
+PREDICT_MAX_AHEAD = 0.5      # Seconds past the last packet before prediction freezes
+
+# Quality Governor (see quality.py)
+QUALITY = 'auto'               # auto | full | reduced | flat
+QUALITY_WINDOW = 30            # Frames averaged per decision
+QUALITY_DOWNGRADE_AT = 0.9     # Step down above this share of the frame budget
+QUALITY_UPGRADE_AT = 0.5       # Step up below this share ...
+QUALITY_UPGRADE_FRAMES = 180   # ... sustained for this many frames (doubles after a failed try)
+
+# Fonts (see fonts.py)
+FONT_FILE = 'assets/fonts/SourceCodePro-Bold.ttf'   # Bundled, SIL Open Font License
+FONT_CACHE_FILE = '.font_cache.json'                # Resolved system font paths (fallback)
+FONT_PRELOAD_SIZES = [16, 20, 24, 28, 30, 32, 40, 50, 60, 80, 100, 120]
+
+# Scenes (see scene_manager.py)
+SCENE_PLUGIN_DIR = 'plugins'   # Extra Scene modules loaded at startup
+
+# Game Events (see events.py)
+POPUP_DURATION = 0.6         # Seconds a HIT/MISS popup stays on screen
+
+# Render Target (see display.py)
+DISPLAY_MODE = 'native'      # native, scaled (SDL fullscreen), integer or smooth (letterboxed)
+DISPLAY_SIZE = None          # Window size for integer/smooth, None = fullscreen desktop
+RENDER_NATIVE_HUD = True     # integer/smooth: draw popups after the upscale, at window resolution
+
+# Bloom (see bloom.py)
+BLOOM = True                 # Cached glow halos on scene backdrops (FULL tier only)
+BLOOM_SCALE = 4              # Halo is blurred at 1/BLOOM_SCALE resolution
+BLOOM_THRESHOLD = 40         # Channel values (after downsampling) below this don't glow
+BLOOM_PASSES = 2             # Half/double smoothscale blur passes
+BLOOM_STRENGTH = 2.0         # Halo gain (thin lines fade when downsampled)
+GLOW_TEXT_CACHE = 128        # Cached draw_glow_text() sprites (LRU)
+
+# Layer Compositor (see compositor.py)
+COMPOSITOR_THREADS = None    # Worker threads for independent layers (None = one per spare core, 0 = serial)
+COMPOSITOR_MAX_THREADS = 2
+
+# Idle-Time Scheduler (see scheduler.py)
+IDLE_RESERVE = 0.002         # Seconds of each frame left untouched before clock.tick()
+IDLE_MAX_DEFER = 30          # Over-budget frames before a task step runs anyway
+IDLE_GC = True               # Run Python's cyclic GC in idle time instead of mid-frame
+IDLE_GC_ESTIMATE = (0.0005, 0.002, 0.02)   # Assumed cost per generation until measured
+IDLE_GC_FORCE = 20000        # Collect regardless of slack past this many allocations
+
+# Logging (see logs.py)
+LOG_FILE = 'ui.log'          # Rotating log file ('' = console only)
+LOG_LEVEL = 'INFO'
+LOG_MAX_BYTES = 1024 * 1024  # Rotate at 1 MB ...
+LOG_BACKUPS = 3              # ... keeping ui.log.1 - ui.log.3
+LOG_QUEUE_SIZE = 1000        # Records waiting for the writer thread; more are dropped
+LOG_RATE_BURST = 3           # Identical warnings let through per window ...
+LOG_RATE_WINDOW = 10.0       # ... of this many seconds
+LOG_RATE_KEYS = 256          # Distinct warning templates tracked (least recently seen dropped)
+
+# Live Statistics (see analytics.py; S = toggle overlay)
+STATS_OVERLAY = True         # WAM miss heatmap / REACT accuracy panels
+
+# Tic-Tac-Toe Analysis (see ttt_analysis.py)
+TTT_RULES = 'three'          # 'three': max 3 pieces each (TIC_TAC_TOE.c), 'classic': unlimited
+TTT_TABLE_FILE = '.ttt_table.bin'   # Solved tables, built on first start (a few seconds)
+
+# Instant Replay (see replay.py; R = replay, UP/DOWN = speed)
+REPLAY_SECONDS = 8           # Length of the replay ring
+REPLAY_FPS = 30              # Frames captured per second
+REPLAY_SIZE = (520, 320)     # Stored resolution (downscaled from WIDTH x HEIGHT)
+REPLAY_MAX_BYTES = 48 * 1024 * 1024   # Hard memory cap for the compressed ring
+REPLAY_SPEED = 0.5           # Default playback speed
+REPLAY_ON_END = True         # Play the replay automatically when a match ends
+
+# Highlight Rendering (python highlights.py logs/*.log)
+HIGHLIGHT_FPS = 30           # Fixed timestep of the rendered video
+HIGHLIGHT_SCALE = 0.5        # Output size relative to WIDTH x HEIGHT
+HIGHLIGHT_TAIL = 2.0         # Seconds rendered after the last packet
+
+# Latency Tracing (python main.py --trace trace.json)
+TRACE_MAX_PACKETS = 20000    # Packets kept for the report / trace file
+
 # ==========================================
 #   COLOR PALETTE
 # ==========================================
@@ -42,7 +168,11 @@ COLOR_DIM = (60, 60, 60)        # Inactive Element Gray
 # and the Pygame thread (Main UI).
 shared_state = {
     "connected": False,      # Connection Status (True if Serial/Sim is active)
+    "link": "DISCONNECTED",  # Link State: DISCONNECTED, STALLED, LIVE (see link.py)
     "scene": "WAITING",      # Current Scene Key: START, HINT, TTT, REACT, WAM, END
     "raw_data": [],          # List of parsed data strings from UART
-    "last_update": 0         # Timestamp of the last received packet
+    "last_update": 0,        # Timestamp of the last received packet
+    "seq": 0,                # Packet counter (increments on every packet)
+    "rx_time": None,         # perf_counter() when the packet's bytes were seen
+    "frame": 0               # Rendered frame counter (stamped on log records)
 }
\ No newline at end of file
@@ -0,0 +1,122 @@
+import os
+import glob
+import json
+import time
+import serial
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config import *
+from protocol import parse_frame, is_state_frame
+from logs import get_logger
+
+log = get_logger("link")
+
+# ==========================================
+#   SERIAL PORT AUTO-DISCOVERY
+# ==========================================
+# Finds the PIC18F link without a hardcoded port or baud rate:
+#  1. Re-check the cached link from the last run (usually the only probe).
+#  2. Otherwise probe every candidate port in parallel. Each port tries
+#     the candidate baud rates in turn and stops at the first one that
+#     yields a valid $<SCENE>,...* frame (or a keyframe/delta frame).
+#     A port that sends no bytes at all (idle adapter, other device) is
+#     silent at every rate: it is dropped after PROBE_SILENT_WINDOW
+#     instead of costing a full PROBE_WINDOW per rate.
+
+def candidate_ports(patterns=PROBE_PATTERNS):
+    """Lists serial ports that could be the MCU's USB-UART adapter."""
+    ports = [p for pattern in patterns for p in glob.glob(pattern)]
+    try:
+        from serial.tools import list_ports
+        ports += [p.device for p in list_ports.comports() if p.device not in ports]
+    except ImportError:
+        pass
+    return sorted(set(ports))
+
+def _looks_like_noise(buf):
+    """Wrong baud rates decode into mostly non-printable bytes."""
+    if len(buf) < PROBE_NOISE_BYTES: return False
+    printable = sum(1 for b in buf if 32 <= b < 127 or b in (10, 13))
+    return printable < len(buf) * 0.8
+
+def probe(port, baud, window=PROBE_WINDOW, silent=PROBE_SILENT_WINDOW):
+    """
+    Returns True if `port` delivers valid protocol frames at `baud`, False
+    if it doesn't, and None if it sent nothing at all for `silent` seconds.
+    """
+    try:
+        ser = serial.Serial(port, baud, timeout=0.02)
+    except (serial.SerialException, OSError, ValueError):
+        return False
+    try:
+        ser.reset_input_buffer()
+        buf = bytearray()
+        heard = False
+        start = time.perf_counter()
+        deadline = start + window
+        while time.perf_counter() < deadline:
+            chunk = ser.read(ser.in_waiting or 1)
+            if not chunk:
+                if not heard and time.perf_counter() - start > silent: return None
+                continue
+            heard = True
+            buf += chunk
+            if _looks_like_noise(buf): return False
+            *lines, buf = buf.split(b'\n')
+            for line in lines:
+                packet = parse_frame(line.decode('ascii', errors='ignore'))
+                if packet and is_state_frame(packet[0]): return True
+        return False
+    finally:
+        ser.close()
+
+def _probe_port(port, bauds):
+    for baud in bauds:
+        ok = probe(port, baud)
+        if ok: return port, baud
+        if ok is None: return None   # Silent port: no other rate will talk either
+    return None
+
+def load_cached_link(path=LINK_CACHE_FILE):
+    try:
+        with open(path, encoding='utf-8') as f:
+            cached = json.load(f)
+        return cached["port"], int(cached["baud"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+def save_cached_link(port, baud, path=LINK_CACHE_FILE):
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"port": port, "baud": baud}, f)
+    except OSError as e:
+        log.warning(f"Failed to cache link: {e}")
+
+def discover_link(bauds=PROBE_BAUDS, patterns=PROBE_PATTERNS):
+    """Returns (port, baud) of the first port speaking the protocol, or None."""
+    t0 = time.perf_counter()
+    cached = load_cached_link()
+    if cached and os.path.exists(cached[0]) and probe(*cached):
+        log.info(f"Cached link OK: {cached[0]} @ {cached[1]} ({(time.perf_counter()-t0)*1000:.0f} ms)")
+        return cached
+
+    ports = candidate_ports(patterns)
+    if not ports: return None
+    # Try the cached/configured baud first on every port
+    first = cached[1] if cached else BAUD_RATE
+    order = [first] + [b for b in bauds if b != first]
+
+    found = None
+    pool = ThreadPoolExecutor(max_workers=len(ports))
+    futures = [pool.submit(_probe_port, p, order) for p in ports]
+    for fut in as_completed(futures):
+        if fut.result():
+            found = fut.result()
+            break
+    # Don't wait for slower ports, they close themselves when their window ends
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    dt = (time.perf_counter() - t0) * 1000
+    if found:
+        log.info(f"Found MCU on {found[0]} @ {found[1]} baud ({len(ports)} ports, {dt:.0f} ms)")
+        save_cached_link(*found)
+    return found
@@ -0,0 +1,88 @@
+import time
+import pygame
+from config import *
+from logs import get_logger
+
+log = get_logger("gfx")
+
+# ==========================================
+#   RENDER TARGET
+# ==========================================
+# Everything is drawn onto a WIDTH x HEIGHT canvas (CANVAS_SIZE, --canvas);
+# fill cost doesn't depend on the display. present() puts the canvas on
+# the window:
+#
+#   native   the window is the canvas (WIDTH x HEIGHT window, as before)
+#   scaled   pygame.SCALED fullscreen: SDL's renderer stretches the canvas
+#            (GPU where available, no per-frame cost in Python)
+#   integer  largest whole-number upscale that fits, letterboxed
+#            (pygame.transform.scale, sharp pixels)
+#   smooth   largest upscale that fits, letterboxed (smoothscale; the most
+#            expensive, for odd display sizes)
+#
+# integer/smooth draw straight into a subsurface of the window, no
+# intermediate surface. Their HUD callbacks (add_hud) run after the
+# upscale in window pixels, so text stays crisp at native resolution;
+# to_window() and scale map canvas coordinates, whatever the canvas size:
+#
+#   target.add_hud(lambda window, to_window, scale: ...)
+#   target.present(hud=False)   # e.g. during instant replay
+
+MODES = ("native", "scaled", "integer", "smooth")
+
+class RenderTarget:
+    """Fixed-size canvas and its presentation on the window."""
+    def __init__(self, mode=DISPLAY_MODE, size=DISPLAY_SIZE, native_hud=RENDER_NATIVE_HUD, canvas=(WIDTH, HEIGHT)):
+        if mode not in MODES:
+            raise ValueError(f"Unknown display mode '{mode}'. Use {', '.join(MODES)}")
+        self.mode = mode
+        cw, ch = canvas
+        self.huds = []
+        self.present_time = 0.0
+        self.frames = 0
+
+        if mode == "native":
+            self.window = self.canvas = pygame.display.set_mode(canvas)
+        elif mode == "scaled":
+            self.window = self.canvas = pygame.display.set_mode(canvas, pygame.SCALED | pygame.FULLSCREEN)
+        else:
+            self.window = pygame.display.set_mode(size) if size else pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+            self.canvas = pygame.Surface(canvas).convert()
+
+        ww, wh = self.window.get_size()
+        self.scale = min(ww / cw, wh / ch)
+        if mode == "integer" and self.scale >= 1: self.scale = int(self.scale)
+        w, h = int(cw * self.scale), int(ch * self.scale)
+        self.rect = pygame.Rect((ww - w) // 2, (wh - h) // 2, w, h)
+        self.native_hud = native_hud and self.canvas is not self.window
+        if self.canvas is not self.window:
+            self.window.fill((0, 0, 0))   # Letterbox bars, never drawn again
+            self.dest = self.window.subsurface(self.rect)
+        log.info(f"Display {mode}: canvas {cw}x{ch} -> window {ww}x{wh} (x{self.scale:g})")
+
+    def to_window(self, pos):
+        """Canvas coordinates -> window coordinates."""
+        return (self.rect.x + int(pos[0] * self.scale), self.rect.y + int(pos[1] * self.scale))
+
+    def add_hud(self, draw):
+        """draw(window, to_window, scale), called after the upscale (integer/smooth only)."""
+        self.huds.append(draw)
+
+    def present(self, hud=True):
+        """Puts the canvas on the window (plus the HUD callbacks) and flips."""
+        t0 = time.perf_counter()
+        if self.canvas is not self.window:
+            if self.mode == "integer" and self.scale >= 1:
+                pygame.transform.scale(self.canvas, self.rect.size, self.dest)
+            else:
+                pygame.transform.smoothscale(self.canvas, self.rect.size, self.dest)
+            if self.native_hud and hud:
+                for draw in self.huds: draw(self.window, self.to_window, self.scale)
+        self.present_time += time.perf_counter() - t0
+        self.frames += 1
+        pygame.display.flip()
+
+    def print_report(self):
+        if not self.frames or self.canvas is self.window: return
+        log.info(f"Display {self.mode}: upscale {self.present_time * 1000 / self.frames:.2f} ms/frame "
+                 f"to {self.rect.w}x{self.rect.h}")
@@ -0,0 +1,223 @@
+import os
+import tty
+import select
+import time
+import threading
+import argparse
+from config import *
+from protocol import format_frame, FrameEncoder
+from simulation import SimulationEngine
+
+# ==========================================
+#   PTY MCU EMULATOR (LINUX)
+# ==========================================
+# Stands in for the PIC18F on the far end of a pseudo-terminal so the real
+# serial_worker / pyserial stack can be exercised without hardware:
+#
+#   Terminal 1: python emulator.py --link /tmp/ttyMCU0 --baud 2400
+#   Terminal 2: python main.py --hw --port /tmp/ttyMCU0 --baud 2400
+#           or: python main.py --hw --port '/tmp/ttyMCU*'   (auto-baud)
+#
+# TX: frames are produced by the simulation engine and formatted exactly as
+#     GAME_OUTPUT.c does (or as keyframes/deltas after #DELTA,1), then
+#     clocked out byte by byte at the line rate.
+# RX: every received byte is handled like MyusartRead() in uart.c; complete
+#     '#' lines are executed as host commands (Protocol.md section 6).
+
+MCU_RX_BUFFER = 19   # mystring[20] minus terminator
+MCU_BAUD_RATES = (2400, 4800, 9600, 19200)   # +0.16 % at Fosc = 1 MHz (Protocol.md 6.1: BRG16=1, BRGH=1 above 4800)
+BAUD_CONFIRM_TIMEOUT = 2.0                   # Revert if #BAUDOK doesn't arrive
+
+class UartLine:
+    """
+    One TX line clocked at `baud` (8N1 = 10 bit times per byte).
+    Like UART_Write() busy-waiting on TRMT, write() blocks until every
+    byte has left the shift register. baud = 0 disables pacing.
+    """
+    def __init__(self, fd, baud):
+        self.fd = fd
+        self.byte_time = 10.0 / baud if baud else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = 0.0
+        self.bytes_sent = 0
+
+    def write(self, data):
+        if not self.byte_time:
+            with self.lock:
+                os.write(self.fd, data)
+                self.bytes_sent += len(data)
+            return
+        for b in data:
+            with self.lock:
+                now = time.perf_counter()
+                if self.next_slot > now:
+                    time.sleep(self.next_slot - now)
+                    now = self.next_slot
+                os.write(self.fd, bytes((b,)))
+                self.next_slot = now + self.byte_time
+                self.bytes_sent += 1
+
+class McuEmulator:
+    """
+    Emulated PIC18F behind a pty pair. `port` is the path the host opens.
+    If `link` is given, a stable symlink to the current pty is kept so a
+    replug() (new pty, old one hung up) looks like a USB adapter re-enumerating.
+    """
+    def __init__(self, baud=BAUD_RATE, scenario=SIM_SCENARIO, speed=SIM_SPEED, seed=SIM_SEED, link=None,
+                 max_baud=max(MCU_BAUD_RATES)):
+        self.baud = baud
+        self.link = link
+        self.max_baud = max_baud     # 0 = legacy firmware without command support
+        self.last_frame = b''
+        self.baud_timer = None
+        self.frame_lock = threading.Lock()   # Whole frames never interleave
+        self.delta = False                   # Keyframe/delta frames (#DELTA,1)
+        self.encoder = FrameEncoder()
+        self.engine = SimulationEngine(self._send, scenario, speed, seed)
+        self.rx_line = bytearray()
+        self.rx_lines = []       # Completed '\r'-terminated strings (string_ready)
+        self.rx_keys = []        # Raw input bytes, e.g. WAM keys '1'-'9'
+        self.frames_sent = 0
+        self.stalled = threading.Event()
+        self._open_pty()
+
+    # --- PTY lifecycle ---
+    def _open_pty(self):
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        self.port = os.ttyname(self.slave)
+        self.tx = UartLine(self.master, self.baud)
+        if self.link:
+            tmp = self.link + ".tmp"
+            if os.path.lexists(tmp): os.remove(tmp)
+            os.symlink(self.port, tmp)
+            os.replace(tmp, self.link)
+        threading.Thread(target=self._rx_loop, args=(self.master,), daemon=True).start()
+        print(f"[EMU] MCU on {self.port}" + (f" (link: {self.link})" if self.link else ""))
+
+    def replug(self):
+        """Hangs up the current pty and re-enumerates on a fresh one."""
+        old_master, old_slave = self.master, self.slave
+        self._open_pty()
+        time.sleep(0.2)  # Let the old RX thread notice and exit
+        os.close(old_slave)
+        os.close(old_master)
+
+    def close(self):
+        os.close(self.slave)
+        os.close(self.master)
+        if self.link and os.path.lexists(self.link): os.remove(self.link)
+
+    # --- TX path (GAME_OUTPUT.c) ---
+    def _send(self, scene, data):
+        while self.stalled.is_set():   # Hung firmware: line goes silent
+            time.sleep(0.01)
+        try:
+            with self.frame_lock:
+                self.last_frame = format_frame(scene, data).encode('ascii')
+                frame = self.encoder.encode(scene, data).encode('ascii') if self.delta else self.last_frame
+                self.tx.write(frame)
+            self.frames_sent += 1
+        except OSError:
+            pass  # Replugged mid-frame: bytes went into a dead cable
+
+    # --- RX path (uart.c: MyusartRead) ---
+    def _rx_loop(self, master):
+        # Poll with a timeout: a read blocked in the kernel would keep the
+        # old pty alive after replug() and the host would never see a hangup
+        while master == self.master:
+            try:
+                if not select.select([master], [], [], 0.1)[0]: continue
+                chunk = os.read(master, 64)
+            except (OSError, ValueError):
+                return  # pty closed (replug / shutdown)
+            if not chunk: return
+            for b in chunk:
+                self.usart_read(b)
+
+    def usart_read(self, b):
+        """Handles one received byte exactly like MyusartRead()."""
+        in_command = self.rx_line[:1] == b'#' or b == 0x23
+        # Command-capable firmware doesn't echo command lines (Protocol.md 6.1)
+        echo = not (in_command and self.max_baud)
+        if echo: self.tx.write(bytes((b,)))
+        if not in_command and b != 0x0D:
+            self.rx_keys.append(chr(b))      # Game input (e.g. WAM keys)
+        if b == 0x0D:                        # '\r'
+            if echo: self.tx.write(b'\n')
+            line = self.rx_line.decode('ascii', errors='ignore')
+            self.rx_lines.append(line)
+            self.rx_line = bytearray()
+            if line.startswith('#') and self.max_baud:
+                self.handle_command(line[1:].split(','))
+        elif len(self.rx_line) < MCU_RX_BUFFER:
+            self.rx_line.append(b)
+
+    # --- Command channel (Protocol.md section 6) ---
+    def _reply(self, frame):
+        with self.frame_lock:
+            self.tx.write(frame)
+
+    def handle_command(self, args):
+        cmd = args[0]
+        if cmd == "SYNC":
+            with self.frame_lock:
+                if not self.delta:
+                    self.tx.write(self.last_frame)
+                elif self.encoder.scene is not None:
+                    self.tx.write(self.encoder.keyframe().encode('ascii'))
+        elif cmd == "PING" and len(args) > 1:
+            self._reply(format_frame("PONG", [args[1]]).encode('ascii'))
+        elif cmd == "BAUD" and len(args) > 1:
+            try: rate = int(args[1])
+            except ValueError: return
+            ok = rate in MCU_BAUD_RATES and rate <= self.max_baud
+            self._reply(format_frame("BAUD", [rate, 1 if ok else 0]).encode('ascii'))
+            if ok:
+                old = self.tx.byte_time
+                self.tx.byte_time = 10.0 / rate if self.tx.byte_time else 0.0
+                print(f"[EMU] Baud -> {rate}, waiting for #BAUDOK")
+                def revert():
+                    print("[EMU] No #BAUDOK, reverting baud rate")
+                    self.tx.byte_time = old
+                self.baud_timer = threading.Timer(BAUD_CONFIRM_TIMEOUT, revert)
+                self.baud_timer.daemon = True
+                self.baud_timer.start()
+        elif cmd == "DELTA" and len(args) > 1:
+            with self.frame_lock:
+                self.delta = args[1] == '1'
+                self.encoder = FrameEncoder()   # Next frame is a keyframe
+                self.tx.write(format_frame("DELTA", [args[1]]).encode('ascii'))
+        elif cmd == "BAUDOK" and self.baud_timer:
+            self.baud_timer.cancel()
+            self.baud_timer = None
+
+    def run(self, matches=None):
+        return self.engine.run(matches)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PTY-based PIC18F emulator")
+    parser.add_argument("--baud", type=int, default=BAUD_RATE, help="Line rate (0 = unpaced)")
+    parser.add_argument("--scenario", default=SIM_SCENARIO, help="Simulation scenario name or .json file")
+    parser.add_argument("--speed", type=float, default=SIM_SPEED, help="Game speed (0 = max)")
+    parser.add_argument("--seed", type=int, default=SIM_SEED)
+    parser.add_argument("--link", default="/tmp/ttyMCU0", help="Stable symlink to the emulated port")
+    parser.add_argument("--max-baud", type=int, default=max(MCU_BAUD_RATES),
+                        help="Highest rate accepted via #BAUD (0 = legacy firmware, no commands)")
+    parser.add_argument("--replug-every", type=float, default=0, help="Simulate USB replug every N seconds")
+    args = parser.parse_args()
+
+    emu = McuEmulator(args.baud, args.scenario, args.speed, args.seed, args.link, args.max_baud)
+    if args.replug_every:
+        def replugger():
+            while True:
+                time.sleep(args.replug_every)
+                print("[EMU] Replug")
+                emu.replug()
+        threading.Thread(target=replugger, daemon=True).start()
+    try:
+        emu.run()
+    except KeyboardInterrupt:
+        print(f"[EMU] {emu.frames_sent} frames, {emu.tx.bytes_sent} bytes sent")
+    finally:
+        emu.close()
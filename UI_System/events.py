@@ -0,0 +1,143 @@
+import time
+from collections import defaultdict, deque, namedtuple
+from config import *
+from logs import get_logger
+
+log = get_logger("events")
+
+# ==========================================
+#   GAME EVENTS
+# ==========================================
+# One event per semantic change, produced once per received packet.
+#   type    one of the constants below
+#   scene   scene of the packet that caused it
+#   player  1 / 2, or None if not player specific
+#   value   event specific (cell, hole, locked number, ...)
+#   stamp   time.time() of the packet (for latency statistics)
+GameEvent = namedtuple("GameEvent", "type scene player value stamp")
+
+SCENE_ENTERED  = "scene_entered"    # value: scene
+PLAYER_READY   = "player_ready"     # HINT ready button
+CURSOR_MOVED   = "cursor_moved"     # value: TTT cell 0-8
+PIECE_PLACED   = "piece_placed"     # value: TTT cell 0-8
+ROLL_STARTED   = "roll_started"     # REACT counter starts rolling
+VALUE_LOCKED   = "value_locked"     # value: locked REACT number
+MOLE_SPAWNED   = "mole_spawned"     # value: hole 0-8
+MOLE_HIT       = "mole_hit"         # value: hole 0-8
+MISS           = "miss"             # value: hole 0-8 of a wrong key, None on timeout
+MATCH_FINISHED = "match_finished"   # value: (winner, p1_wins, p2_wins) strings
+
+# ==========================================
+#   EVENT BUS
+# ==========================================
+class EventBus:
+    """
+    In-process pub/sub. Handlers subscribed normally run on the publishing
+    (packet) thread and must return quickly, e.g. starting a sound.
+    Handlers subscribed with deferred=True are queued and run by dispatch()
+    on the render thread (drawing, file I/O). Nothing runs while no packet
+    changes anything.
+    """
+    def __init__(self):
+        self.handlers = defaultdict(list)
+        self.deferred = defaultdict(list)
+        self.pending = deque()
+        self.published = 0
+
+    def subscribe(self, event_type, handler, deferred=False):
+        (self.deferred if deferred else self.handlers)[event_type].append(handler)
+
+    def publish(self, event):
+        self.published += 1
+        for handler in self.handlers.get(event.type, ()):
+            try: handler(event)
+            except Exception as e: log.warning("Event handler failed (%s): %s", event.type, e)
+        if event.type in self.deferred:
+            self.pending.append(event)
+
+    def dispatch(self):
+        """Runs deferred handlers for everything published since the last call."""
+        while self.pending:
+            event = self.pending.popleft()
+            for handler in self.deferred[event.type]:
+                try: handler(event)
+                except Exception as e: log.warning("Event handler failed (%s): %s", event.type, e)
+
+bus = EventBus()
+
+# ==========================================
+#   STATE DIFF ENGINE
+# ==========================================
+def _active_player(s1, s2):
+    return 1 if s1 == '1' else 2 if s2 == '1' else None
+
+class StateDiffer:
+    """
+    Packet listener that compares each packet with the previous one of the
+    same scene and publishes the resulting GameEvents on `bus`.
+    The first packet after a scene change only sets the baseline, so
+    joining mid-game doesn't replay moves that happened before.
+    """
+    def __init__(self, event_bus=bus):
+        self.bus = event_bus
+        self.scene = None
+        self.prev = None
+        self.stamp = 0.0
+
+    def on_packet(self, scene, data):
+        self.stamp = time.time()
+        prev = self.prev if scene == self.scene else None
+        if scene != self.scene:
+            self.scene = scene
+            self._emit(SCENE_ENTERED, None, scene)
+        diff = getattr(self, f"_diff_{scene.lower()}", None)
+        if diff:
+            try: diff(prev, data)
+            except (ValueError, IndexError): pass   # Malformed packet: no events
+        self.prev = data
+
+    def _emit(self, event_type, player, value):
+        self.bus.publish(GameEvent(event_type, self.scene, player, value, self.stamp))
+
+    # --- Per-scene rules ---
+    def _diff_hint(self, prev, data):
+        # A button already pressed when HINT starts still counts (firmware
+        # sends HINT,<game>,0,0 first; a lost first packet shouldn't eat the sound)
+        old = prev if prev is not None else ['', '0', '0']
+        for player in (1, 2):
+            if data[player] == '1' and old[player] == '0':
+                self._emit(PLAYER_READY, player, None)
+
+    def _diff_ttt(self, prev, data):
+        if prev is None or len(data) < 12: return
+        cursor = int(data[11])
+        if data[10] == '0' and cursor != int(prev[11]) and cursor != -1:
+            self._emit(CURSOR_MOVED, int(data[9]), cursor)
+        for cell in range(9):
+            if data[cell] != prev[cell] and data[cell] in ('1', '2'):
+                self._emit(PIECE_PLACED, int(data[cell]), cell)
+
+    def _diff_react(self, prev, data):
+        if prev is None or len(data) < 9: return
+        for player, idx in ((1, 7), (2, 8)):
+            if prev[idx] == '0' and data[idx] == '1':
+                self._emit(ROLL_STARTED, player, None)
+            elif prev[idx] == '1' and data[idx] == '2':
+                self._emit(VALUE_LOCKED, player, int(data[player]))
+
+    def _diff_wam(self, prev, data):
+        if len(data) < 18: return
+        player = _active_player(data[7], data[8])
+        # Hit/Miss flags mark "happened this tick": every packet counts
+        if data[3] == '1':
+            self._emit(MOLE_HIT, player, int(data[2]) - 1 if data[2].isdigit() else None)
+        elif data[4] == '1':
+            self._emit(MISS, player, int(data[2]) - 1 if data[2].isdigit() else None)
+        if prev is None: return
+        for hole in range(9):
+            if data[9 + hole] == '1' and prev[9 + hole] != '1':
+                self._emit(MOLE_SPAWNED, None, hole)
+
+    def _diff_end(self, prev, data):
+        if prev is None and len(data) >= 3:
+            self._emit(MATCH_FINISHED, None, (data[0], data[1], data[2]))
@@ -0,0 +1,78 @@
+import os
+import json
+import time
+import pygame
+from config import *
+from logs import get_logger
+
+log = get_logger("fonts")
+
+# ==========================================
+#   FONT SUBSYSTEM
+# ==========================================
+# SysFont("consolas") makes pygame scan every installed font (fc-list on
+# Linux) on first use, and on most kiosks Consolas isn't there anyway, so
+# startup was slow and glyph metrics differed per machine. Resolution order:
+#  1. Bundled TTF (FONT_FILE), identical everywhere
+#  2. System font path remembered in FONT_CACHE_FILE (no scan)
+#  3. One system font scan, result written to FONT_CACHE_FILE
+#  4. pygame's built-in default font
+
+_fonts = {}
+_resolved = {}   # name -> path (None = pygame default)
+stats = {"source": None, "resolve_ms": 0.0, "preload_ms": 0.0, "fonts": 0}
+
+def _load_cache(path=FONT_CACHE_FILE):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_cache(cache, path=FONT_CACHE_FILE):
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+    except OSError as e:
+        log.warning(f"Failed to cache font path: {e}")
+
+def resolve_font(name="consolas"):
+    """Returns the TTF path used for `name` (None = pygame default font)."""
+    if name in _resolved: return _resolved[name]
+    t0 = time.perf_counter()
+    if FONT_FILE and os.path.exists(FONT_FILE):
+        path, source = FONT_FILE, "bundled"
+    else:
+        cache = _load_cache()
+        if name in cache and (cache[name] is None or os.path.exists(cache[name])):
+            path, source = cache[name], "cached"
+        else:
+            path = pygame.font.match_font(name, bold=True)   # Slow: scans system fonts
+            source = "system scan"
+            cache[name] = path
+            _save_cache(cache)
+        if path is None:
+            log.warning(f"Font '{name}' not found, using pygame default")
+    _resolved[name] = path
+    stats["source"] = source if path else "default"
+    stats["resolve_ms"] += (time.perf_counter() - t0) * 1000
+    return path
+
+def get_font(name, size):
+    """Loads font with caching (one Font object per name and size)."""
+    key = (name, size)
+    if key not in _fonts:
+        path = resolve_font(name)
+        try:
+            _fonts[key] = pygame.font.Font(path, size)
+        except (OSError, pygame.error):
+            _fonts[key] = pygame.font.Font(None, size)
+        stats["fonts"] += 1
+    return _fonts[key]
+
+def preload(sizes=FONT_PRELOAD_SIZES, name="consolas"):
+    """Opens every size the scenes use in one batch, before the first frame."""
+    t0 = time.perf_counter()
+    for size in sizes:
+        get_font(name, size)
+    stats["preload_ms"] = (time.perf_counter() - t0) * 1000
@@ -0,0 +1,291 @@
+import os
+import time
+import zlib
+import glob
+import queue
+import shutil
+import random
+import argparse
+import subprocess
+import threading
+import multiprocessing
+from types import SimpleNamespace
+import pygame
+from config import *
+from protocol import parse_frame, format_frame, FrameDecoder
+
+# ==========================================
+#   PACKET LOGS
+# ==========================================
+# One frame per line, prefixed with its arrival time in seconds:
+#   12.3400 $TTT,1,0,2,0,0,0,0,0,0,1,0,4*
+# Written by PacketRecorder (python main.py --record match.log) or by
+# --sim-logs below. Delta frames ($=/$~) are decoded like on the link.
+# Header lines carry what the packets don't say, e.g. the TTT rule set
+# (the simulator plays classic, the firmware 'three'):
+#   # ttt_rules=classic
+_wall_clock = time.perf_counter   # Real time, before a render worker swaps the clocks
+
+def format_header(ttt_rules):
+    return f"# ttt_rules={ttt_rules}\n"
+
+class PacketRecorder:
+    """
+    Packet listener that appends every packet to a timestamped log. The
+    reader thread only stamps and queues the line; a writer thread does the
+    file I/O, so a slow disk never delays the serial link.
+    """
+    def __init__(self, path, ttt_rules=TTT_RULES):
+        self.file = open(path, 'w', encoding='utf-8')
+        self.file.write(format_header(ttt_rules))
+        self.t0 = time.perf_counter()
+        self.queue = queue.Queue()   # Unbounded: a recording keeps every packet
+        self.thread = threading.Thread(target=self._writer, daemon=True)
+        self.thread.start()
+
+    def on_packet(self, scene, data):
+        """Reader thread: stamps the arrival and hands the line over, never blocks."""
+        self.queue.put_nowait(f"{time.perf_counter() - self.t0:.4f} {format_frame(scene, data).strip()}\n")
+
+    def _writer(self):
+        while True:
+            line = self.queue.get()
+            if line is None: break
+            self.file.write(line)
+
+    def close(self):
+        """Writes what is still queued, then closes the log."""
+        self.queue.put(None)
+        self.thread.join()
+        self.file.close()
+
+def read_log_header(path):
+    """Returns the log's '# key=value' header lines as a dict."""
+    header = {}
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if not line.startswith('#'): break
+            key, _, value = line[1:].strip().partition('=')
+            if value: header[key.strip()] = value.strip()
+    return header
+
+def read_log(path):
+    """Returns [(t, scene, data)] sorted by time. Malformed lines are skipped."""
+    decoder = FrameDecoder()
+    packets = []
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            stamp, _, frame = line.strip().partition(' ')
+            parsed = parse_frame(frame)
+            if not parsed: continue
+            try:
+                t = float(stamp)
+            except ValueError:
+                continue
+            packet = decoder.decode(*parsed)
+            if packet: packets.append((t, packet[0], packet[1]))
+    packets.sort(key=lambda p: p[0])
+    return packets
+
+def write_sim_logs(out_dir, count, scenario="random", seed=1):
+    """Writes `count` simulated matches as logs (virtual clock, no waiting)."""
+    from simulation import SimulationEngine
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = os.path.join(out_dir, f"match_{i:03d}.log")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(format_header("classic"))   # The simulator plays classic TTT
+            engine = SimulationEngine(None, scenario, speed=0, seed=seed + i)
+            engine.sink = lambda scene, data: f.write(f"{engine.clock.now:.4f} {format_frame(scene, data).strip()}\n")
+            engine.run(matches=1)
+        paths.append(path)
+    print(f"[RENDER] Wrote {count} simulated logs to {out_dir}")
+    return paths
+
+# ==========================================
+#   RENDER WORKER (ONE PROCESS PER CPU)
+# ==========================================
+# Every animation in scenes.py/managers.py reads pygame.time.get_ticks(),
+# time.perf_counter() or time.time(). A worker process only renders, so it
+# points those at the log's clock: frames advance by exactly 1/fps no matter
+# how long they take to draw, and the output is the same on every machine.
+class RenderClock:
+    def __init__(self):
+        self.now = 0.0
+        self.epoch = time.time()
+
+    def install(self):
+        time.perf_counter = lambda: self.now
+        time.time = lambda: self.epoch + self.now
+        pygame.time.get_ticks = lambda: int(self.now * 1000)
+
+_worker = None
+
+def _init_worker(tier):
+    """Pool initializer: one display, font set and clock per process."""
+    global _worker
+    import fonts
+    import ttt_analysis
+    from quality import governor
+    os.environ["SDL_VIDEODRIVER"] = "dummy"   # Headless: no window, no audio
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    fonts.preload()
+    ttt_analysis.load_tables(background=False)
+    governor.set_fixed(tier)
+    clock = RenderClock()
+    clock.install()
+    _worker = SimpleNamespace(screen=screen, clock=clock)
+
+class FrameSink:
+    """Writes frames as PNG files, raw RGB24 or an ffmpeg-encoded video."""
+    def __init__(self, fmt, out_dir, stem, size, fps):
+        self.fmt, self.size, self.frames = fmt, size, 0
+        if fmt == "png":
+            self.dir = os.path.join(out_dir, stem)
+            os.makedirs(self.dir, exist_ok=True)
+            self.path = os.path.join(self.dir, "frame_%05d.png")
+        elif fmt == "raw":
+            self.path = os.path.join(out_dir, f"{stem}.rgb")
+            self.out = open(self.path, 'wb')
+        else:
+            self.path = os.path.join(out_dir, f"{stem}.mp4")
+            self.proc = subprocess.Popen(
+                ["ffmpeg", "-loglevel", "error", "-y", "-f", "rawvideo", "-pix_fmt", "rgb24",
+                 "-s", f"{size[0]}x{size[1]}", "-r", str(fps), "-i", "-",
+                 "-pix_fmt", "yuv420p", self.path], stdin=subprocess.PIPE)
+            self.out = self.proc.stdin
+
+    def write(self, surface):
+        if surface.get_size() != self.size:
+            surface = pygame.transform.smoothscale(surface, self.size)
+        if self.fmt == "png":
+            pygame.image.save(surface, self.path % self.frames)
+        else:
+            self.out.write(pygame.image.tobytes(surface, "RGB"))
+        self.frames += 1
+
+    def close(self):
+        if self.fmt == "png": return
+        self.out.close()
+        if self.fmt == "ffmpeg": self.proc.wait()
+
+def render_log(job):
+    """
+    Replays one log through the live renderers at a fixed timestep.
+    TTT rules: `ttt_rules` if given, else the log header, else TTT_RULES.
+    Returns (log path, output path, frames, log seconds, wall seconds).
+    """
+    path, out_dir, fmt, fps, size, names, ttt_rules = job
+    from managers import BackgroundEffect
+    from events import EventBus, StateDiffer
+    from predict import StatePredictor
+    from scene_manager import SceneManager
+    import scenes
+
+    wall_start = _wall_clock()
+    screen, clock = _worker.screen, _worker.clock
+    clock.now = 0.0
+    stem = os.path.splitext(os.path.basename(path))[0]
+    random.seed(zlib.crc32(stem.encode()))   # Same stars every run
+
+    packets = read_log(path)
+    event_bus = EventBus()
+    differ = StateDiffer(event_bus)
+    predictor = StatePredictor()
+    popups = scenes.EventPopups()
+    popups.subscribe(event_bus)
+    bg_effect = BackgroundEffect(WIDTH, HEIGHT)
+    ttt_rules = ttt_rules or read_log_header(path).get("ttt_rules", TTT_RULES)
+    scene_mgr = SceneManager({"data_mgr": SimpleNamespace(p1_name=names[0], p2_name=names[1]),
+                              "ttt_rules": ttt_rules})
+    sink = FrameSink(fmt, out_dir, stem, size, fps)
+
+    shared_state.update(connected=False, link="LIVE", scene="WAITING", raw_data=[])
+    end = (packets[-1][0] if packets else 0.0) + HIGHLIGHT_TAIL
+    nxt, frame = 0, 0
+    while frame / fps <= end:
+        clock.now = frame / fps
+        # Packets that arrived up to this frame, in order
+        while nxt < len(packets) and packets[nxt][0] <= clock.now:
+            _, scene, data = packets[nxt]
+            shared_state["scene"], shared_state["raw_data"] = scene, data
+            shared_state["connected"] = True
+            differ.on_packet(scene, data)
+            predictor.on_packet(scene, data)
+            nxt += 1
+        event_bus.dispatch()
+
+        bg_effect.update()
+        bg_effect.draw(screen)
+        sc, dt = shared_state["scene"], shared_state["raw_data"]
+        scene_mgr.draw(screen, sc if shared_state["connected"] else "WAITING", predictor.predict(sc, dt))
+        popups.draw(screen)
+        for y in range(0, HEIGHT, 4):
+            pygame.draw.line(screen, (0,0,0,50), (0,y), (WIDTH,y), 1)
+        sink.write(screen)
+        frame += 1
+
+    sink.close()
+    return path, sink.path, sink.frames, end, _wall_clock() - wall_start
+
+# ==========================================
+#   BATCH (CLI)
+# ==========================================
+def render_all(paths, out_dir, fmt="raw", fps=HIGHLIGHT_FPS, scale=HIGHLIGHT_SCALE,
+               jobs=None, tier="full", names=("PLAYER 1", "PLAYER 2"), ttt_rules=None):
+    """Renders every log in parallel, one pygame instance per process."""
+    from quality import parse_tier
+    if fmt == "ffmpeg" and not shutil.which("ffmpeg"):
+        raise RuntimeError("ffmpeg not found; use --format raw or png")
+    os.makedirs(out_dir, exist_ok=True)
+    size = (int(WIDTH * scale) // 2 * 2, int(HEIGHT * scale) // 2 * 2)   # Even, for yuv420p
+    work = [(p, out_dir, fmt, fps, size, names, ttt_rules) for p in paths]
+    jobs = jobs or os.cpu_count() or 1
+
+    t0 = _wall_clock()
+    total_frames, total_log = 0, 0.0
+    pool = multiprocessing.Pool(min(jobs, len(work)), _init_worker, (parse_tier(tier),))
+    for path, out, frames, log_s, wall_s in pool.imap_unordered(render_log, work):
+        total_frames += frames
+        total_log += log_s
+        print(f"[RENDER] {os.path.basename(path)}: {frames} frames, "
+              f"{log_s:.1f}s of play in {wall_s:.1f}s -> {out}")
+    # close/join, not terminate: SDL turns the SIGTERM into a QUIT event
+    # and the worker would never exit
+    pool.close()
+    pool.join()
+    dt = _wall_clock() - t0
+    print(f"[RENDER] {len(work)} logs, {total_frames} frames in {dt:.1f}s with {min(jobs, len(work))} "
+          f"processes ({total_frames / dt:.0f} fps, {total_log / dt:.1f}x real time)")
+    if fmt == "raw":
+        print(f"[RENDER] Encode: ffmpeg -f rawvideo -pix_fmt rgb24 -s {size[0]}x{size[1]} "
+              f"-r {fps} -i <file>.rgb <file>.mp4")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline highlight renderer for packet logs")
+    parser.add_argument("logs", nargs="*", help="Timestamped packet logs (globs allowed)")
+    parser.add_argument("--out", default="highlights", help="Output directory")
+    parser.add_argument("--format", choices=("raw", "png", "ffmpeg"), default="raw",
+                        help="raw RGB24 stream, PNG sequence or MP4 via ffmpeg")
+    parser.add_argument("--fps", type=int, default=HIGHLIGHT_FPS)
+    parser.add_argument("--scale", type=float, default=HIGHLIGHT_SCALE, help="Output size relative to the screen")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: all CPUs)")
+    parser.add_argument("--quality", default="full", help="Effect tier: full, reduced or flat")
+    parser.add_argument("--p1", default="PLAYER 1")
+    parser.add_argument("--p2", default="PLAYER 2")
+    parser.add_argument("--ttt-rules", choices=("three", "classic"), default=None,
+                        help="TTT rule set (default: from the log header, else TTT_RULES)")
+    parser.add_argument("--sim-logs", type=int, metavar="N", help="Write N simulated match logs to --out first")
+    parser.add_argument("--scenario", default="random", help="Scenario for --sim-logs")
+    args = parser.parse_args()
+
+    paths = sorted(p for pattern in args.logs for p in glob.glob(pattern))
+    if args.sim_logs:
+        paths += write_sim_logs(os.path.join(args.out, "logs"), args.sim_logs, args.scenario)
+    if not paths:
+        parser.error("no logs given")
+    render_all(paths, args.out, args.format, args.fps, args.scale, args.jobs, args.quality,
+               (args.p1, args.p2), args.ttt_rules)
@@ -0,0 +1,108 @@
+import abc
+
+# ==========================================
+#   KEYFRAME / DELTA STATE MACHINE
+# ==========================================
+# Shared by the UART delta frames (protocol.FrameEncoder/FrameDecoder,
+# $=seq,... / $~seq,idx:val) and the spectator feed
+# (broadcast.DeltaEncoder/DeltaDecoder, K|seq|... / D|seq|...). Both send
+# a full keyframe on scene changes, field count changes and every
+# `keyframe_interval` frames, and only the changed fields in between; a
+# delta only applies on top of the frame with sequence number seq-1.
+# Subclasses only supply the framing:
+#
+#   encoder: format_keyframe(seq, scene, data) / format_delta(seq, scene, changes)
+#   decoder: parse the frame, then keyframe(seq, scene, data) / delta(seq, changes)
+#
+# `changes` are "<idx>:<value>" strings. seq wraps at `seq_mod` (None: never).
+
+class KeyframeEncoder(abc.ABC):
+    """Keyframe/delta decisions and sequence numbers for one outgoing stream."""
+    def __init__(self, keyframe_interval, seq_mod=None):
+        self.keyframe_interval = keyframe_interval
+        self.seq_mod = seq_mod
+        self.seq = -1
+        self.scene = None
+        self.data = []
+        self.since_keyframe = 0
+
+    def _next_seq(self):
+        self.seq = (self.seq + 1) % self.seq_mod if self.seq_mod else self.seq + 1
+        return self.seq
+
+    def encode(self, scene, data):
+        data = [str(x) for x in data]
+        if (scene != self.scene or len(data) != len(self.data)
+                or self.since_keyframe >= self.keyframe_interval - 1):
+            self.scene, self.data = scene, data
+            return self.keyframe()
+        changes = [f"{i}:{v}" for i, (v, old) in enumerate(zip(data, self.data)) if v != old]
+        self.since_keyframe += 1
+        self.data = data
+        return self.format_delta(self._next_seq(), scene, changes)
+
+    def keyframe(self):
+        """Re-sends the current state in full (#SYNC, idle heartbeats)."""
+        self.since_keyframe = 0
+        return self.format_keyframe(self._next_seq(), self.scene, self.data)
+
+    @abc.abstractmethod
+    def format_keyframe(self, seq, scene, data):
+        """The framed keyframe for `data` (a list of strings)."""
+
+    @abc.abstractmethod
+    def format_delta(self, seq, scene, changes):
+        """The framed delta for `changes` ("<idx>:<value>" strings)."""
+
+class KeyframeDecoder:
+    """
+    Rebuilds full (scene, data) packets from keyframes and deltas. After a
+    sequence gap, deltas are dropped until the next keyframe; `lost` is
+    raised once per gap so the consumer can ask for one.
+    With `reorder` (datagrams, seq_mod None) deltas older than the current
+    frame are dropped as duplicates instead of counting as a gap.
+    """
+    reorder = False
+
+    def __init__(self, seq_mod=None):
+        self.seq_mod = seq_mod
+        self.seq = None
+        self.scene = None
+        self.data = []
+        self.lost = False      # Set on sync loss, cleared by the consumer
+        self.waiting = False   # Dropping deltas until the next keyframe
+        self.gaps = 0
+        self.keyframes = 0
+        self.deltas = 0
+
+    def keyframe(self, seq, scene, data):
+        self.seq, self.scene, self.data = seq, scene, list(data)
+        self.waiting = False
+        self.keyframes += 1
+        return self.scene, list(self.data)
+
+    def delta(self, seq, changes, scene=None):
+        """Applies "<idx>:<value>" changes; `scene`, if the framing carries it, must match."""
+        if self.seq is None:
+            return self._lose_sync()
+        if self.reorder and seq <= self.seq:
+            return None
+        expected = (self.seq + 1) % self.seq_mod if self.seq_mod else self.seq + 1
+        if seq != expected or (scene is not None and scene != self.scene):
+            return self._lose_sync()
+        try:
+            for change in changes:
+                idx, val = change.split(':', 1)
+                self.data[int(idx)] = val
+        except (ValueError, IndexError):
+            return self._lose_sync()
+        self.seq = seq
+        self.deltas += 1
+        return self.scene, list(self.data)
+
+    def _lose_sync(self):
+        if not self.waiting:
+            self.gaps += 1
+            self.lost = self.waiting = True
+        self.seq = None
+        return None
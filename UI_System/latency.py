@@ -0,0 +1,155 @@
+import json
+import time
+from collections import deque
+from config import *
+from logs import get_logger
+
+log = get_logger("trace")
+
+# ==========================================
+#   WIRE-TO-PHOTON LATENCY TRACER
+# ==========================================
+# Each packet is stamped at four points (time.perf_counter(), seconds):
+#   rx      - serial reader saw the first bytes waiting (±poll interval)
+#   parse   - frame decoded and handed to ingest_packet()
+#   consume - the first live frame that renders this packet starts drawing
+#   flip    - pygame.display.flip() returned for that frame
+# Packets overwritten before any frame picked them up are 'superseded';
+# packets that arrived while an instant replay was on screen are never
+# drawn live and only counted ('in_replay').
+
+STAGES = (("serial", "rx", "parse"), ("queue", "parse", "consume"),
+          ("render", "consume", "flip"), ("total", "rx", "flip"))
+
+# MCU timer fields per packet type: (index, sign). Only fields that run
+# monotonically through a round work as a clock: WAM Remaining_Time counts
+# down. REACT Time_Tick restarts on every roll, so REACT has no mcu_jitter.
+MCU_TICK_FIELDS = {"WAM": (5, -1)}
+MCU_TICK_SEC = 0.0001
+
+def percentile(values, p):
+    if not values: return 0.0
+    s = sorted(values)
+    return s[min(len(s) - 1, int(p / 100.0 * len(s)))]
+
+class LatencyTracer:
+    """
+    Collects per-packet stage timestamps and reports distributions per
+    packet type. Registered as a packet listener; the main loop calls
+    frame_begin() / frame_end() around every frame and consume(seq) right
+    before it renders the live picture.
+    """
+    def __init__(self, max_packets=TRACE_MAX_PACKETS):
+        self.packets = deque(maxlen=max_packets)
+        self.frames = deque(maxlen=max_packets)
+        self.pending = deque()    # Parsed, not yet on screen (reader -> main thread)
+        self.in_frame = []        # Consumed by the frame being drawn
+        self.superseded = {}
+        self.in_replay = {}
+        self.consumed = False
+        self.last_mcu = {}        # scene -> (mcu_tick, rx)
+        self.frame_start = 0.0
+
+    def on_packet(self, scene, data):
+        """Packet listener: runs on the reader thread right after parsing."""
+        now = time.perf_counter()
+        rec = {"seq": shared_state["seq"], "type": scene, "parse": now,
+               "rx": shared_state.get("rx_time") or now}
+        self._correlate(rec, data)
+        self.pending.append(rec)
+
+    def _correlate(self, rec, data):
+        """Host-vs-MCU clock: jitter = host arrival delta - MCU tick delta."""
+        field = MCU_TICK_FIELDS.get(rec["type"])
+        if not field or len(data) <= field[0]: return
+        try: tick = int(data[field[0]]) * field[1]
+        except ValueError: return
+        prev = self.last_mcu.get(rec["type"])
+        self.last_mcu[rec["type"]] = (tick, rec["rx"])
+        if prev:
+            mcu_dt = (tick - prev[0]) * MCU_TICK_SEC
+            if 0 < mcu_dt < 1.0:  # Skip counter resets and round changes
+                rec["jitter"] = (rec["rx"] - prev[1]) - mcu_dt
+
+    def _drain(self, upto=None):
+        """Pops pending records, only those with seq <= `upto` if given."""
+        pending = []
+        while self.pending and (upto is None or self.pending[0]["seq"] <= upto):
+            pending.append(self.pending.popleft())
+        return pending
+
+    def frame_begin(self):
+        self.frame_start = time.perf_counter()
+        self.consumed = False
+
+    def consume(self, seq):
+        """
+        The live picture is drawn this frame (not a replay) from the packet
+        with sequence number `seq`, read together with the frame's
+        scene/data. Later packets stay pending for the next frame.
+        """
+        self.consumed = True
+        pending = self._drain(seq)
+        if not pending: return
+        # Only the newest packet is actually drawn this frame
+        for rec in pending[:-1]:
+            self.superseded[rec["type"]] = self.superseded.get(rec["type"], 0) + 1
+        pending[-1]["consume"] = time.perf_counter()
+        self.in_frame.append(pending[-1])
+
+    def frame_end(self):
+        now = time.perf_counter()
+        self.frames.append((self.frame_start, now))
+        if not self.consumed:
+            for rec in self._drain():
+                self.in_replay[rec["type"]] = self.in_replay.get(rec["type"], 0) + 1
+        for rec in self.in_frame:
+            rec["flip"] = now
+            self.packets.append(rec)
+        self.in_frame = []
+
+    # --- Reporting ---
+    def report(self):
+        """Returns {type: {stage: (p50, p90, p99, max) in ms}} plus counts."""
+        by_type = {}
+        for rec in self.packets:
+            by_type.setdefault(rec["type"], []).append(rec)
+        out = {}
+        for scene, recs in by_type.items():
+            row = {"count": len(recs), "superseded": self.superseded.get(scene, 0),
+                   "in_replay": self.in_replay.get(scene, 0)}
+            for name, a, b in STAGES:
+                ms = [(r[b] - r[a]) * 1000 for r in recs]
+                row[name] = tuple(round(percentile(ms, p), 2) for p in (50, 90, 99, 100))
+            jit = [abs(r["jitter"]) * 1000 for r in recs if "jitter" in r]
+            if jit: row["mcu_jitter"] = tuple(round(percentile(jit, p), 2) for p in (50, 90, 99, 100))
+            out[scene] = row
+        return out
+
+    def print_report(self):
+        log.info("Latency (ms) p50 / p90 / p99 / max")
+        for scene, row in sorted(self.report().items()):
+            log.info(f"{scene:<6} n={row['count']} superseded={row['superseded']} in_replay={row['in_replay']}")
+            for name in [s[0] for s in STAGES] + ["mcu_jitter"]:
+                if name in row:
+                    log.info(f"  {name:<10} " + " / ".join(f"{v:7.2f}" for v in row[name]))
+        log.info(f"mcu_jitter only for {', '.join(MCU_TICK_FIELDS)} (REACT Time_Tick restarts every roll)")
+
+    def export_chrome_trace(self, path):
+        """Writes a Chrome trace (chrome://tracing, Perfetto) of the retained window."""
+        events = [{"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+                  for tid, name in enumerate(["frames"] + [s[0] for s in STAGES[:3]])]
+        us = lambda t: round(t * 1e6, 1)
+        for start, end in self.frames:
+            events.append({"name": "frame", "ph": "X", "pid": 1, "tid": 0,
+                           "ts": us(start), "dur": us(end - start)})
+        for rec in self.packets:
+            args = {"seq": rec["seq"]}
+            if "jitter" in rec: args["mcu_jitter_ms"] = round(rec["jitter"] * 1000, 3)
+            for tid, (name, a, b) in enumerate(STAGES[:3], start=1):
+                events.append({"name": f"{rec['type']} #{rec['seq']}", "cat": name, "ph": "X",
+                               "pid": 1, "tid": tid, "ts": us(rec[a]), "dur": us(rec[b] - rec[a]),
+                               "args": args})
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        log.info(f"Wrote {len(events)} events to {path}")
@@ -0,0 +1,38 @@
+from config import *
+
+# ==========================================
+#   LAYOUT SCALE
+# ==========================================
+# Scenes and overlays are laid out in LAYOUT_SIZE (1300x800) coordinates.
+# On another canvas (CANVAS_SIZE, --canvas) positions scale by
+# WIDTH/1300 and HEIGHT/800, sizes (fonts, radii, line widths) by the
+# smaller of the two so nothing overflows on a wider or taller canvas:
+#
+#   draw_cyber_box(surface, rect(LAYOUT_W//2 - 350, 50, 700, 100), ...)
+#   draw_glow_text(surface, text, 50, col, pt(LAYOUT_W//2, 100))   # Text helpers scale sizes themselves
+#
+# At the default canvas every helper returns its input unchanged. Read at
+# import: main.py applies --canvas before importing anything that draws.
+
+LAYOUT_W, LAYOUT_H = LAYOUT_SIZE
+SCALE_X, SCALE_Y = WIDTH / LAYOUT_W, HEIGHT / LAYOUT_H
+SCALE = min(SCALE_X, SCALE_Y)
+
+def sx(x):
+    """Layout x (or width) -> canvas pixels."""
+    return round(x * SCALE_X)
+
+def sy(y):
+    """Layout y (or height) -> canvas pixels."""
+    return round(y * SCALE_Y)
+
+def ss(size):
+    """Layout size (font, radius, line width, square side) -> canvas pixels, at least 1."""
+    return max(1, round(size * SCALE))
+
+def pt(x, y):
+    return sx(x), sy(y)
+
+def rect(x, y, w, h):
+    """Layout rect -> canvas rect; edges scale, so adjacent rects still meet."""
+    return sx(x), sy(y), sx(x + w) - sx(x), sy(y + h) - sy(y)
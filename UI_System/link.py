@@ -0,0 +1,203 @@
+import os
+import glob
+import time
+import threading
+import select
+import ctypes
+import ctypes.util
+import serial
+from config import *
+from protocol import FrameSplitter, FrameDecoder
+from discovery import discover_link
+from commands import CommandChannel, REPLY_SCENES
+from logs import get_logger
+
+log = get_logger("link")
+
+# ==========================================
+#   LINK STATES
+# ==========================================
+# DISCONNECTED: no serial port open (cable out, adapter missing)
+# STALLED:      port open but no packet for LINK_STALE_TIMEOUT seconds
+#               (hung firmware, brown-out). Last frame stays on screen.
+# LIVE:         packets are arriving
+LINK_DISCONNECTED, LINK_STALLED, LINK_LIVE = "DISCONNECTED", "STALLED", "LIVE"
+
+def set_link_state(state):
+    if shared_state["link"] != state:
+        log.info(f"{shared_state['link']} -> {state}")
+    shared_state["link"] = state
+    shared_state["connected"] = state != LINK_DISCONNECTED
+
+# ==========================================
+#   HOTPLUG WATCHER
+# ==========================================
+IN_ATTRIB, IN_CREATE, IN_DELETE, IN_MOVED_TO = 0x004, 0x100, 0x200, 0x080
+IN_NONBLOCK, IN_CLOEXEC = 0o4000, 0o2000000
+
+class DeviceWatcher:
+    """
+    Wakes up as soon as a device node appears, changes or disappears in the
+    watched directories. Uses inotify on Linux; elsewhere wait() simply
+    sleeps for the timeout (plain polling).
+    """
+    def __init__(self, dirs):
+        self.fd = None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0: return
+            mask = IN_CREATE | IN_DELETE | IN_ATTRIB | IN_MOVED_TO
+            for d in set(dirs):
+                if os.path.isdir(d):
+                    libc.inotify_add_watch(fd, d.encode(), mask)
+            self.fd = fd
+        except (OSError, AttributeError, TypeError):
+            self.fd = None  # No inotify (Windows/macOS)
+
+    def wait(self, timeout):
+        """Blocks until a device event or timeout. Returns True on event."""
+        if self.fd is None:
+            time.sleep(timeout)
+            return False
+        ready = select.select([self.fd], [], [], timeout)[0]
+        if ready:
+            try:
+                while os.read(self.fd, 4096): pass   # Drain queued events
+            except BlockingIOError:
+                pass
+        return bool(ready)
+
+# ==========================================
+#   FRAME READER
+# ==========================================
+class FrameReader:
+    """
+    Everything between ser.read() and the packet sink: splits the bytes
+    into frames, routes command replies, rebuilds keyframes/deltas and
+    asks for a keyframe after a sequence gap. bench_ingest.py drives the
+    same object without a port (commands=None).
+    """
+    def __init__(self, sink, commands=None):
+        self.sink = sink
+        self.commands = commands
+        self.splitter = FrameSplitter()
+        self.decoder = FrameDecoder()
+
+    def feed(self, chunk, rx_time=None):
+        """Processes one read; returns the number of game frames in it."""
+        state_frames = 0
+        for scene, fields in self.splitter.feed(chunk):
+            if scene in REPLY_SCENES:
+                if self.commands: self.commands.on_reply(scene, fields)
+                continue
+            state_frames += 1
+            if self.commands: self.commands.on_frame()
+            # Rebuild full packets from keyframes/deltas
+            packet = self.decoder.decode(scene, fields)
+            if self.decoder.lost:
+                # Sequence gap: ask for a keyframe instead of waiting for the next one
+                self.decoder.lost = False
+                if self.commands: self.commands.request_full_state()
+            if packet is None: continue
+            try: self.sink(*packet, rx_time=rx_time)
+            except Exception as e: log.warning("Packet handler failed: %s", e)
+        return state_frames
+
+# ==========================================
+#   LINK SUPERVISOR
+# ==========================================
+class LinkSupervisor:
+    """
+    Owns the UART link: (re)connects, reads frames into `sink`, and runs the
+    staleness watchdog. Instead of retrying on a fixed 1 s timer it waits on
+    hotplug events, so a replugged adapter is back within milliseconds.
+    """
+    def __init__(self, sink, port=SERIAL_PORT, baud=BAUD_RATE, stale_timeout=LINK_STALE_TIMEOUT):
+        self.sink = sink
+        self.port, self.baud = port, baud
+        self.stale_timeout = stale_timeout
+        # A pattern (--port '/tmp/ttyMCU*') is auto-discovery over that pattern too
+        self.patterns = list(PROBE_PATTERNS)
+        if glob.has_magic(port):
+            self.patterns.append(port)
+            self.port = 'AUTO'
+        dirs = [os.path.dirname(p) for p in self.patterns]
+        if self.port != 'AUTO':
+            dirs.append(os.path.dirname(os.path.abspath(port)))
+        self.watcher = DeviceWatcher(dirs)
+        self.reconnects = 0
+        self.commands = None
+        self.decoder = None
+
+    def _resolve(self):
+        if self.port == 'AUTO':
+            return discover_link(patterns=self.patterns)
+        if os.name == 'posix' and not os.path.exists(self.port):
+            return None
+        return self.port, self.baud
+
+    def run(self):
+        set_link_state(LINK_DISCONNECTED)
+        while True:
+            link = self._resolve()
+            if link:
+                try:
+                    ser = serial.Serial(link[0], link[1], timeout=0.5)
+                except (serial.SerialException, OSError, ValueError):
+                    ser = None  # Node exists but isn't usable yet (e.g. udev chmod pending)
+                if ser:
+                    try:
+                        self._serve(ser, *link)
+                    except (serial.SerialException, OSError) as e:
+                        log.warning("Lost: %s", e)
+                    set_link_state(LINK_DISCONNECTED)
+                    self.reconnects += 1
+                    continue  # The replacement node may already be there
+            # Sleep until a device node changes (or the fallback retry interval)
+            self.watcher.wait(LINK_RETRY_INTERVAL)
+
+    def _handshake(self, commands):
+        """Runs on its own thread: replies arrive through the reader loop."""
+        rtt = commands.ping()
+        if rtt is None:
+            log.info("No PONG: firmware without command support")
+            return
+        log.info(f"Round trip {rtt * 1000:.1f} ms")
+        if BAUD_UPGRADE_RATES: commands.negotiate()
+        if UART_DELTA and commands.enable_delta():
+            log.info("Delta frames enabled")
+
+    def _serve(self, ser, port, baud):
+        device = os.path.realpath(port)
+        try:
+            log.info(f"Link Established: {port} @ {baud}")
+            # LIVE only once a frame parses (below): an open port may still be silent
+            last_rx = time.perf_counter()
+            # Resync at once instead of waiting for the next natural packet
+            commands = self.commands = CommandChannel(ser)
+            reader = FrameReader(self.sink, commands)
+            self.decoder = reader.decoder
+            commands.request_full_state()
+            threading.Thread(target=self._handshake, args=(commands,), daemon=True).start()
+            while True:
+                waiting = ser.in_waiting
+                if waiting:
+                    rx_time = time.perf_counter()
+                    if reader.feed(ser.read(waiting), rx_time):
+                        last_rx = rx_time
+                        if shared_state["link"] != LINK_LIVE: set_link_state(LINK_LIVE)
+                else:
+                    # Idle: wait for data (5 ms) but wake up on hotplug events
+                    hotplug = self.watcher.wait(0.005)
+                    # Watchdog: firmware re-sends HINT/END and game state continuously
+                    stale = time.perf_counter() - last_rx > self.stale_timeout
+                    if stale and shared_state["link"] != LINK_STALLED:
+                        set_link_state(LINK_STALLED)
+                    # A vanished (or re-pointed) device node means unplugged,
+                    # even if reads didn't fail yet
+                    if (hotplug or stale) and os.name == 'posix':
+                        if not os.path.exists(device) or os.path.realpath(port) != device:
+                            return
+        finally:
+            ser.close()
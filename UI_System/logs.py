@@ -0,0 +1,141 @@
+import sys
+import time
+import queue
+import threading
+import logging
+import logging.handlers
+from collections import OrderedDict
+from config import *
+
+# ==========================================
+#   LOGGING
+# ==========================================
+# print() blocks the calling thread when stdout is slow (journald
+# backpressure, a stuck SSH console), and the callers are the render loop
+# and the serial reader. Every module logs through get_logger(<subsystem>)
+# instead. After setup_logging() a record costs one put_nowait() into a
+# bounded queue; a listener thread writes the console and a rotating file.
+# If the queue is full the record is dropped (and counted), never waited on.
+#
+#   Console: [AUDIO] Mixer 44100 Hz ...       (WARNING and up: [WARN] / [ERR])
+#   File:    time  level  subsystem  seq=<packet>  frame=<frame>  message
+#
+# Before setup_logging() (tools, scripts) records go straight to stdout.
+
+ROOT = "pic"
+CONSOLE_FORMAT = logging.Formatter("[%(tag)s] %(message)s")
+FILE_FORMAT = logging.Formatter(
+    "%(asctime)s\t%(levelname)s\t%(subsystem)s\tseq=%(seq)d\tframe=%(frame)d\t%(message)s")
+TAGS = {logging.WARNING: "WARN", logging.ERROR: "ERR", logging.CRITICAL: "ERR"}
+
+def get_logger(subsystem):
+    return logging.getLogger(f"{ROOT}.{subsystem}")
+
+class ContextFilter(logging.Filter):
+    """Stamps subsystem, packet seq and frame number (in the calling thread)."""
+    def filter(self, record):
+        record.subsystem = record.name.rpartition('.')[2].upper()
+        record.tag = TAGS.get(record.levelno, record.subsystem)
+        record.seq = shared_state["seq"]
+        record.frame = shared_state["frame"]
+        return True
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets `burst` copies of the same warning through per `window` seconds.
+    The first one after a quiet window says how many were swallowed.
+    f-string messages make every record its own template, so only the
+    `max_keys` most recent templates are tracked (LRU).
+    """
+    def __init__(self, burst=LOG_RATE_BURST, window=LOG_RATE_WINDOW, max_keys=LOG_RATE_KEYS):
+        super().__init__()
+        self.burst, self.window = burst, window
+        self.max_keys = max_keys
+        self.seen = OrderedDict()   # (logger, template) -> [window start, count, suppressed]
+        # Handler.handle() filters before taking the handler lock, from every thread
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno < logging.WARNING: return True
+        key = (record.name, record.msg)
+        with self.lock:
+            return self._count(record, key, time.monotonic())
+
+    def _count(self, record, key, now):
+        entry = self.seen.get(key)
+        if entry is None or now - entry[0] > self.window:
+            if entry and entry[2]:
+                record.msg, record.args = f"{record.getMessage()} ({entry[2]} repeats suppressed)", None
+            self.seen[key] = [now, 1, 0]
+            self.seen.move_to_end(key)
+            if len(self.seen) > self.max_keys: self.seen.popitem(last=False)
+            return True
+        self.seen.move_to_end(key)
+        entry[1] += 1
+        if entry[1] <= self.burst: return True
+        entry[2] += 1
+        return False
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops instead of blocking when the queue is full."""
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+        self.limiter = RateLimitFilter()
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def _console_handler():
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(CONSOLE_FORMAT)
+    return handler
+
+_root = logging.getLogger(ROOT)
+_root.setLevel(logging.INFO)
+_root.propagate = False
+_direct = _console_handler()
+_direct.addFilter(ContextFilter())
+_direct.addFilter(RateLimitFilter())
+_root.addHandler(_direct)
+_queue_handler = None
+_listener = None
+
+def setup_logging(path=LOG_FILE, level=LOG_LEVEL):
+    """Switches all loggers to the queue + listener thread."""
+    global _queue_handler, _listener
+    if _listener: return
+    _queue_handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    _queue_handler.addFilter(ContextFilter())
+    _queue_handler.addFilter(_queue_handler.limiter)
+    targets = [_console_handler()]
+    if path:
+        try:
+            file_handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding='utf-8')
+            file_handler.setFormatter(FILE_FORMAT)
+            targets.append(file_handler)
+        except OSError as e:
+            print(f"[WARN] Log file {path} unavailable: {e}")
+    _root.setLevel(level)
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, *targets)
+    _listener.start()
+    _root.removeHandler(_direct)
+    _root.addHandler(_queue_handler)
+
+def shutdown_logging():
+    """Flushes the queue and stops the listener (call last on exit)."""
+    global _listener
+    if not _listener: return
+    for (name, template), (_, _, suppressed) in list(_queue_handler.limiter.seen.items()):
+        if suppressed: logging.getLogger(name).warning(f"'{template}': {suppressed} repeats suppressed")
+    dropped = _queue_handler.dropped
+    if dropped: get_logger("system").warning(f"{dropped} log records dropped (queue full)")
+    _listener.stop()
+    for handler in _listener.handlers: handler.close()
+    _listener = None
+    _root.removeHandler(_queue_handler)
+    _root.addHandler(_direct)
@@ -1,11 +1,58 @@
+import time
+STARTUP_T0 = time.perf_counter()   # Cold start is measured from here
 import pygame
 import threading
 import sys
 import argparse
+import config
+
+def parse_size(value):
+    """'WxH' -> (w, h)"""
+    return tuple(int(n) for n in value.lower().split('x'))
+
+def parse_canvas(value):
+    """'WxH', at least CANVAS_MIN (scenes scale down from their 1300x800 layout)."""
+    size = parse_size(value)
+    if len(size) != 2 or size[0] < config.CANVAS_MIN[0] or size[1] < config.CANVAS_MIN[1]:
+        raise argparse.ArgumentTypeError(f"canvas must be WxH, at least {config.CANVAS_MIN[0]}x{config.CANVAS_MIN[1]}")
+    return size
+
+# Every module copies WIDTH/HEIGHT at import time: apply --canvas first
+_pre = argparse.ArgumentParser(add_help=False)
+_pre.add_argument("--canvas", type=parse_canvas, default=config.CANVAS_SIZE)
+config.CANVAS_SIZE = config.WIDTH, config.HEIGHT = _pre.parse_known_args()[0].canvas
+
 from config import *
 from managers import BackgroundEffect, SoundManager, DataManager
-from workers import serial_worker, simulation_worker
+from workers import serial_worker, simulation_worker, packet_listeners
+from broadcast import Broadcaster, viewer_worker
+from latency import LatencyTracer
+from predict import StatePredictor
+from events import bus, StateDiffer, MATCH_FINISHED
 import scenes 
+from scene_manager import SceneManager, load_plugins
+from quality import governor, parse_tier, TIER_FLAT
+import fonts
+import ttt_analysis
+from analytics import LiveStats, StatsOverlay
+from replay import ReplayBuffer, ReplayPlayer
+from highlights import PacketRecorder
+from logs import get_logger, setup_logging, shutdown_logging
+from scheduler import IdleScheduler
+from compositor import LayerCompositor
+from bloom import bloom
+from display import RenderTarget, MODES
+
+log = get_logger("system")
+
+def print_cold_start(marks, t0):
+    """One line: time to first frame and where it went."""
+    phases, last = [], t0
+    for name, t in marks:
+        phases.append(f"{name} {(t - last) * 1000:.0f}")
+        last = t
+    log.info(f"Cold start: {(last - t0) * 1000:.0f} ms to first frame "
+          f"({', '.join(phases)} ms; font: {fonts.stats['source']})")
 
 def main():
     # 1. Parse Command Line Arguments
@@ -14,29 +61,129 @@ def main():
     parser.add_argument("--p1", default="PLAYER 1", help="Name of Player 1")
     parser.add_argument("--p2", default="PLAYER 2", help="Name of Player 2")
     parser.add_argument("--sim", action="store_true", help="Force Simulation Mode")
+    parser.add_argument("--hw", action="store_true", help="Force Hardware (UART) Mode")
+    parser.add_argument("--port", default=SERIAL_PORT, help="Serial port, or a pattern to auto-discover (e.g. emulator links '/tmp/ttyMCU*')")
+    parser.add_argument("--baud", type=int, default=BAUD_RATE, help="Serial baud rate")
+    parser.add_argument("--scenario", default=SIM_SCENARIO, help="Simulation scenario name or .json file")
+    parser.add_argument("--speed", type=float, default=SIM_SPEED, help="Simulation speed (0 = max)")
+    parser.add_argument("--seed", type=int, default=SIM_SEED, help="Simulation random seed")
+    parser.add_argument("--broadcast", action="store_true", help="Publish game state to spectator screens")
+    parser.add_argument("--view", action="store_true", help="Spectator Mode: render the broadcast feed")
+    parser.add_argument("--trace", metavar="FILE", help="Trace packet latency, write Chrome trace JSON on exit")
+    parser.add_argument("--record", metavar="FILE", help="Log every packet with its time (for highlights.py)")
+    parser.add_argument("--log", default=LOG_FILE, help="Rotating log file ('' = console only)")
+    parser.add_argument("--no-idle-gc", action="store_true", help="Leave Python's GC automatic (no idle-time collection)")
+    parser.add_argument("--render-threads", type=int, default=COMPOSITOR_THREADS,
+                        help="Threads for the background layer (default: one per spare core, 0 = serial)")
+    parser.add_argument("--display", choices=MODES, default=DISPLAY_MODE,
+                        help="native window, or scale the canvas: scaled (SDL), integer, smooth")
+    parser.add_argument("--window", type=parse_size, default=DISPLAY_SIZE, metavar="WxH",
+                        help="Window size for integer/smooth (default: fullscreen)")
+    parser.add_argument("--canvas", type=parse_canvas, default=CANVAS_SIZE, metavar="WxH",
+                        help="Internal resolution everything is drawn at (scenes scale to it)")
+    parser.add_argument("--quality", default=QUALITY, help="Effect tier: auto, full, reduced or flat")
     args = parser.parse_args()
+    setup_logging(args.log)  # From here on logging never blocks a frame
+    governor.set_fixed(parse_tier(args.quality))
     
     # 2. Initialize System
+    boot = [("imports", time.perf_counter())]
     pygame.init()
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    target = RenderTarget(args.display, args.window, canvas=args.canvas)
+    screen = target.canvas   # Everything draws at WIDTH x HEIGHT, whatever the display
     pygame.display.set_caption("PIC-18F CONTROL SYSTEM")
     clock = pygame.time.Clock()
+    boot.append(("display", time.perf_counter()))
+    fonts.preload()
+    boot.append(("fonts", time.perf_counter()))
     
     # Initialize Managers
     bg_effect = BackgroundEffect(WIDTH, HEIGHT)
     sound_mgr = SoundManager()
+    boot.append(("audio", time.perf_counter()))
     data_mgr = DataManager(args.p1, args.p2)
+    popups = scenes.EventPopups()
+    if target.native_hud: target.add_hud(popups.draw_native)
+    ttt_analysis.load_tables()   # From the cache file, or solved in the background
     
     # 3. Start Backend Thread
-    # Priority: Command Line Arg > Config File
-    is_sim_mode = args.sim or USE_SIMULATION
+    # Priority: Spectator Mode > Command Line Arg > Config File
+    is_sim_mode = args.sim or (USE_SIMULATION and not args.hw)
+
+    load_plugins()
+    scheduler = IdleScheduler(gc_control=IDLE_GC and not args.no_idle_gc)
+    # The simulator plays classic TTT (pieces never disappear)
+    ttt_rules = "classic" if is_sim_mode else TTT_RULES
+    scene_mgr = SceneManager({"data_mgr": data_mgr, "scheduler": scheduler, "ttt_rules": ttt_rules})
+    replay_buf = ReplayBuffer()
+    replay = ReplayPlayer(replay_buf)
+
+    # Background: own state only, rendered one frame ahead on a worker thread
+    def draw_background(surface):
+        bg_effect.update()
+        bg_effect.draw(surface)
+    compositor = LayerCompositor(threads=args.render_threads)
+    compositor.add("background", draw_background, z=-1)
     
-    if is_sim_mode:
-        t = threading.Thread(target=simulation_worker, daemon=True)
+    # Game events: diffed once per packet, consumers subscribe
+    packet_listeners.append(StateDiffer(bus).on_packet)
+    sound_mgr.subscribe(bus)
+    popups.subscribe(bus)
+    if not (args.view or is_sim_mode):
+        data_mgr.subscribe(bus, scheduler)  # Only real matches go into the history
+    if REPLAY_ON_END:
+        bus.subscribe(MATCH_FINISHED, lambda e: replay.active or replay.start(), deferred=True)
+    
+    if args.view:
+        t = threading.Thread(target=viewer_worker, daemon=True)
+    elif is_sim_mode:
+        t = threading.Thread(target=simulation_worker, args=(args.scenario, args.speed, args.seed), daemon=True)
     else:
-        t = threading.Thread(target=serial_worker, daemon=True)
+        t = threading.Thread(target=serial_worker, args=(args.port, args.baud), daemon=True)
+    
+    if args.broadcast and not args.view:
+        caster = Broadcaster()
+        caster.start()
+        packet_listeners.append(caster.publish)
+    
+    stats = LiveStats()
+    packet_listeners.append(stats.on_packet)
+    stats_overlay = StatsOverlay(stats)
+
+    predictor = None
+    if PREDICTION:
+        predictor = StatePredictor()
+        packet_listeners.append(predictor.on_packet)
+
+    recorder = None
+    if args.record:
+        recorder = PacketRecorder(args.record, ttt_rules)
+        packet_listeners.append(recorder.on_packet)
+
+    tracer = None
+    if args.trace:
+        tracer = LatencyTracer()
+        packet_listeners.append(tracer.on_packet)
     t.start()
+    scheduler.submit_steps("warm", scenes.warm_caches())
     
+    # Everything above the background, on the main thread (sc/dt: this frame's packet)
+    def draw_live(screen):
+        # Smooth timers/counters between packets (display only)
+        view = predictor.predict(sc, dt) if predictor else dt
+
+        # Scene Routing (registered Scene classes, see scene_manager.py)
+        scene_mgr.draw(screen, sc if shared_state["connected"] else "WAITING", view)
+        if not target.native_hud: popups.draw(screen)
+        stats_overlay.draw(screen, sc if shared_state["connected"] else "WAITING")
+
+        if shared_state["link"] == "STALLED": scenes.draw_link_stalled(screen)
+
+        # Scanlines Overlay
+        if governor.tier < TIER_FLAT:
+            for y in range(0, HEIGHT, 4):
+                pygame.draw.line(screen, (0,0,0,50), (0,y), (WIDTH,y), 1)
+
     # 4. Main Game Loop
     run = True
     while run:
@@ -44,39 +191,57 @@ def main():
         for e in pygame.event.get():
             if e.type == pygame.QUIT or (e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE):
                 run = False
-        
-        # Render Background
-        bg_effect.update()
-        bg_effect.draw(screen)
+            elif e.type == pygame.KEYDOWN:
+                if e.key == pygame.K_r: replay.toggle()
+                elif e.key == pygame.K_UP: replay.change_speed(+1)
+                elif e.key == pygame.K_DOWN: replay.change_speed(-1)
+                elif e.key == pygame.K_s: stats_overlay.toggle()
         
         # Get Current State
+        scheduler.frame_begin()
+        if tracer: tracer.frame_begin()
+        # seq first: ingest_packet() bumps it before publishing the data, so
+        # every packet up to seq is in (or older than) this frame's sc/dt
+        seq = shared_state["seq"]
         sc = shared_state["scene"]
         dt = shared_state["raw_data"]
         
-        # Update Sound Logic
-        sound_mgr.update(sc, dt, shared_state["last_update"])
-        
-        # Handle Data Persistence on Game Over
-        if sc == "END":
-            # Pass data to manager to save (implement debounce logic if needed)
-            pass 
-
-        # Scene Routing (Dispatch to scenes.py)
-        if not shared_state["connected"]: scenes.scene_waiting(screen)
-        elif sc == "START" or sc == "WAITING": scenes.scene_waiting(screen)
-        elif sc == "HINT": scenes.scene_hint(screen, dt)
-        elif sc == "TTT": scenes.scene_ttt(screen, dt)
-        elif sc == "REACT": scenes.scene_react(screen, dt)
-        elif sc == "WAM": scenes.scene_wam(screen, dt)
-        elif sc == "END": scenes.scene_end(screen, dt, data_mgr)
+        # Deferred event handlers (saving results, popups, replay trigger)
+        bus.dispatch()
         
-        # Scanlines Overlay
-        for y in range(0, HEIGHT, 4): 
-            pygame.draw.line(screen, (0,0,0,50), (0,y), (WIDTH,y), 1)
+        # Instant replay replaces the live picture; packets keep flowing
+        if replay.active: replay.draw(screen)
+        if not replay.active:
+            if tracer: tracer.consume(seq)   # Live frames only: replays don't draw new packets
+            compositor.compose(screen, draw_live)
+            replay_buf.capture(screen)
             
-        pygame.display.flip()
+        target.present(hud=not replay.active)   # No live popups over the replay
+        if tracer: tracer.frame_end()
+        if boot:
+            boot.append(("first frame", time.perf_counter()))
+            print_cold_start(boot, STARTUP_T0)
+            boot = None
+        shared_state["frame"] += 1
+        scheduler.run()   # Low-priority work and GC in what's left of the frame
         clock.tick(FPS)
+        if not replay.active:   # Replay frames are cheap, they'd skew the governor
+            # Render time without the FPS sleep and without idle work
+            governor.sample(clock.get_rawtime() / 1000.0 - scheduler.last_run)
 
+    sound_mgr.audio.print_report()
+    governor.print_report()
+    bloom.print_report()
+    target.print_report()
+    if recorder: recorder.close()
+    if tracer:
+        tracer.print_report()
+        tracer.export_chrome_trace(args.trace)
+    compositor.stop()
+    compositor.print_report()
+    scheduler.stop()
+    scheduler.print_report(shared_state["frame"])
+    shutdown_logging()
     pygame.quit()
     sys.exit()
 
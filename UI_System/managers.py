@@ -5,6 +5,14 @@ import random
 import math
 import time
 from config import *
+from audio import AudioEngine
+from events import *
+from quality import governor, TIER_REDUCED, TIER_FLAT, STAR_COUNT
+from logs import get_logger
+from layout import ss
+
+data_log = get_logger("data")
+audio_log = get_logger("audio")
 
 # ==========================================
 #   DATA MANAGER
@@ -13,10 +21,10 @@ class DataManager:
     """
     Handles data persistence. Saves game results to a CSV file.
     """
-    def __init__(self, p1_name="PLAYER 1", p2_name="PLAYER 2"):
+    def __init__(self, p1_name="PLAYER 1", p2_name="PLAYER 2", filename="game_history.csv"):
         self.p1_name = p1_name
         self.p2_name = p2_name
-        self.filename = "game_history.csv"
+        self.filename = filename
         self._init_file()
 
     def _init_file(self):
@@ -27,7 +35,15 @@ class DataManager:
                     writer = csv.writer(f)
                     writer.writerow(["Timestamp", "Winner", "P1_Name", "P2_Name", "P1_Score", "P2_Score"])
             except IOError as e:
-                print(f"[ERR] Failed to init CSV: {e}")
+                data_log.error(f"Failed to init CSV: {e}")
+
+    def subscribe(self, event_bus, scheduler=None):
+        """Saves every finished match (render thread, in idle time with a scheduler)."""
+        if scheduler:
+            save = lambda e: scheduler.submit("history", self.save_game, *e.value)
+        else:
+            save = lambda e: self.save_game(*e.value)
+        event_bus.subscribe(MATCH_FINISHED, save, deferred=True)
 
     def save_game(self, winner_code, s1, s2):
         """Appends a new game record to the CSV."""
@@ -40,44 +56,47 @@ class DataManager:
             with open(self.filename, 'a', newline='', encoding='utf-8-sig') as f:
                 writer = csv.writer(f)
                 writer.writerow([timestamp, winner_name, self.p1_name, self.p2_name, s1, s2])
-            print(f"[DATA] Game saved. Winner: {winner_name}")
+            data_log.info(f"Game saved. Winner: {winner_name}")
         except IOError as e:
-            print(f"[ERR] Failed to save game: {e}")
+            data_log.error(f"Failed to save game: {e}")
 
 # ==========================================
 #   SOUND MANAGER
 # ==========================================
 class SoundManager:
     """
-    Handles audio playback. Implements edge-detection to prevent
-    the 'machine gun effect' (playing sound every frame).
+    Handles audio playback. Sounds are triggered by game events (see
+    events.py), which fire once per change, so there is no 'machine gun
+    effect' and no per-frame polling.
+    Playback itself goes through the low-latency AudioEngine.
     """
+    # Event type -> sound (scene_entered is handled per scene below)
+    EVENT_SOUNDS = {
+        PLAYER_READY:   'button',
+        CURSOR_MOVED:   'move',
+        PIECE_PLACED:   'place',
+        ROLL_STARTED:   'button',
+        VALUE_LOCKED:   'button',
+        MOLE_HIT:       'hit',
+        MISS:           'miss',
+        MATCH_FINISHED: 'win',
+    }
+
     def __init__(self):
-        pygame.mixer.init()
-        self.sounds = {}
+        self.audio = AudioEngine()
         self.load_assets()
         
-        # State trackers for edge detection
-        self.last_cursor = -1
-        self.last_scene = "WAITING"
-        self.last_packet_time = 0
-        self.last_p1_state = -1
-        self.last_p2_state = -1
-        self.last_p1_ready = '0'
-        self.last_p2_ready = '0'
-        self.last_board = ['0'] * 9 
-        
         # Start BGM
         if os.path.exists('assets/bgm.mp3'):
             try:
                 pygame.mixer.music.load('assets/bgm.mp3')
                 pygame.mixer.music.set_volume(0.3)
                 pygame.mixer.music.play(-1) # Loop forever
-                print("[AUDIO] BGM Started")
+                audio_log.info("BGM Started")
             except Exception: pass
 
     def load_assets(self):
-        """Loads WAV/MP3 files into memory."""
+        """Loads WAV/MP3 files into memory (decoded PCM is cached on disk)."""
         files = {
             'hint':   'assets/hint.mp3',
             'button': 'assets/button.mp3',
@@ -89,76 +108,23 @@ class SoundManager:
         }
         for name, path in files.items():
             if os.path.exists(path):
-                try:
-                    self.sounds[name] = pygame.mixer.Sound(path)
-                    self.sounds[name].set_volume(0.5)
-                except: print(f"[WARN] Failed to load {path}")
+                try: self.audio.load(name, path, 0.5)
+                except: audio_log.warning("Failed to load %s", path)
             else:
-                print(f"[WARN] Sound missing: {path}")
+                audio_log.warning("Sound missing: %s", path)
 
-    def play(self, name):
+    def play(self, name, trigger_time=None):
         """Plays a sound effect if available."""
-        if name in self.sounds:
-            self.sounds[name].play()
-
-    def update(self, scene, data, last_ts):
-        """
-        Called every frame to check for state changes and trigger sounds.
-        """
-        is_new_packet = (last_ts != self.last_packet_time)
-        self.last_packet_time = last_ts
-        
-        # Scene Transition Sound
-        if scene == "HINT" and self.last_scene != "HINT":
-            self.play('hint')
-        
-        # HINT: Ready Button Press
-        if scene == "HINT" and len(data) > 2:
-            if (data[1] == '1' and self.last_p1_ready == '0') or \
-               (data[2] == '1' and self.last_p2_ready == '0'):
-                self.play('button')
-            self.last_p1_ready, self.last_p2_ready = data[1], data[2]
+        self.audio.play(name, trigger_time)
 
-        # TTT: Cursor Move & Place Piece
-        if scene == "TTT" and len(data) > 11:
-            try:
-                # 1. Cursor Movement
-                cur = int(data[11])
-                if data[10] == '0' and cur != self.last_cursor and cur != -1:
-                    self.play('move')
-                self.last_cursor = cur
-                
-                # 2. Place Piece Logic
-                current_board = data[0:9]
-                if current_board != self.last_board:
-                    if not (all(x == '0' for x in current_board) and self.last_scene != "TTT"):
-                        self.play('place')
-                self.last_board = current_board
-
-            except: pass
-            
-        # REACT: State Change (Rolling -> Locked)
-        elif scene == "REACT" and len(data) > 8:
-            # P1 State Change
-            if (self.last_p1_state == '0' and data[7] == '1') or \
-               (self.last_p1_state == '1' and data[7] == '2'):
-                self.play('button')
-            # P2 State Change
-            if (self.last_p2_state == '0' and data[8] == '1') or \
-               (self.last_p2_state == '1' and data[8] == '2'):
-                self.play('button')
-            self.last_p1_state, self.last_p2_state = data[7], data[8]
+    def subscribe(self, event_bus):
+        """Hooks the sounds to game events (played on the packet thread)."""
+        for event_type, name in self.EVENT_SOUNDS.items():
+            event_bus.subscribe(event_type, lambda e, name=name: self.play(name, e.stamp))
+        event_bus.subscribe(SCENE_ENTERED, self.on_scene_entered)
 
-        # WAM: Hit/Miss Events (Only on new packet)
-        elif scene == "WAM" and len(data) > 5 and is_new_packet:
-            if data[3] == '1': self.play('hit')
-            elif data[4] == '1': self.play('miss')
-
-        # END: Win Sound
-        if scene == "END" and self.last_scene != "END":
-            self.play('win')
-            
-        self.last_scene = scene
+    def on_scene_entered(self, event):
+        if event.value == "HINT": self.play('hint', event.stamp)
 
 # ==========================================
 #   VISUAL EFFECTS (ULTIMATE CLEAN v2)
@@ -169,6 +135,7 @@ class BackgroundEffect:
     - Breathing Sun with Atmosphere
     - 3D Perspective Grid with Horizon Fog
     - Starfield & Shooting Stars
+    Layers are dropped according to the quality governor's tier.
     """
     def __init__(self, width, height):
         self.w, self.h = width, height
@@ -193,8 +160,8 @@ class BackgroundEffect:
                 p['y'] = self.h // 2
                 p['x'] = random.randint(0, self.w)
         
-        # 2. Spawn Shooting Stars
-        if random.random() < 0.02:
+        # 2. Spawn Shooting Stars (full quality only)
+        if governor.tier < TIER_REDUCED and random.random() < 0.02:
             self.shooting_stars.append({
                 'x': random.randint(0, self.w),
                 'y': random.randint(0, self.h // 3),
@@ -217,25 +184,32 @@ class BackgroundEffect:
         horizon_y = self.h // 2
         center_x = self.w // 2
         time_sec = pygame.time.get_ticks() / 1000.0
+        tier = governor.tier
+
+        if tier >= TIER_FLAT:
+            # Flat: just the horizon
+            pygame.draw.line(surface, (255, 0, 128), (0, horizon_y), (self.w, horizon_y), 3)
+            return
 
         # --- 1. SYNTHWAVE SUN (Pulsing) ---
         # Breathing effect
         pulse = math.sin(time_sec * 2) * 3
-        sun_radius = 130 + int(pulse)
-        sun_center_y = horizon_y - 20
+        sun_radius = ss(130) + int(pulse)
+        sun_center_y = horizon_y - ss(20)
         
         # A. Sun Back Glow (Atmosphere)
-        glow_radius = sun_radius + 40
-        glow_surf = pygame.Surface((glow_radius*2, glow_radius*2), pygame.SRCALPHA)
-        # Draw soft glow layers
-        for i in range(20):
-            alpha = max(0, 30 - i*2)
-            rad = sun_radius + i*2
-            pygame.draw.circle(glow_surf, (255, 0, 128, alpha), (glow_radius, glow_radius), rad)
-        surface.blit(glow_surf, (center_x - glow_radius, sun_center_y - glow_radius))
+        if tier < TIER_REDUCED:
+            glow_radius = sun_radius + ss(40)
+            glow_surf = pygame.Surface((glow_radius*2, glow_radius*2), pygame.SRCALPHA)
+            # Draw soft glow layers
+            for i in range(20):
+                alpha = max(0, 30 - i*2)
+                rad = sun_radius + i*2
+                pygame.draw.circle(glow_surf, (255, 0, 128, alpha), (glow_radius, glow_radius), rad)
+            surface.blit(glow_surf, (center_x - glow_radius, sun_center_y - glow_radius))
 
-        # B. Sun Body Gradient
-        for r in range(sun_radius, 0, -2):
+        # B. Sun Body Gradient (coarser bands when reduced)
+        for r in range(sun_radius, 0, -2 if tier < TIER_REDUCED else -8):
             ratio = r / sun_radius
             r_col, g_col, b_col = 255, int(200 * ratio), int(100 * (1 - ratio))
             pygame.draw.circle(surface, (r_col, g_col, b_col), (center_x, sun_center_y), r)
@@ -248,12 +222,12 @@ class BackgroundEffect:
             if stripe_y > sun_center_y + sun_radius: continue
             if stripe_y < sun_center_y - sun_radius: continue
             # Only draw on lower half
-            if stripe_y > sun_center_y - 40:
+            if stripe_y > sun_center_y - ss(40):
                 h = max(2, int((stripe_y - (sun_center_y-40)) / 8))
                 pygame.draw.rect(surface, COLOR_BG, (center_x - sun_radius, stripe_y, sun_radius*2, h))
 
         # --- 2. STARS ---
-        for p in self.particles:
+        for p in self.particles[:STAR_COUNT[tier]]:
             alpha = random.randint(100, 255)
             col = (alpha, alpha, alpha)
             pygame.draw.circle(surface, col, (int(p['x']), int(p['y'])), p['size'])
@@ -272,9 +246,9 @@ class BackgroundEffect:
 
         # Vertical Lines
         for i in range(-12, 13):
-            base_x = center_x + i * 180 
+            base_x = center_x + i * ss(180)
             # Fade vertical lines near horizon for depth
-            pygame.draw.line(surface, (0, 70, 90), (center_x + i*10, horizon_y), (base_x, self.h), 1)
+            pygame.draw.line(surface, (0, 70, 90), (center_x + i * ss(10), horizon_y), (base_x, self.h), 1)
 
         # Horizontal Lines
         speed = 0.8
@@ -297,15 +271,17 @@ class BackgroundEffect:
             pygame.draw.line(surface, (200, 255, 255), (s['x'], s['y']), (end_x, end_y), 2)
 
         # Horizon Haze (Fog)
-        fog_surf = pygame.Surface((self.w, 100), pygame.SRCALPHA)
-        for i in range(100):
-            # Gradient alpha: 0 (top) -> 100 (middle) -> 0 (bottom)
-            alpha = 100 - abs(i - 50) * 2
-            pygame.draw.line(fog_surf, (50, 0, 100, alpha), (0, i), (self.w, i))
-        surface.blit(fog_surf, (0, horizon_y - 50))
+        if tier < TIER_REDUCED:
+            fog_h = ss(100)
+            fog_surf = pygame.Surface((self.w, fog_h), pygame.SRCALPHA)
+            for i in range(fog_h):
+                # Gradient alpha: 0 (top) -> 100 (middle) -> 0 (bottom)
+                alpha = 100 - abs(i - fog_h // 2) * 200 // fog_h
+                pygame.draw.line(fog_surf, (50, 0, 100, alpha), (0, i), (self.w, i))
+            surface.blit(fog_surf, (0, horizon_y - fog_h // 2))
 
         # Horizon Glow Line
         pygame.draw.line(surface, (255, 0, 128), (0, horizon_y), (self.w, horizon_y), 3) 
 
         # Vignette
-        pygame.draw.rect(surface, (0, 0, 0), (0, 0, self.w, self.h), 50)
\ No newline at end of file
+        pygame.draw.rect(surface, (0, 0, 0), (0, 0, self.w, self.h), ss(50))
\ No newline at end of file
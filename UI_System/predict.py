@@ -0,0 +1,57 @@
+import time
+from config import *
+
+# ==========================================
+#   CLIENT-SIDE PREDICTION
+# ==========================================
+# Packets arrive a few times per second, the screen redraws at 60 FPS.
+# Between packets the values that move on their own are extrapolated with
+# the MCU's own timing rules (Timer2 ISR = MCU_TICK_RATE ticks per second):
+#   $WAM   Remaining_Time (idx 5) counts down while a player is playing
+#   $REACT D1/D2 (idx 1/2) roll +1 every REACT_ROLL_TICKS while that
+#          player's state is 1; Time_Tick (idx 6) gives the phase
+# Every new packet replaces the prediction (authoritative snap), and no
+# prediction runs further than max_ahead past the last packet.
+
+class StatePredictor:
+    """
+    Registered as a packet listener; predict() is called by the render
+    loop and returns a copy of the packet with extrapolated fields.
+    The packet itself is never modified (sound/data logic keeps using it).
+    """
+    def __init__(self, max_ahead=PREDICT_MAX_AHEAD):
+        self.max_ahead = max_ahead
+        self.last = (None, None, 0.0)   # (scene, data, arrival); swapped atomically
+
+    def on_packet(self, scene, data):
+        self.last = (scene, data, time.perf_counter())
+
+    def predict(self, scene, data):
+        """Returns the fields to draw this frame for the packet (scene, data)."""
+        last_scene, last_data, stamp = self.last
+        # The listener hasn't seen this packet yet: it just arrived
+        if last_data is not data: return data
+        elapsed = min(time.perf_counter() - stamp, self.max_ahead)
+        if scene == "WAM": return self._wam(data, elapsed)
+        if scene == "REACT": return self._react(data, elapsed)
+        return data
+
+    def _wam(self, data, elapsed):
+        if len(data) < 18 or '1' not in (data[7], data[8]): return data
+        try: remaining = int(data[5])
+        except ValueError: return data
+        out = list(data)
+        out[5] = str(max(0, remaining - int(elapsed * MCU_TICK_RATE)))
+        return out
+
+    def _react(self, data, elapsed):
+        if len(data) < 9 or '1' not in (data[7], data[8]): return data
+        try:
+            phase = int(data[6]) % REACT_ROLL_TICKS
+            steps = int((phase + elapsed * MCU_TICK_RATE) // REACT_ROLL_TICKS)
+            out = list(data)
+            for idx, state in ((1, data[7]), (2, data[8])):
+                if state == '1': out[idx] = str(int(data[idx]) + steps)
+        except ValueError:
+            return data
+        return out
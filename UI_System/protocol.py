@@ -0,0 +1,118 @@
+import re
+from config import *
+from keyframes import KeyframeEncoder, KeyframeDecoder
+
+# ==========================================
+#   UART PROTOCOL HELPERS
+# ==========================================
+# Single place for the $<HEADER>,<DATA...>* framing described in Protocol.md.
+# Used by the serial worker (parse) and by every tool that has to produce
+# byte-accurate firmware output (format).
+
+SCENES = ("START", "HINT", "TTT", "REACT", "WAM", "END")
+
+def parse_frame(line):
+    """
+    Parses one received line into (scene, fields).
+    Returns None if the line is not a complete $...* frame.
+    """
+    line = line.strip()
+    if not (line.startswith('$') and line.endswith('*')):
+        return None
+    parts = line[1:-1].split(',')
+    return parts[0], parts[1:]
+
+# ==========================================
+#   BYTE STREAM -> FRAMES
+# ==========================================
+# The UART reader doesn't go line by line: readline() reads one byte per
+# call and a line that never ends (noise, lost CR/LF) grows until the read
+# timeout. Instead each read takes everything waiting and FrameSplitter
+# pulls out every $...* in it:
+#   - the body may not contain '$', '*', CR or LF, so a frame cut short by
+#     a newer '$' or a line break is skipped, not glued onto the next one
+#   - line endings are optional: "$A*$B*" is two frames
+#   - frames and the unfinished frame kept between reads (from its '$')
+#     are at most UART_MAX_FRAME bytes; everything else is dropped at once
+_FRAME_RE = re.compile(rb'\$([^$*\r\n]{0,%d})\*' % UART_MAX_FRAME)
+
+class FrameSplitter:
+    """Byte chunks in, frames (scene, fields) out, with bounded buffering."""
+    def __init__(self, max_pending=UART_MAX_FRAME):
+        self.max_pending = max_pending
+        self.pending = b''
+        self.frames = 0
+        self.dropped = 0      # Bytes outside any frame (noise, CR/LF, cut frames)
+
+    def feed(self, chunk):
+        buf = self.pending + chunk
+        end = buf.rfind(b'*') + 1
+        bodies = _FRAME_RE.findall(buf, 0, end)
+        start = buf.rfind(b'$', end)
+        self.pending = buf[start:] if start >= 0 and len(buf) - start <= self.max_pending else b''
+        self.frames += len(bodies)
+        self.dropped += len(buf) - len(self.pending) - sum(map(len, bodies)) - 2 * len(bodies)
+        frames = []
+        for body in bodies:
+            parts = body.decode('ascii', errors='ignore').split(',')
+            frames.append((parts[0], parts[1:]))
+        return frames
+
+def format_frame(scene, data):
+    """Formats a packet exactly as GAME_OUTPUT.c sends it (including CR+LF)."""
+    body = ",".join([scene] + [str(x) for x in data])
+    return f"${body}*\r\n"
+
+# ==========================================
+#   DELTA FRAMES (Protocol.md section 7)
+# ==========================================
+# Opt-in (#DELTA,1). Inside the same $...* framing:
+#   Keyframe: $=<seq>,<SCENE>,<F0>,...,<FN>*   full state, sets the base
+#   Delta:    $~<seq>,<idx>:<val>,...*         only the fields that changed
+# seq counts 0..SEQ_MOD-1 over both kinds; a delta only applies on top of seq-1.
+# The keyframe/delta logic is keyframes.py, shared with the spectator feed.
+
+KEYFRAME_TAG, DELTA_TAG = '=', '~'
+SEQ_MOD = 100
+DELTA_KEYFRAME_INTERVAL = 20   # Firmware sends a keyframe at least every N frames
+
+def is_state_frame(scene):
+    """True for plain game frames as well as keyframes and deltas."""
+    return scene in SCENES or scene[:1] in (KEYFRAME_TAG, DELTA_TAG)
+
+class FrameEncoder(KeyframeEncoder):
+    """
+    MCU side: formats packets as keyframes or deltas. A keyframe is forced
+    on scene changes, field count changes and every `keyframe_interval` frames.
+    """
+    def __init__(self, keyframe_interval=DELTA_KEYFRAME_INTERVAL):
+        super().__init__(keyframe_interval, SEQ_MOD)
+
+    def format_keyframe(self, seq, scene, data):
+        return format_frame(f"{KEYFRAME_TAG}{seq}", [scene] + data)
+
+    def format_delta(self, seq, scene, changes):
+        return format_frame(f"{DELTA_TAG}{seq}", changes)
+
+class FrameDecoder(KeyframeDecoder):
+    """
+    Host side: turns parsed frames back into the full (scene, fields)
+    packets the scenes consume. Plain frames pass through unchanged;
+    `lost` asks the link for a keyframe with #SYNC.
+    """
+    def __init__(self):
+        super().__init__(SEQ_MOD)
+
+    def decode(self, scene, fields):
+        """Returns (scene, data) or None if the frame can't be applied."""
+        tag = scene[:1]
+        if tag not in (KEYFRAME_TAG, DELTA_TAG):
+            self.seq = None  # Plain frame: the MCU isn't sending deltas (any more)
+            return scene, fields
+        try:
+            seq = int(scene[1:])
+        except ValueError:
+            return None
+        if tag == KEYFRAME_TAG:
+            return self.keyframe(seq, fields[0], fields[1:]) if fields else None
+        return self.delta(seq, fields)
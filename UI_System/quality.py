@@ -0,0 +1,83 @@
+from collections import deque
+from config import *
+from logs import get_logger
+
+log = get_logger("gfx")
+
+# ==========================================
+#   QUALITY TIERS
+# ==========================================
+# FULL:    sun glow, fog, 40 stars, shooting stars, scanlines, animated reticles
+# REDUCED: no glow/fog layers, coarser sun, 20 stars, simple reticles
+# FLAT:    flat background, no stars, no scanlines, no reticles
+TIER_FULL, TIER_REDUCED, TIER_FLAT = 0, 1, 2
+TIER_NAMES = ("FULL", "REDUCED", "FLAT")
+STAR_COUNT = (40, 20, 0)
+
+def parse_tier(name):
+    """'auto' -> None (governed), otherwise a fixed tier."""
+    name = str(name).upper()
+    if name == "AUTO": return None
+    if name not in TIER_NAMES:
+        raise ValueError(f"Unknown quality '{name}'. Use auto, {', '.join(t.lower() for t in TIER_NAMES)}")
+    return TIER_NAMES.index(name)
+
+# ==========================================
+#   QUALITY GOVERNOR
+# ==========================================
+class QualityGovernor:
+    """
+    Watches how long each frame takes to render (excluding the FPS sleep)
+    and steps the effect tier down when frames run over budget, and back
+    up after a sustained period with headroom.
+    A failed step up (dropped again right after) doubles the wait before
+    the next attempt, so the tier doesn't oscillate on borderline hardware.
+    """
+    def __init__(self, fps=FPS, fixed=None):
+        self.budget = 1.0 / fps
+        self.fixed = fixed
+        self.tier = TIER_FULL if fixed is None else fixed
+        self.samples = deque(maxlen=QUALITY_WINDOW)
+        self.frames_since_change = 0
+        self.last_was_upgrade = False
+        self.upgrade_frames = QUALITY_UPGRADE_FRAMES
+        self.frames_per_tier = [0] * len(TIER_NAMES)
+        self.changes = 0
+
+    def set_fixed(self, tier):
+        self.fixed = tier
+        if tier is not None: self.tier = tier
+
+    def sample(self, work_time):
+        """Feeds the render time of the last frame (seconds)."""
+        self.frames_per_tier[self.tier] += 1
+        self.frames_since_change += 1
+        if self.fixed is not None: return
+        self.samples.append(work_time)
+        if len(self.samples) < self.samples.maxlen: return
+        avg = sum(self.samples) / len(self.samples)
+
+        if avg > self.budget * QUALITY_DOWNGRADE_AT and self.tier < TIER_FLAT:
+            # Dropped right after an upgrade: wait longer next time
+            if self.last_was_upgrade and self.frames_since_change < self.upgrade_frames:
+                self.upgrade_frames = min(self.upgrade_frames * 2, QUALITY_UPGRADE_FRAMES * 16)
+            self._set(self.tier + 1, avg)
+        elif (avg < self.budget * QUALITY_UPGRADE_AT and self.tier > TIER_FULL
+              and self.frames_since_change >= self.upgrade_frames):
+            self._set(self.tier - 1, avg)
+
+    def _set(self, tier, avg):
+        log.info(f"Quality {TIER_NAMES[self.tier]} -> {TIER_NAMES[tier]} "
+              f"(frame {avg*1000:.1f} ms, budget {self.budget*1000:.1f} ms)")
+        self.last_was_upgrade = tier < self.tier
+        self.tier = tier
+        self.samples.clear()
+        self.frames_since_change = 0
+        self.changes += 1
+
+    def print_report(self):
+        total = sum(self.frames_per_tier) or 1
+        share = ", ".join(f"{name} {n*100/total:.0f}%" for name, n in zip(TIER_NAMES, self.frames_per_tier) if n)
+        log.info(f"Quality: {share} ({self.changes} changes)")
+
+governor = QualityGovernor()
@@ -0,0 +1,128 @@
+import time
+import zlib
+import queue
+import threading
+from collections import deque
+import pygame
+from config import *
+from scenes import draw_glow_text, draw_progress_bar
+from layout import LAYOUT_W, pt, rect
+from logs import get_logger
+
+log = get_logger("replay")
+
+# ==========================================
+#   INSTANT REPLAY
+# ==========================================
+# The render loop hands every Nth finished frame to ReplayBuffer.capture(),
+# which only copies the surface. A worker thread downscales and compresses
+# it into a ring holding the last REPLAY_SECONDS (and at most
+# REPLAY_MAX_BYTES). ReplayPlayer plays the ring back over the live screen
+# while packet ingestion and the game logic keep running.
+
+class ReplayBuffer:
+    """Memory-bounded ring of downscaled, zlib-compressed frames."""
+    def __init__(self, seconds=REPLAY_SECONDS, fps=REPLAY_FPS, size=REPLAY_SIZE, max_bytes=REPLAY_MAX_BYTES):
+        self.seconds = seconds
+        self.interval = 1.0 / fps
+        self.size = tuple(size)
+        self.max_bytes = max_bytes
+        self.frames = deque()            # (perf_counter, compressed RGB)
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.queue = queue.Queue(maxsize=4)
+        self.next_capture = 0.0
+        self.dropped = 0
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def capture(self, screen):
+        """Render thread: costs one surface copy, never blocks."""
+        now = time.perf_counter()
+        if now < self.next_capture: return
+        self.next_capture = max(self.next_capture + self.interval, now)   # Keeps the average rate
+        try:
+            self.queue.put_nowait((now, screen.copy()))
+        except queue.Full:
+            self.dropped += 1   # Worker behind: skip this frame
+
+    def _worker(self):
+        while True:
+            stamp, surf = self.queue.get()
+            small = pygame.transform.smoothscale(surf, self.size)
+            blob = zlib.compress(pygame.image.tobytes(small, "RGB"), 1)
+            with self.lock:
+                self.frames.append((stamp, blob))
+                self.bytes += len(blob)
+                while self.frames and (stamp - self.frames[0][0] > self.seconds or self.bytes > self.max_bytes):
+                    self.bytes -= len(self.frames.popleft()[1])
+
+    def snapshot(self):
+        """Frames currently in the ring, oldest first."""
+        with self.lock:
+            return list(self.frames)
+
+    def decode(self, blob):
+        return pygame.image.frombytes(zlib.decompress(blob), self.size, "RGB")
+
+class ReplayPlayer:
+    """
+    Plays a snapshot of the ring at variable speed. While active, the main
+    loop draws the replay instead of the live scene (and doesn't capture).
+    """
+    SPEEDS = (0.25, 0.5, 1.0, 2.0)
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.active = False
+        self.speed = REPLAY_SPEED
+        self.clip = []
+        self.pos = 0.0           # Seconds into the clip
+        self.last_tick = 0.0
+        self.shown = (None, None)   # (frame index, scaled surface)
+
+    def start(self, speed=None):
+        self.clip = self.buffer.snapshot()
+        if len(self.clip) < 2: return False
+        if speed: self.speed = speed
+        self.pos, self.last_tick = 0.0, time.perf_counter()
+        self.shown = (None, None)
+        self.active = True
+        log.info(f"{self.clip[-1][0] - self.clip[0][0]:.1f}s at x{self.speed}")
+        return True
+
+    def stop(self):
+        self.active = False
+        self.clip = []
+        self.shown = (None, None)
+
+    def toggle(self):
+        if self.active: self.stop()
+        else: self.start()
+
+    def change_speed(self, step):
+        idx = min(range(len(self.SPEEDS)), key=lambda i: abs(self.SPEEDS[i] - self.speed))
+        self.speed = self.SPEEDS[max(0, min(len(self.SPEEDS) - 1, idx + step))]
+
+    def draw(self, screen):
+        """Draws the current replay frame. Stops at the end of the clip."""
+        now = time.perf_counter()
+        self.pos += (now - self.last_tick) * self.speed
+        self.last_tick = now
+        t0 = self.clip[0][0]
+        if t0 + self.pos > self.clip[-1][0]:
+            self.stop()
+            return
+
+        idx = self.shown[0] or 0
+        while idx + 1 < len(self.clip) and self.clip[idx + 1][0] - t0 <= self.pos:
+            idx += 1
+        if idx != self.shown[0]:
+            # Only decode when the frame changes (slow motion repeats frames)
+            frame = self.buffer.decode(self.clip[idx][1])
+            self.shown = (idx, pygame.transform.scale(frame, screen.get_size()))
+        screen.blit(self.shown[1], (0, 0))
+
+        # Overlay: blinking label and progress
+        if (pygame.time.get_ticks() // 500) % 2:
+            draw_glow_text(screen, f"INSTANT REPLAY  x{self.speed:g}", 32, COLOR_ACCENT, pt(LAYOUT_W//2, 40))
+        draw_progress_bar(screen, *rect(LAYOUT_W//2 - 200, 70, 400, 8), self.pos / (self.clip[-1][0] - t0), COLOR_ACCENT)
@@ -0,0 +1,171 @@
+import os
+import time
+import importlib.util
+import pygame
+from config import *
+from logs import get_logger
+from bloom import bloom
+
+log = get_logger("system")
+
+# ==========================================
+#   SCENE REGISTRY (PLUGINS)
+# ==========================================
+# Maps protocol headers ($HINT, $TTT, ...) to Scene classes. Built-in scenes
+# register themselves in scenes.py; extra games can drop a module into
+# SCENE_PLUGIN_DIR that does the same:
+#
+#   from scene_manager import Scene, register_scene
+#
+#   @register_scene("PONG")
+#   class PongScene(Scene):
+#       def draw(self, screen, data): ...
+
+SCENE_REGISTRY = {}
+
+def register_scene(*names):
+    """Class decorator: routes packets with these headers to the scene."""
+    def wrap(cls):
+        for name in names:
+            SCENE_REGISTRY[name] = cls
+        return cls
+    return wrap
+
+def load_plugins(path=SCENE_PLUGIN_DIR):
+    """Imports every *.py in `path` so their @register_scene calls run."""
+    if not path or not os.path.isdir(path): return
+    for fname in sorted(os.listdir(path)):
+        if not fname.endswith('.py') or fname.startswith('_'): continue
+        try:
+            spec = importlib.util.spec_from_file_location(f"plugin_{fname[:-3]}", os.path.join(path, fname))
+            spec.loader.exec_module(importlib.util.module_from_spec(spec))
+            log.info(f"Scene plugin loaded: {fname}")
+        except Exception as e:
+            log.warning(f"Scene plugin {fname} failed: {e}")
+
+# ==========================================
+#   SCENE BASE CLASS
+# ==========================================
+class Scene:
+    """
+    One screen with a lifecycle:
+      enter()  once when the scene becomes active (allocate, reset timers)
+      update() once per frame before drawing (animation state)
+      draw()   once per frame: blits the cached backdrop, then the dynamic parts
+      exit()   when another scene takes over (release surfaces)
+
+    Everything that only depends on a few packet fields is drawn by
+    build_backdrop() into a transparent full-screen layer. The layer is
+    rebuilt only when static_key(data) changes, not every frame; so is its
+    bloom halo.
+    """
+    def __init__(self, ctx):
+        self.ctx = ctx               # Shared objects (e.g. data_mgr)
+        self.backdrop = None
+        self.backdrop_key = None
+        self.halo = None             # Bloom of the backdrop, built on demand
+        self.halo_key = None         # Backdrop key of the halo being built
+        self.entered_at = 0.0
+        self.rebuilds = 0
+
+    # --- Lifecycle ---
+    def enter(self):
+        self.entered_at = time.perf_counter()
+        self.backdrop = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        self.backdrop_key = None
+
+    def update(self, data):
+        pass
+
+    def draw(self, screen, data):
+        self.draw_backdrop(screen, data)
+        self.draw_dynamic(screen, data)
+
+    def exit(self):
+        self.backdrop = None
+        self.backdrop_key = None
+        self.halo = None
+        self.halo_key = None
+
+    # --- Layers (override in subclasses) ---
+    def static_key(self, data):
+        """Fields the backdrop depends on. None = no backdrop."""
+        return None
+
+    def build_backdrop(self, surface, data):
+        pass
+
+    def draw_dynamic(self, screen, data):
+        pass
+
+    def draw_backdrop(self, screen, data):
+        key = self.static_key(data)
+        if key is None: return
+        if key != self.backdrop_key:
+            self.backdrop.fill((0, 0, 0, 0))
+            self.build_backdrop(self.backdrop, data)
+            self.backdrop_key = key
+            self.halo = None
+            self.rebuilds += 1
+        screen.blit(self.backdrop, (0, 0))
+        if bloom.active():
+            if self.halo is None and self.halo_key != key: self.build_halo(key)
+            if self.halo: bloom.apply(screen, self.halo)
+
+    def build_halo(self, key):
+        """Bloom for the current backdrop: in idle time if there's a scheduler."""
+        def done(halo):
+            self.halo = halo
+        def steps():
+            build = bloom.halo_steps(self.backdrop, done)
+            # Stop early once the backdrop has moved on (or the scene exited)
+            while self.backdrop_key == key and next(build, True) is None:
+                yield
+            if self.halo_key == key: self.halo_key = None
+        self.halo_key = key
+        scheduler = self.ctx.get("scheduler")
+        if scheduler: scheduler.submit_steps("bloom", steps())
+        else:
+            for _ in steps(): pass
+
+    # --- Helpers ---
+    def age(self):
+        """Seconds since enter(), for per-scene animations."""
+        return time.perf_counter() - self.entered_at
+
+# ==========================================
+#   SCENE MANAGER
+# ==========================================
+class SceneManager:
+    """
+    Replaces the if/elif routing in the main loop: looks up the Scene class
+    for the current header, runs exit()/enter() on changes and draws it.
+    Scene objects are created on first use and kept, so a scene that comes
+    back (e.g. HINT before every game) doesn't pay construction again.
+    """
+    def __init__(self, ctx=None):
+        self.ctx = ctx or {}
+        self.instances = {}
+        self.current = None
+        self.current_name = None
+
+    def get(self, name):
+        if name not in self.instances:
+            cls = SCENE_REGISTRY.get(name)
+            if cls is None: return None
+            self.instances[name] = cls(self.ctx)
+        return self.instances[name]
+
+    def switch(self, name):
+        if name == self.current_name: return
+        if self.current: self.current.exit()
+        self.current_name = name
+        self.current = self.get(name)
+        if self.current: self.current.enter()
+
+    def draw(self, screen, name, data):
+        """Routes one frame. Unknown headers draw nothing (like before)."""
+        self.switch(name)
+        if self.current is None: return
+        self.current.update(data)
+        self.current.draw(screen, data)
@@ -2,24 +2,23 @@ import pygame
 import math
 import random
 import os
+import time
+from collections import OrderedDict
 from config import *
+from fonts import get_font
+from events import MOLE_HIT, MISS, SCENE_ENTERED
+from scene_manager import Scene, register_scene
+from quality import governor, TIER_REDUCED, TIER_FLAT
+from bloom import soften
+from layout import LAYOUT_W, LAYOUT_H, SCALE, sx, sy, ss, pt, rect
+import ttt_analysis
 
 # ==========================================
 #   ASSET MANAGEMENT
 # ==========================================
-_fonts = {}
+# Fonts: bundled TTF with cached resolution (see fonts.py)
 _images = {}
 
-def get_font(name, size):
-    """Loads font dynamically with caching."""
-    key = (name, size)
-    if key not in _fonts:
-        try: 
-            _fonts[key] = pygame.font.SysFont("consolas", size, bold=True)
-        except: 
-            _fonts[key] = pygame.font.SysFont(None, size)
-    return _fonts[key]
-
 def get_image(path, size=None):
     """Loads image safely with caching."""
     key = (path, size)
@@ -39,33 +38,129 @@ def get_image(path, size=None):
 # ==========================================
 #   VISUAL HELPERS
 # ==========================================
+# Text sizes are layout sizes (scaled with ss()); positions and rects are
+# canvas pixels, converted by the caller with pt()/rect() (see layout.py).
 
 def draw_text_center(surface, text, size, color, center_pos):
     """Draws centered text with a sharp black shadow."""
-    font = get_font("consolas", size)
+    font = get_font("consolas", ss(size))
     t = font.render(str(text), True, color)
     r = t.get_rect(center=center_pos)
     s = font.render(str(text), True, (0,0,0))
     surface.blit(s, (r.x+2, r.y+2))
     surface.blit(t, r)
 
-def draw_glow_text(surface, text, size, color, center_pos, glow_intensity=0):
-    """Draws text cleanly with subtle tint."""
+_glow_sprites = OrderedDict()   # (text, size, color, glow) -> sprite, LRU
+
+def _glow_sprite(text, size, color, glow):
+    """Shadow, color, white core and optional halo, rendered once per text."""
+    key = (text, size, tuple(color), glow)
+    sprite = _glow_sprites.get(key)
+    if sprite:
+        _glow_sprites.move_to_end(key)
+        return sprite
     font = get_font("consolas", size)
-    rect = font.render(str(text), True, color).get_rect(center=center_pos)
-    
-    # 1. Shadow
-    shadow_surf = font.render(str(text), True, (0, 0, 0))
-    surface.blit(shadow_surf, (rect.x + 2, rect.y + 2))
-        
-    # 2. Main Text
-    main_surf = font.render(str(text), True, color)
-    surface.blit(main_surf, rect)
-    
-    # 3. White Core 
-    core_surf = font.render(str(text), True, (255, 255, 255))
-    core_surf.set_alpha(100)
-    surface.blit(core_surf, rect)
+    main = font.render(text, True, color)
+    pad = 2 + 4 * glow   # Room for the shadow offset and the halo
+    w, h = main.get_width() + 2 * pad, main.get_height() + 2 * pad
+    sprite = pygame.Surface((w, h), pygame.SRCALPHA)
+    if glow:
+        halo = pygame.Surface((w, h), pygame.SRCALPHA)
+        halo.blit(main, (pad, pad))
+        sprite.blit(soften(halo, 4 * glow), (0, 0))
+    sprite.blit(font.render(text, True, (0, 0, 0)), (pad + 2, pad + 2))
+    sprite.blit(main, (pad, pad))
+    core = font.render(text, True, (255, 255, 255))
+    core.set_alpha(100)
+    sprite.blit(core, (pad, pad))
+    _glow_sprites[key] = sprite
+    if len(_glow_sprites) > GLOW_TEXT_CACHE: _glow_sprites.popitem(last=False)
+    return sprite
+
+def draw_glow_text(surface, text, size, color, center_pos, glow_intensity=0):
+    """
+    Draws text with shadow and white core; glow_intensity > 0 adds a
+    blurred halo of that many steps. Cached: repeated text is one blit.
+    """
+    sprite = _glow_sprite(str(text), ss(size), color, glow_intensity)
+    surface.blit(sprite, sprite.get_rect(center=center_pos))   # Padding is symmetric
+
+# ==========================================
+#   NUMERIC TEXT (DIGIT ATLAS)
+# ==========================================
+ATLAS_GLYPHS = "0123456789.:s-"
+
+class DigitAtlas:
+    """
+    All glyphs of ATLAS_GLYPHS for one (size, color, style), rasterized
+    once into a single strip. Numbers are composed from blits: digits sit
+    in fixed-width cells (no jitter while rolling), punctuation uses its
+    own width. style 'glow' bakes the draw_glow_text() look (shadow, color,
+    white core) into each glyph, 'plain' is the bare glyph.
+    """
+    def __init__(self, size, color, style="glow"):
+        font = get_font("consolas", size)
+        pad = 2 if style == "glow" else 0   # Room for the shadow offset
+        glyphs = {ch: font.render(ch, True, color) for ch in ATLAS_GLYPHS}
+        self.cell_w = max(glyphs[d].get_width() for d in "0123456789")
+        self.h = max(g.get_height() for g in glyphs.values()) + pad
+
+        widths = {ch: (self.cell_w if ch.isdigit() else g.get_width()) for ch, g in glyphs.items()}
+        self.strip = pygame.Surface((sum(widths.values()) + pad * len(glyphs), self.h), pygame.SRCALPHA)
+        self.rects = {}
+        x = 0
+        for ch, g in glyphs.items():
+            w = widths[ch] + pad
+            gx = x + (widths[ch] - g.get_width()) // 2
+            if style == "glow":
+                self.strip.blit(font.render(ch, True, (0, 0, 0)), (gx + 2, 2))
+                self.strip.blit(g, (gx, 0))
+                core = font.render(ch, True, (255, 255, 255))
+                core.set_alpha(100)
+                self.strip.blit(core, (gx, 0))
+            else:
+                self.strip.blit(g, (gx, 0))
+            self.rects[ch] = pygame.Rect(x, 0, w, self.h)
+            x += w
+        self.pad = pad
+
+    def width(self, text):
+        return sum(self.rects[ch].w - self.pad for ch in text) + self.pad
+
+    def draw(self, surface, text, center_pos):
+        x = center_pos[0] - self.width(text) // 2
+        y = center_pos[1] - (self.h - self.pad) // 2
+        for ch in text:
+            r = self.rects[ch]
+            surface.blit(self.strip, (x, y), r)
+            x += r.w - self.pad
+
+_atlases = {}
+
+def draw_number(surface, text, size, color, center_pos, style="glow"):
+    """
+    Draws a number (digits, '.', ':', 's', '-') without font rasterization.
+    Anything else falls back to draw_glow_text().
+    """
+    text = str(text)
+    if not text or any(ch not in ATLAS_GLYPHS for ch in text):
+        draw_glow_text(surface, text, size, color, center_pos)
+        return
+    key = (ss(size), tuple(color), style)
+    atlas = _atlases.get(key)
+    if atlas is None:
+        atlas = _atlases[key] = DigitAtlas(*key)
+    atlas.draw(surface, text, center_pos)
+
+WARM_ATLASES = ((100, (255, 255, 255), "glow"),   # REACT values
+                (20, (200, 200, 200), "glow"))    # WAM timer
+
+def warm_caches():
+    """Builds the digit atlases ahead of their first use, one per step."""
+    for size, color, style in WARM_ATLASES:
+        key = (ss(size), color, style)
+        if key not in _atlases: _atlases[key] = DigitAtlas(*key)
+        yield
 
 def draw_cyber_box(surface, rect, color, fill_alpha=30):
     """Draws a clean tech box."""
@@ -80,7 +175,7 @@ def draw_cyber_box(surface, rect, color, fill_alpha=30):
     pygame.draw.rect(surface, color, rect, 1)
     
     # Corner Brackets
-    len_ = 20; thick = 3
+    len_ = ss(20); thick = ss(3)
     pts = [
         ((x, y), (x+len_, y)), ((x, y), (x, y+len_)),
         ((x+w, y), (x+w-len_, y)), ((x+w, y), (x+w, y+len_)),
@@ -91,8 +186,9 @@ def draw_cyber_box(surface, rect, color, fill_alpha=30):
         pygame.draw.line(surface, color, p1, p2, thick)
     
     # Tech Decor
-    pygame.draw.rect(surface, color, (x + w//2 - 30, y-2, 60, 4)) 
-    pygame.draw.rect(surface, color, (x + w//2 - 30, y+h-2, 60, 4)) 
+    dw, dh = ss(60), ss(4)
+    pygame.draw.rect(surface, color, (x + w//2 - dw//2, y - dh//2, dw, dh))
+    pygame.draw.rect(surface, color, (x + w//2 - dw//2, y + h - dh//2, dw, dh))
 
 def draw_progress_bar(surface, x, y, w, h, progress, color):
     pygame.draw.rect(surface, (30, 30, 40), (x, y, w, h))
@@ -101,13 +197,19 @@ def draw_progress_bar(surface, x, y, w, h, progress, color):
     if fill_w > 0:
         pygame.draw.rect(surface, color, (x, y, fill_w, h))
         pygame.draw.rect(surface, (255, 255, 255), (x, y, fill_w, 2))
-        for i in range(20, fill_w, 20):
+        for i in range(ss(20), fill_w, ss(20)):
             pygame.draw.line(surface, (0, 0, 0), (x+i, y), (x+i, y+h), 1)
 
 # --- SPECIAL FX: LOCK ONLY ---
 
-def draw_target_lock(surface, cx, cy, color, radius=50):
-    """Draws a rotating sci-fi crosshair."""
+def draw_target_lock(surface, cx, cy, color, radius=None):
+    """Draws a rotating sci-fi crosshair (detail follows the quality tier)."""
+    if governor.tier >= TIER_FLAT: return   # The mole itself marks the target
+    radius = radius or ss(50)
+    if governor.tier >= TIER_REDUCED:
+        pygame.draw.circle(surface, color, (cx, cy), radius, 2)
+        pygame.draw.circle(surface, (255, 0, 0), (cx, cy), 2)
+        return
     time = pygame.time.get_ticks()
     angle_offset = time * 0.1
     
@@ -119,9 +221,9 @@ def draw_target_lock(surface, cx, cy, color, radius=50):
         pygame.draw.arc(surface, color, rect, rad_start, rad_end, 2)
 
     # Pulsing Inner Bracket
-    pulse = math.sin(time * 0.01) * 5
-    inner_r = radius - 15 + pulse
-    corner_len = 10
+    pulse = math.sin(time * 0.01) * 5 * SCALE
+    inner_r = radius - ss(15) + pulse
+    corner_len = ss(10)
     
     pts = [
         ((cx - inner_r, cy - inner_r), (cx - inner_r + corner_len, cy - inner_r)),
@@ -137,8 +239,8 @@ def draw_target_lock(surface, cx, cy, color, radius=50):
 # --- 3D MOLE DRAWING HELPER ---
 def draw_3d_mole(surface, center_x, center_y, is_active, color, label):
     """Draws a detailed 2.5D mole or image."""
-    hole_w, hole_h = 110, 50
-    mole_w, mole_h = 70, 80
+    hole_w, hole_h = ss(110), ss(50)
+    mole_w, mole_h = ss(70), ss(80)
     
     # 1. Back Rim
     hole_rect = pygame.Rect(center_x - hole_w//2, center_y - hole_h//2, hole_w, hole_h)
@@ -146,144 +248,241 @@ def draw_3d_mole(surface, center_x, center_y, is_active, color, label):
     pygame.draw.arc(surface, (60, 70, 80), hole_rect, 0, math.pi, 2) 
     
     if is_active:
-        pulse = math.sin(pygame.time.get_ticks() * 0.01) * 2
+        pulse = math.sin(pygame.time.get_ticks() * 0.01) * 2 * SCALE
         rect_x = center_x - mole_w//2
         rect_y = center_y - mole_h + pulse
         
-        mole_img = get_image("assets/tongtongtong.png", (mole_w + 40, mole_h + 40))
+        mole_img = get_image("assets/tongtongtong.png", (mole_w + ss(40), mole_h + ss(40)))
         if mole_img:
-            surface.blit(mole_img, (center_x - mole_w//2 - 15, rect_y - 10))
+            surface.blit(mole_img, (center_x - mole_w//2 - ss(15), rect_y - ss(10)))
         else:
             # 2.5D Mech Mole
             dark_col = (max(0, color[0]-50), max(0, color[1]-50), max(0, color[2]-50))
             pygame.draw.rect(surface, dark_col, (rect_x, rect_y, mole_w, mole_h))
-            pygame.draw.rect(surface, color, (rect_x + 10, rect_y, mole_w - 20, mole_h))
-            pygame.draw.ellipse(surface, color, (rect_x, rect_y - 15, mole_w, 30))
-            pygame.draw.ellipse(surface, (255, 255, 255), (rect_x, rect_y - 15, mole_w, 30), 2)
-            pygame.draw.rect(surface, (10, 10, 10), (center_x - 25, rect_y + 15, 50, 15)) 
-            scanner_x = center_x - 20 + (pygame.time.get_ticks() // 5) % 40
-            pygame.draw.rect(surface, (255, 0, 50), (scanner_x, rect_y + 18, 5, 8))
+            pygame.draw.rect(surface, color, (rect_x + ss(10), rect_y, mole_w - ss(20), mole_h))
+            pygame.draw.ellipse(surface, color, (rect_x, rect_y - ss(15), mole_w, ss(30)))
+            pygame.draw.ellipse(surface, (255, 255, 255), (rect_x, rect_y - ss(15), mole_w, ss(30)), 2)
+            pygame.draw.rect(surface, (10, 10, 10), (center_x - ss(25), rect_y + ss(15), ss(50), ss(15)))
+            scanner_x = center_x - ss(20) + (pygame.time.get_ticks() // 5) % ss(40)
+            pygame.draw.rect(surface, (255, 0, 50), (scanner_x, rect_y + ss(18), ss(5), ss(8)))
         
         # Target Lock Effect
         draw_target_lock(surface, center_x, int(rect_y), color)
     
     # 5. Front Rim
-    pygame.draw.arc(surface, color if is_active else (60, 70, 80), hole_rect, math.pi, 0, 3)
-    draw_text_center(surface, label, 20, (150, 150, 150), (center_x, center_y + 40))
+    pygame.draw.arc(surface, color if is_active else (60, 70, 80), hole_rect, math.pi, 0, ss(3))
+    draw_text_center(surface, label, 20, (150, 150, 150), (center_x, center_y + ss(40)))
+
+
+# ==========================================
+#   OVERLAYS
+# ==========================================
 
+def draw_link_stalled(screen):
+    """Overlay for a silent link: keeps the last frame but flags it as stale."""
+    age = time.time() - shared_state["last_update"]
+    blink = (pygame.time.get_ticks() // 400) % 2
+    draw_cyber_box(screen, rect(LAYOUT_W//2 - 300, LAYOUT_H - 130, 600, 80), COLOR_DANGER, 60 if blink else 30)
+    draw_glow_text(screen, "SIGNAL LOST - LINK STALLED", 32, COLOR_DANGER, pt(LAYOUT_W//2, LAYOUT_H - 100))
+    draw_glow_text(screen, f"LAST PACKET {age:.1f}s AGO", 20, COLOR_TEXT, pt(LAYOUT_W//2, LAYOUT_H - 68))
 
 # ==========================================
-#   SCENE RENDERERS
+#   SCENES
 # ==========================================
+# Static parts go into build_backdrop() (cached until static_key() changes),
+# everything that moves between packets into draw_dynamic(). Coordinates
+# are in the 1300x800 layout, converted with pt()/rect()/ss().
+
+def _player_names(ctx, default1, default2):
+    data_mgr = ctx.get("data_mgr")
+    if data_mgr: return data_mgr.p1_name, data_mgr.p2_name
+    return default1, default2
 
-def scene_waiting(screen):
-    draw_glow_text(screen, "SYSTEM INITIALIZING...", 60, COLOR_GLOW, (WIDTH//2, HEIGHT//2-60))
-    msg = f"SEARCHING UPLINK: {SERIAL_PORT}..."
-    col = COLOR_DANGER
-    if shared_state["connected"]:
-        msg = "UPLINK ESTABLISHED"
-        col = COLOR_P1
-    if USE_SIMULATION: 
-        msg = ":: SIMULATION PROTOCOL ::"
-        col = COLOR_ACCENT
-    draw_glow_text(screen, msg, 24, col, (WIDTH//2, HEIGHT//2+40))
-
-def scene_hint(screen, data, data_mgr=None):
-    if len(data) < 3: return
-    game_id = data[0]
-    titles = {'1':"TIC-TAC-TOE", '2':"REACTION GAME", '3':"WHAC A MOLE"}
-    instructions = {
+@register_scene("WAITING", "START")
+class WaitingScene(Scene):
+    def static_key(self, data):
+        return (shared_state["connected"],)
+
+    def build_backdrop(self, surface, data):
+        draw_glow_text(surface, "SYSTEM INITIALIZING...", 60, COLOR_GLOW, pt(LAYOUT_W//2, LAYOUT_H//2 - 60))
+        msg = f"SEARCHING UPLINK: {SERIAL_PORT}..."
+        col = COLOR_DANGER
+        if shared_state["connected"]:
+            msg = "UPLINK ESTABLISHED"
+            col = COLOR_P1
+        if USE_SIMULATION: 
+            msg = ":: SIMULATION PROTOCOL ::"
+            col = COLOR_ACCENT
+        draw_glow_text(surface, msg, 24, col, pt(LAYOUT_W//2, LAYOUT_H//2 + 40))
+
+@register_scene("HINT")
+class HintScene(Scene):
+    TITLES = {'1':"TIC-TAC-TOE", '2':"REACTION GAME", '3':"WHAC A MOLE"}
+    INSTRUCTIONS = {
         '1': ["OBJECTIVE: ALIGN 3 (MAX 3 PIECES)", "CONTROLS: KNOB TO AIM, BUTTON TO FIRE"],
         '2': ["OBJECTIVE: STOP COUNTER AT TARGET", "CONTROLS: PRESS BUTTON TO LOCK VALUE"],
         '3': ["OBJECTIVE: NEUTRALIZE MOLES", "CONTROLS: PRESS BUTTONS 1-9"]
     }
-    
-    draw_cyber_box(screen, (WIDTH//2 - 350, 50, 700, 100), COLOR_ACCENT, 30)
-    draw_glow_text(screen, titles.get(game_id, "UNKNOWN"), 50, COLOR_TEXT, (WIDTH//2, 100))
-    
-    lines = instructions.get(game_id, ["AWAITING DATA...", ""])
-    draw_glow_text(screen, lines[0], 24, COLOR_INFO, (WIDTH//2, 180))
-    draw_glow_text(screen, lines[1], 24, (150, 255, 150), (WIDTH//2, 215))
-    
-    p1_name = data_mgr.p1_name if data_mgr else "PLAYER 1"
-    p2_name = data_mgr.p2_name if data_mgr else "PLAYER 2"
-    
-    # P1
-    p1_ready = data[1] == '1'
-    c1 = COLOR_P1 if p1_ready else COLOR_DIM
-    draw_cyber_box(screen, (100, 300, 350, 250), c1, 40 if p1_ready else 10)
-    draw_glow_text(screen, p1_name, 40, c1, (275, 360))
-    status_txt = "READY" if p1_ready else "WAITING..."
-    draw_glow_text(screen, status_txt, 24, c1, (275, 420))
-    
-    # P2
-    p2_ready = data[2] == '1'
-    c2 = COLOR_P2 if p2_ready else COLOR_DIM
-    draw_cyber_box(screen, (WIDTH-450, 300, 350, 250), c2, 40 if p2_ready else 10)
-    draw_glow_text(screen, p2_name, 40, c2, (WIDTH-275, 360))
-    status_txt = "READY" if p2_ready else "WAITING..."
-    draw_glow_text(screen, status_txt, 24, c2, (WIDTH-275, 420))
-
-    pygame.draw.line(screen, COLOR_GRID, (WIDTH//2, 300), (WIDTH//2, 550), 2)
-
-def scene_ttt(screen, data):
-    if len(data) < 11: return
-    bd, cp, win = data[0:9], data[9], data[10]
-    cursor = int(data[11]) if len(data) > 11 else -1
-    
-    info = f"TURN: P{cp}"
-    col = COLOR_GLOW
-    if win == '1': info, col = "VICTORY: PLAYER 1", COLOR_P1
-    elif win == '2': info, col = "VICTORY: PLAYER 2", COLOR_P2
-    elif win == '3': info, col = "MATCH DRAW", (255, 255, 0)
-    
-    draw_glow_text(screen, info, 50, col, (WIDTH//2, 60))
-    
-    sz, sx, sy = 450, (WIDTH-450)//2, 180
-    cs = sz // 3
-    
-    # Draw Grid (Solid Lines)
-    for i in range(1, 3):
-        # Vertical
-        pygame.draw.line(screen, COLOR_GRID, (sx + i*cs, sy), (sx + i*cs, sy + sz), 3)
-        # Node effect
-        for j in range(4):
-            pygame.draw.circle(screen, COLOR_GLOW, (sx + i*cs, sy + j*cs), 4)
-
-        # Horizontal
-        pygame.draw.line(screen, COLOR_GRID, (sx, sy + i*cs), (sx + sz, sy + i*cs), 3)
-        for j in range(4):
-            pygame.draw.circle(screen, COLOR_GLOW, (sx + j*cs, sy + i*cs), 4)
-
-    draw_cyber_box(screen, (sx-10, sy-10, sz+20, sz+20), col, 0)
-
-    for i in range(9):
-        cx, cy = sx + (i%3)*cs + cs//2, sy + (i//3)*cs + cs//2
-        if i == cursor and win == '0':
-            blink = (pygame.time.get_ticks() // 200) % 2
-            if blink:
-                draw_cyber_box(screen, (sx + (i%3)*cs + 5, sy + (i//3)*cs + 5, cs-10, cs-10), COLOR_CURSOR, 40)
+
+    def static_key(self, data):
+        # Nothing on this screen moves: one blit per frame
+        return tuple(data[:3]) if len(data) >= 3 else None
+
+    def build_backdrop(self, surface, data):
+        game_id = data[0]
+        draw_cyber_box(surface, rect(LAYOUT_W//2 - 350, 50, 700, 100), COLOR_ACCENT, 30)
+        draw_glow_text(surface, self.TITLES.get(game_id, "UNKNOWN"), 50, COLOR_TEXT, pt(LAYOUT_W//2, 100))
         
-        if bd[i] == '1': 
-            pygame.draw.circle(screen, COLOR_P1, (cx, cy), 50, 6)
-            pygame.draw.circle(screen, (200, 255, 200), (cx, cy), 54, 1) 
-        elif bd[i] == '2': 
-            off = 40
-            pygame.draw.line(screen, COLOR_P2, (cx-off, cy-off), (cx+off, cy+off), 8)
-            pygame.draw.line(screen, COLOR_P2, (cx+off, cy-off), (cx-off, cy+off), 8)
-            pygame.draw.line(screen, (255, 200, 200), (cx-off, cy-off), (cx+off, cy+off), 2)
-            pygame.draw.line(screen, (255, 200, 200), (cx+off, cy-off), (cx-off, cy+off), 2)
-
-def scene_react(screen, data):
-    if len(data) < 9: return
-    tgt, p1v, p2v, p1s, p2s = data[0], data[1], data[2], data[7], data[8]
-    
-    # Target Display HUD
-    draw_cyber_box(screen, (WIDTH//2 - 200, 40, 400, 180), COLOR_ACCENT, 20)
-    draw_glow_text(screen, "TARGET LOCK", 24, COLOR_ACCENT, (WIDTH//2, 80))
-    draw_glow_text(screen, tgt, 120, COLOR_TEXT, (WIDTH//2, 150))
-    
-    def draw_hud(pid, state, val, x):
+        lines = self.INSTRUCTIONS.get(game_id, ["AWAITING DATA...", ""])
+        draw_glow_text(surface, lines[0], 24, COLOR_INFO, pt(LAYOUT_W//2, 180))
+        draw_glow_text(surface, lines[1], 24, (150, 255, 150), pt(LAYOUT_W//2, 215))
+        
+        p1_name, p2_name = _player_names(self.ctx, "PLAYER 1", "PLAYER 2")
+        
+        # P1
+        p1_ready = data[1] == '1'
+        c1 = COLOR_P1 if p1_ready else COLOR_DIM
+        draw_cyber_box(surface, rect(100, 300, 350, 250), c1, 40 if p1_ready else 10)
+        draw_glow_text(surface, p1_name, 40, c1, pt(275, 360))
+        status_txt = "READY" if p1_ready else "WAITING..."
+        draw_glow_text(surface, status_txt, 24, c1, pt(275, 420))
+        
+        # P2
+        p2_ready = data[2] == '1'
+        c2 = COLOR_P2 if p2_ready else COLOR_DIM
+        draw_cyber_box(surface, rect(LAYOUT_W - 450, 300, 350, 250), c2, 40 if p2_ready else 10)
+        draw_glow_text(surface, p2_name, 40, c2, pt(LAYOUT_W - 275, 360))
+        status_txt = "READY" if p2_ready else "WAITING..."
+        draw_glow_text(surface, status_txt, 24, c2, pt(LAYOUT_W - 275, 420))
+
+        pygame.draw.line(surface, COLOR_GRID, pt(LAYOUT_W//2, 300), pt(LAYOUT_W//2, 550), ss(2))
+
+@register_scene("TTT")
+class TicTacToeScene(Scene):
+    SIZE = ss(450)
+    X, Y = (WIDTH - SIZE) // 2, sy(180)
+    CELL = SIZE // 3
+
+    PLAYER_COLORS = {1: COLOR_P1, 2: COLOR_P2}
+    CELL_VALUES = frozenset('012')
+    MOVERS = ('1', '2')
+
+    def enter(self):
+        super().enter()
+        self.analyzer = ttt_analysis.TTTAnalyzer(self.ctx.get("ttt_rules", TTT_RULES))
+        self.analysis = None
+        self.analysis_key = None
+
+    def update(self, data):
+        # Table lookups only, and only when the position changes
+        if len(data) < 11: return
+        if not self.CELL_VALUES.issuperset(data[:9]) or data[9] not in self.MOVERS:
+            # Corrupted board or player field (line noise): no analysis until a valid one arrives
+            self.analysis = self.analysis_key = None
+            return
+        self.analyzer.observe(data[:9])
+        key = (tuple(data[:10]), ttt_analysis.ready())
+        if key != self.analysis_key:
+            self.analysis_key = key
+            self.analysis = self.analyzer.analyze(data[:9], data[9])
+
+    def static_key(self, data):
+        # Grid, pieces and banner only change when a move is made
+        return tuple(data[:11]) + (self.analysis,) if len(data) >= 11 else None
+
+    def _cell_center(self, i):
+        cs = self.CELL
+        return self.X + (i%3)*cs + cs//2, self.Y + (i//3)*cs + cs//2
+
+    def build_backdrop(self, surface, data):
+        bd, cp, win = data[0:9], data[9], data[10]
+        
+        info = f"TURN: P{cp}"
+        col = COLOR_GLOW
+        if win == '1': info, col = "VICTORY: PLAYER 1", COLOR_P1
+        elif win == '2': info, col = "VICTORY: PLAYER 2", COLOR_P2
+        elif win == '3': info, col = "MATCH DRAW", (255, 255, 0)
+        
+        draw_glow_text(surface, info, 50, col, pt(LAYOUT_W//2, 60))
+        
+        sz, gx, gy, cs = self.SIZE, self.X, self.Y, self.CELL
+        
+        # Draw Grid (Solid Lines)
+        for i in range(1, 3):
+            # Vertical
+            pygame.draw.line(surface, COLOR_GRID, (gx + i*cs, gy), (gx + i*cs, gy + sz), ss(3))
+            # Node effect
+            for j in range(4):
+                pygame.draw.circle(surface, COLOR_GLOW, (gx + i*cs, gy + j*cs), ss(4))
+
+            # Horizontal
+            pygame.draw.line(surface, COLOR_GRID, (gx, gy + i*cs), (gx + sz, gy + i*cs), ss(3))
+            for j in range(4):
+                pygame.draw.circle(surface, COLOR_GLOW, (gx + j*cs, gy + i*cs), ss(4))
+
+        m = ss(10)
+        draw_cyber_box(surface, (gx - m, gy - m, sz + 2*m, sz + 2*m), col, 0)
+
+        ana = self.analysis
+        if ana and win == '0':
+            # Threats: cells that complete a line on that player's next move
+            mark = pygame.Surface((cs - ss(40), cs - ss(40)), pygame.SRCALPHA)
+            for p, mask in enumerate(ana.threats, 1):
+                mark.fill((*self.PLAYER_COLORS[p], 35))
+                for i in range(9):
+                    if mask >> i & 1:
+                        cx, cy = self._cell_center(i)
+                        surface.blit(mark, (cx - mark.get_width()//2, cy - mark.get_height()//2))
+                        pygame.draw.rect(surface, self.PLAYER_COLORS[p], (cx - mark.get_width()//2, cy - mark.get_height()//2, *mark.get_size()), 1)
+            # Forecast with perfect play from here
+            if ana.outcome == ttt_analysis.DRAW:
+                draw_text_center(surface, "FORECAST: DRAW", 28, COLOR_INFO, (WIDTH//2, gy + sz + ss(45)))
+            elif ana.outcome:
+                draw_text_center(surface, f"FORECAST: P{ana.outcome} WINS IN {(ana.plies + 1) // 2}",
+                                 28, self.PLAYER_COLORS[ana.outcome], (WIDTH//2, gy + sz + ss(45)))
+
+        for i in range(9):
+            cx, cy = self._cell_center(i)
+            if bd[i] == '1': 
+                pygame.draw.circle(surface, COLOR_P1, (cx, cy), ss(50), ss(6))
+                pygame.draw.circle(surface, (200, 255, 200), (cx, cy), ss(54), 1)
+            elif bd[i] == '2': 
+                off = ss(40)
+                pygame.draw.line(surface, COLOR_P2, (cx-off, cy-off), (cx+off, cy+off), ss(8))
+                pygame.draw.line(surface, COLOR_P2, (cx+off, cy-off), (cx-off, cy+off), ss(8))
+                pygame.draw.line(surface, (255, 200, 200), (cx-off, cy-off), (cx+off, cy+off), 2)
+                pygame.draw.line(surface, (255, 200, 200), (cx+off, cy-off), (cx-off, cy+off), 2)
+
+        if ana and ana.line:
+            # Strike through the winning triple
+            a, b = self._cell_center(ana.line[0]), self._cell_center(ana.line[2])
+            owner = bd[ana.line[0]]
+            line_col = self.PLAYER_COLORS.get(int(owner) if owner in self.CELL_VALUES else 0, COLOR_TEXT)
+            pygame.draw.line(surface, line_col, a, b, ss(14))
+            pygame.draw.line(surface, (255, 255, 255), a, b, ss(4))
+
+    def draw(self, screen, data):
+        # Backdrop first: the cursor box goes over the grid and pieces
+        if len(data) < 11: return
+        super().draw(screen, data)
+
+    def draw_dynamic(self, screen, data):
+        cursor = int(data[11]) if len(data) > 11 and data[11].isdigit() else -1
+        if not (0 <= cursor < 9) or data[10] != '0': return
+        blink = (pygame.time.get_ticks() // 200) % 2
+        if blink:
+            cs, m = self.CELL, ss(5)
+            draw_cyber_box(screen, (self.X + (cursor%3)*cs + m, self.Y + (cursor//3)*cs + m, cs - 2*m, cs - 2*m), COLOR_CURSOR, 40)
+
+@register_scene("REACT")
+class ReactionScene(Scene):
+    def static_key(self, data):
+        # Values roll every 0.1 s, so only target, player states and locked values are cached
+        if len(data) < 9: return None
+        return (data[0], data[7], data[8],
+                data[1] if data[7] == '2' else None, data[2] if data[8] == '2' else None)
+
+    def _hud_style(self, pid, p1s, p2s):
         c, status = COLOR_DIM, "STANDBY"
         is_active = (pid==1 and p1s=='1') or (pid==2 and p2s=='1')
         is_wait_start = (pid==1 and p1s=='0' and p2s=='0') or (pid==2 and p2s=='0' and p1s=='2')
@@ -292,93 +491,161 @@ def scene_react(screen, data):
         if is_wait_start: c, status = COLOR_ACCENT, "PRESS START"
         elif is_active:   c, status = COLOR_GLOW, ">>> ROLLING <<<"
         elif is_done:     c, status = (COLOR_P1 if pid==1 else COLOR_P2), "LOCKED"
+        return c, status, is_active, is_done
+
+    def build_backdrop(self, surface, data):
+        tgt, p1s, p2s = data[0], data[7], data[8]
         
-        # HUD Background
-        draw_cyber_box(screen, (x, 300, 300, 300), c, 50 if is_active else 10)
-        draw_glow_text(screen, f"PLAYER {pid}", 40, c, (x+150, 340))
-        draw_glow_text(screen, status, 24, (200,200,200), (x+150, 390))
+        # Target Display HUD
+        draw_cyber_box(surface, rect(LAYOUT_W//2 - 200, 40, 400, 180), COLOR_ACCENT, 20)
+        draw_glow_text(surface, "TARGET LOCK", 24, COLOR_ACCENT, pt(LAYOUT_W//2, 80))
+        draw_glow_text(surface, tgt, 120, COLOR_TEXT, pt(LAYOUT_W//2, 150))
         
-        # Glass Panel for Number
-        pygame.draw.rect(screen, (0, 0, 0), (x+30, 420, 240, 120))
-        pygame.draw.rect(screen, c, (x+30, 420, 240, 120), 2)
-        draw_glow_text(screen, val, 100, (255,255,255), (x+150, 480))
+        for pid, x in ((1, 100), (2, LAYOUT_W - 400)):
+            c, status, is_active, is_done = self._hud_style(pid, p1s, p2s)
+            # HUD Background
+            draw_cyber_box(surface, rect(x, 300, 300, 300), c, 50 if is_active else 10)
+            draw_glow_text(surface, f"PLAYER {pid}", 40, c, pt(x+150, 340))
+            draw_glow_text(surface, status, 24, (200,200,200), pt(x+150, 390))
+            
+            # Glass Panel for Number
+            pygame.draw.rect(surface, (0, 0, 0), rect(x+30, 420, 240, 120))
+            pygame.draw.rect(surface, c, rect(x+30, 420, 240, 120), ss(2))
+
+            if is_done:
+                val = data[pid]
+                try: diff = abs(int(tgt) - int(val))
+                except: diff = 999
+                draw_glow_text(surface, f"ERROR: {diff}", 28, c, pt(x+150, 560))
+
+    def draw(self, screen, data):
+        if len(data) < 9: return
+        super().draw(screen, data)
+
+    def draw_dynamic(self, screen, data):
+        for val, x in ((data[1], 100), (data[2], LAYOUT_W - 400)):
+            draw_number(screen, val, 100, (255,255,255), pt(x+150, 480))
+
+@register_scene("WAM")
+class WhacAMoleScene(Scene):
+    def static_key(self, data):
+        # Scores and player states change a few times per round
+        return (data[0], data[1], data[7], data[8]) if len(data) >= 18 else None
+
+    def build_backdrop(self, surface, data):
+        s1, s2, p1s, p2s = data[0], data[1], data[7], data[8]
         
-        if is_done:
-            try: diff = abs(int(tgt) - int(val))
-            except: diff = 999
-            draw_glow_text(screen, f"ERROR: {diff}", 28, c, (x+150, 560))
-
-    draw_hud(1, p1s, p1v, 100)
-    draw_hud(2, p2s, p2v, WIDTH-400)
-
-def scene_wam(screen, data):
-    if len(data) < 18: return
-    s1, s2, inp, hit, miss = data[0], data[1], data[2], data[3], data[4]
-    p1s, p2s, moles = data[7], data[8], data[9:18]
-    
-    # 1. Top HUD
-    col_p1 = COLOR_P1 if p1s == '1' else COLOR_DIM
-    col_p2 = COLOR_P2 if p2s == '1' else COLOR_DIM
-    
-    draw_glow_text(screen, f"P1: {s1}", 50, col_p1, (150, 50))
-    draw_glow_text(screen, f"P2: {s2}", 50, col_p2, (WIDTH-150, 50))
-    
-    status = "INTERMISSION"
-    if p1s=='0' and p2s=='0': status = "P1: PRESS BUTTON TO START"
-    elif p1s=='1': status = "PLAYER 1 ENGAGED"
-    elif p1s=='2' and p2s=='0': status = "P2: PRESS BUTTON TO START"
-    elif p2s=='1': status = "PLAYER 2 ENGAGED"
-    elif p2s=='2': status = "MISSION COMPLETE"
-    draw_glow_text(screen, status, 28, COLOR_INFO, (WIDTH//2, 130))
-
-    try: max_t=60000.0; cur=float(data[5]); prog=cur/max_t; sec=cur/10000.0
-    except: prog, sec = 0, 0.0
-    draw_progress_bar(screen, WIDTH//2-200, 70, 400, 15, prog, COLOR_P1 if sec>10 else COLOR_DANGER)
-    draw_glow_text(screen, f"{sec:.1f}s", 20, (200,200,200), (WIDTH//2, 95))
-
-    # 2. 3D Isometric Grid & Moles
-    grid_center_x = WIDTH // 2
-    grid_center_y = HEIGHT // 2 + 100
-    gap_x = 150
-    gap_y = 80 
-    
-    # Draw Order: Back to Front
-    order = [0, 1, 2, 3, 4, 5, 6, 7, 8]
-    
-    for i in order:
-        row = i // 3
-        col = i % 3
+        # 1. Top HUD
+        col_p1 = COLOR_P1 if p1s == '1' else COLOR_DIM
+        col_p2 = COLOR_P2 if p2s == '1' else COLOR_DIM
         
-        # Isometric Calculation
-        off_x = (col - 1) * gap_x
-        off_y = (row - 1) * gap_y
-        cx = grid_center_x + off_x
-        cy = grid_center_y + off_y
+        draw_glow_text(surface, f"P1: {s1}", 50, col_p1, pt(150, 50))
+        draw_glow_text(surface, f"P2: {s2}", 50, col_p2, pt(LAYOUT_W - 150, 50))
+        
+        status = "INTERMISSION"
+        if p1s=='0' and p2s=='0': status = "P1: PRESS BUTTON TO START"
+        elif p1s=='1': status = "PLAYER 1 ENGAGED"
+        elif p1s=='2' and p2s=='0': status = "P2: PRESS BUTTON TO START"
+        elif p2s=='1': status = "PLAYER 2 ENGAGED"
+        elif p2s=='2': status = "MISSION COMPLETE"
+        draw_glow_text(surface, status, 28, COLOR_INFO, pt(LAYOUT_W//2, 130))
+
+    def draw(self, screen, data):
+        if len(data) < 18: return
+        super().draw(screen, data)
+
+    def draw_dynamic(self, screen, data):
+        p1s, p2s, moles = data[7], data[8], data[9:18]
+
+        try: max_t=60000.0; cur=float(data[5]); prog=cur/max_t; sec=cur/10000.0
+        except: prog, sec = 0, 0.0
+        draw_progress_bar(screen, *rect(LAYOUT_W//2 - 200, 70, 400, 15), prog, COLOR_P1 if sec>10 else COLOR_DANGER)
+        draw_number(screen, f"{sec:.1f}s", 20, (200,200,200), pt(LAYOUT_W//2, 95))
+
+        # 2. 3D Isometric Grid & Moles
+        grid_center_x, grid_center_y = pt(LAYOUT_W//2, LAYOUT_H//2 + 100)
+        gap_x = sx(150)
+        gap_y = sy(80)
         
-        is_mole = (moles[i] == '1')
         active_color = COLOR_P1 if p1s=='1' else COLOR_P2
         if p1s!='1' and p2s!='1': active_color = COLOR_DIM
+
+        # Draw Order: Back to Front
+        for i in range(9):
+            row = i // 3
+            col = i % 3
+            
+            # Isometric Calculation
+            cx = grid_center_x + (col - 1) * gap_x
+            cy = grid_center_y + (row - 1) * gap_y
+            
+            # Call 3D Drawing Function
+            draw_3d_mole(screen, cx, cy, moles[i] == '1', active_color, str(i+1))
+
+        # Hit/Miss popups are drawn by EventPopups (event driven, see below)
+
+@register_scene("END")
+class EndScene(Scene):
+    def static_key(self, data):
+        # The debrief never changes while it is shown
+        return tuple(data[:3]) if len(data) >= 3 else None
+
+    def build_backdrop(self, surface, data):
+        win, w1, w2 = data[0], data[1], data[2]
+        
+        draw_cyber_box(surface, rect(100, 150, LAYOUT_W - 200, 400), (255, 215, 0), 20)
         
-        # Call 3D Drawing Function
-        draw_3d_mole(screen, cx, cy, is_mole, active_color, str(i+1))
+        p1n, p2n = _player_names(self.ctx, "P1", "P2")
+        
+        champ, cc = "DRAW MATCH", (200, 200, 200)
+        if win == '1': champ, cc = f"VICTORY: {p1n}", COLOR_P1
+        elif win == '2': champ, cc = f"VICTORY: {p2n}", COLOR_P2
+        
+        draw_glow_text(surface, "MISSION DEBRIEF", 50, (255,255,255), pt(LAYOUT_W//2, 220))
+        draw_glow_text(surface, champ, 80, cc, pt(LAYOUT_W//2, 320))
+        draw_glow_text(surface, f"{p1n}: {w1}  ||  {p2n}: {w2}", 30, COLOR_INFO, pt(LAYOUT_W//2, 450))
 
-    # Hit/Miss Popups (Draw LAST to prevent overlap)
-    if hit=='1': draw_glow_text(screen, "CRITICAL HIT!", 80, (0,255,0), (WIDTH//2, HEIGHT//2), 3)
-    elif miss=='1': draw_glow_text(screen, "MISS!", 80, (255,0,0), (WIDTH//2, HEIGHT//2), 3)
+# ==========================================
+#   EVENT ANIMATIONS
+# ==========================================
+class EventPopups:
+    """
+    Hit/Miss popups driven by game events instead of the per-packet flags,
+    so a popup stays up for `duration` seconds even if the next packet
+    clears the flag right away. Drawn last, on top of the scene.
+    """
+    STYLES = {
+        MOLE_HIT: ("CRITICAL HIT!", (0, 255, 0)),
+        MISS:     ("MISS!", (255, 0, 0)),
+    }
 
-def scene_end(screen, data, data_mgr):
-    if len(data)<3: return
-    win, w1, w2 = data[0], data[1], data[2]
-    
-    draw_cyber_box(screen, (100, 150, WIDTH-200, 400), (255, 215, 0), 20)
-    
-    p1n = data_mgr.p1_name if data_mgr else "P1"
-    p2n = data_mgr.p2_name if data_mgr else "P2"
-    
-    champ, cc = "DRAW MATCH", (200, 200, 200)
-    if win == '1': champ, cc = f"VICTORY: {p1n}", COLOR_P1
-    elif win == '2': champ, cc = f"VICTORY: {p2n}", COLOR_P2
-    
-    draw_glow_text(screen, "MISSION DEBRIEF", 50, (255,255,255), (WIDTH//2, 220))
-    draw_glow_text(screen, champ, 80, cc, (WIDTH//2, 320))
-    draw_glow_text(screen, f"{p1n}: {w1}  ||  {p2n}: {w2}", 30, COLOR_INFO, (WIDTH//2, 450))
\ No newline at end of file
+    def __init__(self, duration=POPUP_DURATION):
+        self.duration = duration
+        self.active = None   # (text, color, start)
+
+    def subscribe(self, event_bus):
+        for event_type in self.STYLES:
+            event_bus.subscribe(event_type, self.on_event, deferred=True)
+        event_bus.subscribe(SCENE_ENTERED, self.clear, deferred=True)
+
+    def on_event(self, event):
+        text, color = self.STYLES[event.type]
+        self.active = (text, color, time.perf_counter())
+
+    def clear(self, event=None):
+        self.active = None
+
+    def draw(self, screen):
+        self._draw(screen, (WIDTH//2, HEIGHT//2), 80)
+
+    def draw_native(self, window, to_window, scale):
+        """RenderTarget HUD callback: same popup, in window pixels."""
+        self._draw(window, to_window((WIDTH//2, HEIGHT//2)), round(80 * scale))
+
+    def _draw(self, surface, center, size):
+        if not self.active: return
+        text, color, start = self.active
+        if time.perf_counter() - start > self.duration:
+            self.active = None
+            return
+        draw_glow_text(surface, text, size, color, center, 3)
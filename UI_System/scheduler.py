@@ -0,0 +1,116 @@
+import gc
+import time
+from collections import deque
+from config import *
+from logs import get_logger
+
+log = get_logger("idle")
+
+# ==========================================
+#   IDLE-TIME SCHEDULER
+# ==========================================
+# A frame at 60 FPS has 16.7 ms; drawing usually takes a fraction and
+# clock.tick() sleeps the rest. run() is called right before clock.tick()
+# and spends that slack (minus IDLE_RESERVE) on queued low-priority work:
+#
+#   scheduler.submit("history", data_mgr.save_game, winner, s1, s2)
+#   scheduler.submit_steps("warm", warm_caches())   # generator, one step per yield
+#
+# Tasks run in FIFO order, one step at a time, until the slack is used up.
+# An over-budget frame runs nothing; after IDLE_MAX_DEFER such frames in a
+# row one step runs anyway, so work can't starve on slow hardware.
+#
+# With gc_control the cyclic GC is switched off and collections run here,
+# the oldest generation that is due (like the automatic GC) when the
+# slack is large enough. Startup objects are frozen (gc.freeze) so full
+# collections don't walk them again.
+
+class IdleScheduler:
+    """Cooperative low-priority work in the frame's idle time."""
+    def __init__(self, fps=FPS, reserve=IDLE_RESERVE, gc_control=IDLE_GC):
+        self.frame_time = 1.0 / fps
+        self.reserve = reserve
+        self.tasks = deque()        # (task class, iterator)
+        self.frame_start = time.perf_counter()
+        self.deferred_frames = 0
+        self.last_run = 0.0         # Seconds spent in the last run() (excluded from frame time)
+        self.stats = {}             # task class -> [steps, seconds, longest step]
+        self.gc_control = gc_control
+        self.gc_thresholds = gc.get_threshold()
+        if gc_control:
+            gc.freeze()
+            gc.disable()
+
+    # --- Queueing (any thread) ---
+    def submit(self, task_class, fn, *args):
+        """Queues a single call."""
+        def once():
+            fn(*args)
+            yield
+        self.tasks.append((task_class, once()))
+
+    def submit_steps(self, task_class, steps):
+        """Queues a generator; each next() should take well under a millisecond."""
+        self.tasks.append((task_class, iter(steps)))
+
+    # --- Frame hooks (render thread) ---
+    def frame_begin(self):
+        self.frame_start = time.perf_counter()
+
+    def run(self):
+        """Spends the rest of this frame's budget. Call right before clock.tick()."""
+        t0 = time.perf_counter()
+        deadline = self.frame_start + self.frame_time - self.reserve
+        if self.gc_control: self._collect(deadline)   # Forced collections ignore the deadline
+        if self.tasks and time.perf_counter() >= deadline:
+            self.deferred_frames += 1
+            if self.deferred_frames >= IDLE_MAX_DEFER:
+                deadline = 0.0   # Starving: one step, then back to frames
+        while self.tasks and (time.perf_counter() < deadline or not deadline):
+            task_class, steps = self.tasks[0]
+            s0 = time.perf_counter()
+            try:
+                next(steps)
+            except StopIteration:
+                self.tasks.popleft()
+            except Exception as e:
+                self.tasks.popleft()
+                log.warning("Task %s failed: %s", task_class, e)
+            self._account(task_class, time.perf_counter() - s0)
+            self.deferred_frames = 0
+            if not deadline: break
+        self.last_run = time.perf_counter() - t0
+
+    def _collect(self, deadline):
+        # Same rule as the automatic GC: the oldest generation whose count
+        # reached its threshold (collecting it includes the younger ones)
+        counts = gc.get_count()
+        due = [g for g in range(3) if counts[g] >= self.gc_thresholds[g]]
+        if not due: return
+        gen = due[-1]
+        # Expected cost: average of earlier collections of this generation
+        steps, total, _ = self.stats.get(f"gc{gen}", (1, IDLE_GC_ESTIMATE[gen], 0))
+        if time.perf_counter() + total / steps > deadline and counts[0] < IDLE_GC_FORCE:
+            return   # Not enough slack: try again next frame
+        s0 = time.perf_counter()
+        gc.collect(gen)
+        self._account(f"gc{gen}", time.perf_counter() - s0)
+
+    def _account(self, task_class, dt):
+        entry = self.stats.setdefault(task_class, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += dt
+        entry[2] = max(entry[2], dt)
+
+    def stop(self):
+        """Hands the GC back (on exit)."""
+        if self.gc_control:
+            gc.enable()
+            gc.unfreeze()
+
+    def print_report(self, frames):
+        if not self.stats: return
+        log.info(f"Idle work over {frames} frames (budget {self.frame_time*1000:.1f} ms/frame):")
+        for task_class, (steps, total, longest) in sorted(self.stats.items(), key=lambda kv: -kv[1][1]):
+            log.info(f"  {task_class:<8} steps={steps} total={total*1000:.1f} ms "
+                     f"({total * 100 / max(frames * self.frame_time, 1e-9):.2f}% of budget) longest={longest*1000:.2f} ms")
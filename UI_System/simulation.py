@@ -0,0 +1,260 @@
+import time
+import json
+import random
+import argparse
+from config import *
+
+# ==========================================
+#   VIRTUAL CLOCK
+# ==========================================
+class VirtualClock:
+    """
+    Scenario time source. Scenarios only ever 'sleep' on this clock.
+    speed = 1.0 -> real time, speed = N -> N times faster,
+    speed = 0   -> as fast as possible (no wall-clock waiting at all).
+    """
+    def __init__(self, speed=1.0):
+        self.speed = speed
+        self.now = 0.0
+        self.wall_start = time.perf_counter()
+
+    def sleep(self, dt):
+        self.now += dt
+        if self.speed > 0:
+            delay = self.wall_start + self.now / self.speed - time.perf_counter()
+            if delay > 0: time.sleep(delay)
+
+# ==========================================
+#   SCENARIO DEFINITIONS (DATA)
+# ==========================================
+# Each scenario is a set of knobs for the match generator below.
+# Missing knobs fall back to DEFAULT_KNOBS. None means "random".
+DEFAULT_KNOBS = {
+    "ttt_moves": None,          # Cell sequence, e.g. [4, 0, 3]; None = random legal moves
+    "think_steps": 3,           # Cursor wander packets before each move
+    "react_target": None,       # Target number (1-100)
+    "react_results": None,      # [P1, P2] locked numbers
+    "wam_round_ticks": 60000,   # Round length in 100us ticks
+    "wam_hit_rate": 0.7,        # Chance a mole is hit before it hides
+    "wam_wrong_key_rate": 0.1,  # Chance of a wrong key before the hit/timeout
+    "hint_resends": 10,         # HINT is re-sent continuously by the firmware
+    "end_resends": 30,          # So is END
+}
+
+SCENARIOS = {
+    # The classic demo script (P1 wins TTT, P2 wins the rest)
+    "session":        {"ttt_moves": [4, 0, 3, 5, 2, 1, 6], "react_target": 50,
+                       "react_results": [48, 55], "wam_hit_rate": 1.0, "wam_wrong_key_rate": 0.0},
+    "random":         {},
+    "ttt_draw":       {"ttt_moves": [4, 0, 8, 2, 1, 7, 6, 3, 5]},
+    "react_tie":      {"react_target": 50, "react_results": [47, 53]},
+    "wam_timeouts":   {"wam_hit_rate": 0.0, "wam_wrong_key_rate": 0.0},
+    "wam_wrong_keys": {"wam_hit_rate": 0.5, "wam_wrong_key_rate": 1.0},
+}
+
+WIN_LINES = [(0,1,2), (3,4,5), (6,7,8), (0,3,6), (1,4,7), (2,5,8), (0,4,8), (2,4,6)]
+
+def load_scenario(name):
+    """Returns knobs for a built-in scenario name or a JSON file path."""
+    if name.endswith('.json'):
+        with open(name, encoding='utf-8') as f:
+            return json.load(f)
+    if name not in SCENARIOS:
+        raise KeyError(f"Unknown scenario '{name}'. Available: {', '.join(SCENARIOS)}")
+    return SCENARIOS[name]
+
+# ==========================================
+#   MATCH GENERATOR
+# ==========================================
+# Every stage yields (delay_sec, scene, fields) steps. Fields are lists
+# of strings, exactly as the serial worker would decode them.
+
+def _hint(game, k):
+    for i in range(k["hint_resends"]):
+        p1 = '1' if i >= k["hint_resends"] // 3 else '0'
+        p2 = '1' if i >= 2 * k["hint_resends"] // 3 else '0'
+        yield 0.1, "HINT", [str(game), p1, p2]
+
+def _ttt(rng, k):
+    """Yields TTT steps and returns the winner (0 draw, 1, 2)."""
+    board = [0] * 9
+    moves = k["ttt_moves"]
+    player, winner, turn = 1, 0, 0
+    while winner == 0 and 0 in board:
+        if moves is not None:
+            if turn >= len(moves): break
+            move = moves[turn]
+        else:
+            move = rng.choice([i for i in range(9) if board[i] == 0])
+
+        # Cursor thinking, then lock on target cell
+        for _ in range(k["think_steps"]):
+            yield 0.15, "TTT", [str(x) for x in board] + [str(player), '0', str(rng.randint(0, 8))]
+        yield 0.4, "TTT", [str(x) for x in board] + [str(player), '0', str(move)]
+
+        board[move] = player
+        if any(all(board[i] == player for i in line) for line in WIN_LINES):
+            winner = player
+        player = 2 if player == 1 else 1
+        turn += 1
+        yield 0.5, "TTT", [str(x) for x in board] + [str(player), str(winner), str(move)]
+
+    # Firmware keeps showing the final board for a while
+    yield 3.0, "TTT", [str(x) for x in board] + [str(player), str(winner), str(move)]
+    return winner
+
+def _react(rng, k):
+    """Yields REACT steps (counter rolls +1 every 0.1s, like the firmware)."""
+    target = k["react_target"] or rng.randint(1, 100)
+    finals = k["react_results"] or [rng.randint(0, 99), rng.randint(0, 99)]
+    disp, res, state = [0, 0], ['-1', '-1'], ['0', '0']
+    tick = 0
+
+    def pkt(win='-1'):
+        return [str(target), str(disp[0]), str(disp[1]), res[0], res[1], win,
+                str(tick), state[0], state[1]]
+
+    for p in range(2):
+        for _ in range(5): yield 0.2, "REACT", pkt()   # Waiting for start press
+        state[p] = '1'
+        while disp[p] != finals[p]:
+            disp[p] = (disp[p] + 1) % 100
+            tick = (tick + 1000) % 100000
+            yield 0.1, "REACT", pkt()
+        res[p], state[p] = str(finals[p]), '2'
+        yield 1.5, "REACT", pkt()
+
+    d1, d2 = abs(finals[0] - target), abs(finals[1] - target)
+    winner = 1 if d1 < d2 else 2 if d2 < d1 else 0
+    yield 4.0, "REACT", pkt(str(winner))
+    return winner
+
+def _wam(rng, k):
+    """Yields WAM steps for both rounds, packets every 0.1s of game time."""
+    scores = [0, 0]
+    state = ['0', '0']
+    moles = ['0'] * 9
+
+    def pkt(key='N', hit='0', miss='0', remaining=k["wam_round_ticks"], win='-1'):
+        return [str(scores[0]), str(scores[1]), key, hit, miss, str(remaining), win,
+                state[0], state[1]] + moles
+
+    for p in range(2):
+        for _ in range(10): yield 0.1, "WAM", pkt()     # Press button to start
+        state[p] = '1'
+        remaining = k["wam_round_ticks"]
+        hole, life = -1, 0
+        while remaining > 0:
+            remaining = max(0, remaining - 1000)
+            key, hit, miss = 'N', '0', '0'
+            if hole < 0:
+                hole, life = rng.randint(0, 8), rng.randint(4, 8)
+                moles[hole] = '1'
+                fate_hit = rng.random() < k["wam_hit_rate"]
+                wrong_key = rng.random() < k["wam_wrong_key_rate"]
+            else:
+                life -= 1
+                if wrong_key and life == 3:
+                    key, miss = str((hole + rng.randint(1, 8)) % 9 + 1), '1'
+                    wrong_key = False
+                elif fate_hit and life <= 1:
+                    key, hit = str(hole + 1), '1'
+                    scores[p] += 10
+                    moles[hole], hole = '0', -1
+                elif life <= 0:
+                    miss = '1'  # Timeout
+                    moles[hole], hole = '0', -1
+            yield 0.1, "WAM", pkt(key, hit, miss, remaining)
+        moles = ['0'] * 9
+        state[p] = '2'
+        yield 1.0, "WAM", pkt(remaining=0)
+
+    winner = 1 if scores[0] > scores[1] else 2 if scores[1] > scores[0] else 0
+    yield 3.0, "WAM", pkt(remaining=0, win=str(winner))
+    return winner
+
+def generate_match(knobs, rng):
+    """Yields one full START -> TTT -> REACT -> WAM -> END session."""
+    k = dict(DEFAULT_KNOBS, **knobs)
+    yield 1.0, "START", []
+    wins = [0, 0, 0]
+    for game, stage in ((1, _ttt), (2, _react), (3, _wam)):
+        yield from _hint(game, k)
+        winner = yield from stage(rng, k)
+        wins[winner] += 1
+    champ = 1 if wins[1] > wins[2] else 2 if wins[2] > wins[1] else 0
+    for _ in range(k["end_resends"]):
+        yield 0.2, "END", [str(champ), str(wins[1]), str(wins[2])]
+
+# ==========================================
+#   ENGINE
+# ==========================================
+class SimulationEngine:
+    """
+    Plays scenarios on a VirtualClock and pushes every packet into `sink`
+    (normally workers.ingest_packet, i.e. the same path as real UART data).
+    """
+    def __init__(self, sink, scenario=SIM_SCENARIO, speed=SIM_SPEED, seed=SIM_SEED):
+        self.sink = sink
+        self.knobs = load_scenario(scenario)
+        self.clock = VirtualClock(speed)
+        self.rng = random.Random(seed)
+        self.packets = 0
+
+    def run(self, matches=None, max_packets=None):
+        """Runs `matches` sessions (None = forever). Returns packets sent."""
+        played = 0
+        while matches is None or played < matches:
+            for delay, scene, data in generate_match(self.knobs, self.rng):
+                self.clock.sleep(delay)
+                self.sink(scene, data)
+                self.packets += 1
+                if max_packets is not None and self.packets >= max_packets:
+                    return self.packets
+            played += 1
+        return self.packets
+
+# ==========================================
+#   SOAK TEST (CLI)
+# ==========================================
+def soak(packets, scenario, seed):
+    """
+    Pushes `packets` packets through the full host pipeline as fast as
+    possible: firmware framing -> parse_frame -> ingest_packet ->
+    StateDiffer events -> SoundManager / DataManager subscribers.
+    """
+    import os, tempfile
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from protocol import format_frame, parse_frame
+    from workers import ingest_packet, packet_listeners
+    from managers import SoundManager, DataManager
+    from events import bus, StateDiffer
+
+    # Match results go to a throwaway history file, removed with the directory
+    with tempfile.TemporaryDirectory(prefix="soak_") as tmp:
+        sound_mgr = SoundManager()
+        data_mgr = DataManager(filename=os.path.join(tmp, "soak_history.csv"))
+        packet_listeners.append(StateDiffer(bus).on_packet)
+        sound_mgr.subscribe(bus)
+        data_mgr.subscribe(bus)
+
+        def sink(scene, data):
+            scene, data = parse_frame(format_frame(scene, data))
+            ingest_packet(scene, data)
+            bus.dispatch()
+
+        engine = SimulationEngine(sink, scenario, speed=0, seed=seed)
+        t0 = time.perf_counter()
+        engine.run(max_packets=packets)
+        dt = time.perf_counter() - t0
+    print(f"[SIM] Soak: {engine.packets} packets in {dt:.2f}s "
+          f"({engine.packets / dt:,.0f} pkt/s, {engine.clock.now / dt:,.0f}x real time, "
+          f"{bus.published} events)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Virtual-clock scenario runner")
+    parser.add_argument("--scenario", default="random", help="Scenario name or .json knob file")
+    parser.add_argument("--packets", type=int, default=1000000, help="Packets to push")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    soak(args.packets, args.scenario, args.seed)
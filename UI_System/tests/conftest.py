@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The UI modules import each other flat (`from config import *`), as when run from UI_System/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
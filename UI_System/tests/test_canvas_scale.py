@@ -0,0 +1,75 @@
+import os
+import sys
+import json
+import subprocess
+import pytest
+
+UI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Every module copies WIDTH/HEIGHT at import time, so each canvas size
+# renders in its own interpreter, the way main.py applies --canvas
+RENDER = r'''
+import sys, json
+import config
+config.CANVAS_SIZE = config.WIDTH, config.HEIGHT = int(sys.argv[1]), int(sys.argv[2])
+import pygame
+pygame.init()
+pygame.display.set_mode(config.CANVAS_SIZE)
+from quality import governor, TIER_REDUCED
+governor.set_fixed(TIER_REDUCED)   # No bloom halos, static reticles
+import scenes
+from scene_manager import SCENE_REGISTRY
+
+PACKETS = {
+    "WAITING": [],
+    "HINT":  ['1', '1', '0'],
+    "TTT":   ['1', '2', '0', '0', '1', '0', '0', '0', '2', '1', '0', '4'],
+    "REACT": ['42', '17', '0', '0', '0', '0', '0', '1', '0'],
+    "WAM":   ['3', '1', 'N', '0', '0', '400000', '-1', '1', '0', '1', '0', '0', '0', '1', '0', '0', '0', '1'],
+    "END":   ['1', '2', '1'],
+}
+config.shared_state["connected"] = True
+config.shared_state["last_update"] = 0
+out = {}
+for name, data in PACKETS.items():
+    scene = SCENE_REGISTRY[name]({"ttt_rules": "classic"})
+    scene.enter()
+    scene.update(data)
+    surface = pygame.Surface(config.CANVAS_SIZE, pygame.SRCALPHA)
+    scene.draw(surface, data)
+    out[name] = list(surface.get_bounding_rect())
+surface = pygame.Surface(config.CANVAS_SIZE, pygame.SRCALPHA)
+scenes.draw_link_stalled(surface)
+out["STALLED"] = list(surface.get_bounding_rect())
+print(json.dumps(out))
+'''
+
+def render(w, h):
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    proc = subprocess.run([sys.executable, "-c", RENDER, str(w), str(h)], cwd=UI_DIR, env=env,
+                          capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stderr
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+@pytest.fixture(scope="module")
+def full():
+    return render(1300, 800)
+
+@pytest.mark.parametrize("size", [(650, 400), (975, 600)])
+def test_scenes_scale_with_the_canvas(full, size):
+    """Every scene covers the same part of a reduced canvas as of the 1300x800 one."""
+    w, h = size
+    scaled = render(w, h)
+    for name, (x, y, rw, rh) in full.items():
+        assert rw and rh, f"{name} drew nothing"
+        expect = (x * w / 1300, y * h / 800, rw * w / 1300, rh * h / 800)
+        got = scaled[name]
+        for axis, (e, g) in enumerate(zip(expect, got)):
+            tol = max(6, 0.04 * (w if axis % 2 == 0 else h))
+            assert abs(e - g) <= tol, f"{name} at {w}x{h}: {got} vs scaled {[round(v) for v in expect]}"
+
+def test_other_aspect_ratio_stays_on_canvas():
+    """A 4:3 canvas scales fonts by the smaller factor: nothing runs off the edges."""
+    for name, (x, y, rw, rh) in render(800, 600).items():
+        assert rw and rh, f"{name} drew nothing"
+        assert x > 0 and y > 0 and x + rw < 800 and y + rh < 600, f"{name} touches the canvas edge"
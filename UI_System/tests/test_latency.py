@@ -0,0 +1,31 @@
+from config import shared_state
+from latency import LatencyTracer
+
+def ingest(tracer, scene="REACT"):
+    shared_state["seq"] += 1
+    tracer.on_packet(scene, [])
+
+def test_consume_stops_at_the_seq_the_frame_read():
+    tracer = LatencyTracer()
+    ingest(tracer)
+    tracer.frame_begin()
+    seq = shared_state["seq"]
+    ingest(tracer)   # Arrives after the frame read its packet
+    tracer.consume(seq)
+    tracer.frame_end()
+    assert [r["seq"] for r in tracer.packets] == [seq]
+    assert len(tracer.pending) == 1 and not tracer.superseded
+
+    tracer.frame_begin()
+    tracer.consume(shared_state["seq"])
+    tracer.frame_end()
+    assert [r["seq"] for r in tracer.packets] == [seq, seq + 1]
+
+def test_older_packets_are_superseded():
+    tracer = LatencyTracer()
+    ingest(tracer)
+    ingest(tracer)
+    tracer.frame_begin()
+    tracer.consume(shared_state["seq"])
+    tracer.frame_end()
+    assert len(tracer.packets) == 1 and tracer.superseded == {"REACT": 1}
@@ -0,0 +1,11 @@
+from highlights import PacketRecorder, read_log, read_log_header
+
+def test_close_writes_every_queued_packet(tmp_path):
+    path = tmp_path / "match.log"
+    recorder = PacketRecorder(str(path), "classic")
+    for i in range(200):
+        recorder.on_packet("REACT", [str(i), '17', '0', '0', '0', '0', '0', '1', '0'])
+    recorder.close()
+    packets = read_log(str(path))
+    assert read_log_header(str(path)) == {"ttt_rules": "classic"}
+    assert [p[2][0] for p in packets] == [str(i) for i in range(200)]
@@ -0,0 +1,38 @@
+import pytest
+import pygame
+import scenes
+
+BOARD = ['1', '2', '0', '0', '1', '0', '0', '0', '2']
+
+@pytest.fixture
+def scene():
+    scene = scenes.TicTacToeScene({"ttt_rules": "three"})
+    scene.enter()
+    return scene
+
+def test_valid_packet_is_analyzed(scene):
+    scene.update(BOARD + ['1', '0', '4'])
+    assert scene.analysis is not None
+
+@pytest.mark.parametrize("mover", ['X', '0', '', '12'])
+def test_corrupted_player_field_skips_analysis(scene, mover):
+    scene.update(BOARD + ['1', '0', '4'])
+    scene.update(BOARD + [mover, '0', '4'])
+    assert scene.analysis is None
+
+def test_corrupted_board_skips_analysis(scene):
+    scene.update(BOARD[:8] + ['7', '1', '0', '4'])
+    assert scene.analysis is None
+
+def test_cursor_is_drawn_over_the_pieces(scene, monkeypatch):
+    pygame.init()
+    pygame.display.set_mode((scenes.WIDTH, scenes.HEIGHT))
+    monkeypatch.setattr(pygame.time, "get_ticks", lambda: 200)   # Blink on
+    cx, cy = scene._cell_center(4)   # P1's ring
+    def pixel(cursor):
+        data = BOARD + ['1', '0', cursor]
+        scene.update(data)
+        screen = pygame.Surface((scenes.WIDTH, scenes.HEIGHT), pygame.SRCALPHA)
+        scene.draw(screen, data)
+        return screen.get_at((cx + scenes.ss(47), cy))
+    assert pixel('4') != pixel('9')
@@ -0,0 +1,280 @@
+import os
+import zlib
+import threading
+from collections import deque, namedtuple
+from config import *
+from logs import get_logger
+
+log = get_logger("ttt")
+
+# ==========================================
+#   TIC-TAC-TOE ANALYSIS TABLES
+# ==========================================
+# Board index: sum(cell * 3**i) over the 9 protocol values (0 empty, 1 P1,
+# 2 P2), so every board has one slot in a 3^9 = 19683 entry table.
+#
+# Two rule sets:
+#   classic  pieces stay until the board is full (the simulator)
+#   three    each player keeps at most 3 pieces, placing a 4th removes the
+#            oldest one (TIC_TAC_TOE.c). The board alone doesn't say which
+#            piece goes next, so its table has 6x6 slots per board for the
+#            order of each player's pieces and 2 for the player to move.
+#
+# Value byte: outcome | plies << 2, 0 = unreachable
+#   outcome 1 / 2 = that player wins with best play, 3 = draw
+#   plies   moves until that happens (capped at 63)
+# "three" has cycles (pieces move around forever), so values come from a
+# retrograde analysis instead of plain minimax.
+
+WIN_LINES = ((0,1,2), (3,4,5), (6,7,8), (0,3,6), (1,4,7), (2,5,8), (0,4,8), (2,4,6))
+RULES = ("classic", "three")
+BOARDS = 3 ** 9
+DRAW = 3
+NO_LINE = 255
+
+Analysis = namedtuple("Analysis", "line threats outcome plies")
+#   line     winning triple on the board, or None
+#   threats  (P1 mask, P2 mask): cells that would complete a line next move
+#   outcome  1 / 2 / DRAW with best play, None while unknown
+#   plies    moves until the outcome
+
+# --- Static tables (cheap, built at import) ---
+_POW3 = [3 ** i for i in range(9)]
+_THIRD = [NO_LINE] * 81   # a*9+b -> cell completing the line through a and b
+for _line in WIN_LINES:
+    for _a in _line:
+        for _b in _line:
+            if _a != _b:
+                _THIRD[_a * 9 + _b] = sum(_line) - _a - _b
+
+def board_index(board):
+    """Protocol board (9 values, str or int) -> table index."""
+    return sum(int(v) * p for v, p in zip(board, _POW3))
+
+def _cells(idx):
+    out = []
+    for _ in range(9):
+        idx, v = divmod(idx, 3)
+        out.append(v)
+    return out
+
+def _build_board_tables():
+    """Per board: winning line and threat masks (classic semantics)."""
+    line_of = bytearray(BOARDS)
+    threats = ([0] * BOARDS, [0] * BOARDS)
+    for idx in range(BOARDS):
+        b = _cells(idx)
+        line = NO_LINE
+        for n, (x, y, z) in enumerate(WIN_LINES):
+            vals = (b[x], b[y], b[z])
+            if vals[0] and vals[0] == vals[1] == vals[2]:
+                line = n
+                break
+            for p in (1, 2):
+                if vals.count(p) == 2 and vals.count(0) == 1:
+                    threats[p - 1][idx] |= 1 << (x, y, z)[vals.index(0)]
+        line_of[idx] = line
+    return line_of, threats
+
+_LINE_OF, _THREATS = _build_board_tables()
+
+# --- Order rank: which permutation of the sorted cells the queue is ---
+_PERMS = {n: [] for n in range(4)}
+for _q in ((), (0,), (0, 1), (1, 0), (0, 1, 2), (0, 2, 1), (1, 0, 2), (1, 2, 0), (2, 0, 1), (2, 1, 0)):
+    _PERMS[len(_q)].append(_q)
+
+def _rank(queue):
+    """Queue (oldest first) -> index of its order among the sorted cells (0-5)."""
+    s = sorted(queue)
+    return _PERMS[len(queue)].index(tuple(s.index(c) for c in queue))
+
+def three_index(q1, q2, mover):
+    board = sum(_POW3[c] for c in q1) + sum(2 * _POW3[c] for c in q2)
+    return ((board * 6 + _rank(q1)) * 6 + _rank(q2)) * 2 + (mover - 1)
+
+# ==========================================
+#   SOLVER
+# ==========================================
+def _retrograde(start, successors):
+    """
+    Solves a game graph with possible cycles. successors(state) returns
+    [(child, winner)], winner set if the move wins on the spot.
+    Returns {state: (outcome, plies)}; unresolved states are draws.
+    """
+    children, parents = {}, {}
+    seen, todo = {start}, deque([start])
+    resolved, queue = {}, deque()
+    while todo:
+        state = todo.popleft()
+        moves = successors(state)
+        children[state] = len(moves)
+        for child, winner in moves:
+            parents.setdefault(child, []).append(state)
+            if child in seen: continue
+            seen.add(child)
+            if winner:
+                resolved[child] = (winner, 0)
+                queue.append(child)
+            else:
+                todo.append(child)
+    # States without moves and without a winner (full classic board) are draws
+
+    left = dict(children)
+    while queue:
+        child = queue.popleft()
+        winner, plies = resolved[child]
+        for state in parents.get(child, ()):
+            if state in resolved: continue
+            mover = state[-1]
+            if winner == mover:
+                resolved[state] = (mover, plies + 1)      # Take the win
+                queue.append(state)
+            else:
+                left[state] -= 1
+                if left[state] == 0:                      # Every move loses
+                    resolved[state] = (winner, plies + 1)
+                    queue.append(state)
+    return {s: resolved.get(s, (DRAW, 0)) for s in children}
+
+def _won(cells):
+    return any(all(c in cells for c in line) for line in WIN_LINES)
+
+def _classic_successors(state):
+    board, mover = state
+    out = []
+    for cell in range(9):
+        if board[cell]: continue
+        nb = board[:cell] + (mover,) + board[cell + 1:]
+        mine = {i for i in range(9) if nb[i] == mover}
+        out.append(((nb, 3 - mover), mover if _won(mine) else None))
+    return out
+
+def _three_successors(state):
+    q1, q2, mover = state
+    taken = set(q1) | set(q2)
+    out = []
+    for cell in range(9):
+        if cell in taken: continue
+        q = (q1 if mover == 1 else q2)
+        q = (q[1:] if len(q) == 3 else q) + (cell,)
+        child = (q, q2, 2) if mover == 1 else (q1, q, 1)
+        out.append((child, mover if len(q) == 3 and _won(q) else None))
+    return out
+
+def _pack(outcome, plies):
+    return outcome | min(plies, 63) << 2
+
+def build_tables():
+    """Solves both rule sets. Takes a few seconds, see load_tables()."""
+    classic = bytearray(BOARDS)
+    for (board, mover), value in _retrograde(((0,) * 9, 1), _classic_successors).items():
+        classic[board_index(board)] = _pack(*value)
+    three = bytearray(BOARDS * 72)
+    for (q1, q2, mover), value in _retrograde(((), (), 1), _three_successors).items():
+        three[three_index(q1, q2, mover)] = _pack(*value)
+    return {"classic": classic, "three": three}
+
+# ==========================================
+#   TABLE CACHE
+# ==========================================
+_tables = None
+_loading = False
+
+def load_tables(path=TTT_TABLE_FILE, background=True):
+    """
+    Loads the solved tables from `path`, or solves them (in a background
+    thread by default) and writes the file. Until then lookups return
+    outcome None; win lines and threats work right away.
+    """
+    global _tables, _loading
+    if _tables is not None or _loading: return
+    try:
+        with open(path, 'rb') as f:
+            blob = zlib.decompress(f.read())
+        if len(blob) == BOARDS * 73:
+            _tables = {"classic": blob[:BOARDS], "three": blob[BOARDS:]}
+            return
+    except (OSError, zlib.error):
+        pass
+
+    def solve():
+        global _tables, _loading
+        tables = build_tables()
+        try:
+            # Write-then-rename: parallel renderers may solve at the same time
+            tmp = f"{path}.{os.getpid()}"
+            with open(tmp, 'wb') as f:
+                f.write(zlib.compress(bytes(tables["classic"] + tables["three"]), 9))
+            os.replace(tmp, path)
+        except OSError as e:
+            log.warning(f"Failed to cache TTT table: {e}")
+        _tables, _loading = tables, False
+
+    _loading = True
+    if background: threading.Thread(target=solve, daemon=True).start()
+    else: solve()
+
+def ready():
+    return _tables is not None
+
+# ==========================================
+#   LIVE ANALYSIS
+# ==========================================
+class TTTAnalyzer:
+    """
+    Follows one game packet by packet and answers with table lookups only.
+    Tracks the order of each player's pieces (needed for "three" rules)
+    from board changes; if a player ever has more than 3 pieces the game
+    is classic after all and the analyzer switches.
+    """
+    def __init__(self, rules=TTT_RULES):
+        if rules not in RULES:
+            raise ValueError(f"Unknown TTT rules '{rules}'. Use {', '.join(RULES)}")
+        self.default_rules = rules
+        self.reset()
+
+    def reset(self):
+        self.rules = self.default_rules
+        self.queues = ([], [])
+        self.guessed = (set(), set())   # Pieces whose order we didn't see (missed packets)
+        self.board = None
+
+    def observe(self, board):
+        """Feeds the board of a TTT packet (protocol values)."""
+        board = tuple(int(v) for v in board)
+        if board == self.board: return
+        if not any(board) or self.board is None:
+            self.reset()
+        for p in (1, 2):
+            cells = {i for i in range(9) if board[i] == p}
+            queue = self.queues[p - 1]
+            queue[:] = [c for c in queue if c in cells]
+            guessed = self.guessed[p - 1]
+            guessed &= cells
+            new = sorted(cells.difference(queue))
+            if len(new) > 1: guessed.update(new)
+            queue.extend(new)
+            if len(queue) > 3: self.rules = "classic"
+        self.board = board
+
+    def analyze(self, board, mover):
+        """O(1) analysis of the current position (after observe())."""
+        idx = board_index(board)
+        line = _LINE_OF[idx]
+        line = WIN_LINES[line] if line != NO_LINE else None
+        threats = [_THREATS[0][idx], _THREATS[1][idx]]
+        value = 0
+        if self.rules == "three":
+            for p in (0, 1):
+                q = self.queues[p]
+                if len(q) == 3:
+                    # The oldest piece goes when the 4th is placed: only the
+                    # two newest can still make a line
+                    third = _THIRD[q[1] * 9 + q[2]]
+                    threats[p] = 1 << third if third != NO_LINE and not int(board[third]) else 0
+            if _tables and not any(self.guessed):
+                value = _tables["three"][three_index(self.queues[0], self.queues[1], int(mover))]
+        elif _tables:
+            value = _tables["classic"][idx]
+        outcome = value & 3 or None
+        return Analysis(line, tuple(threats), outcome, value >> 2)
@@ -440,11 +440,13 @@ screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("PIC-18F CONTROL SYSTEM // CLASSIFIED")
 clock = pygame.time.Clock()
 
+# Bundled font: no system font scan at startup, same metrics everywhere
+FONT_FILE = 'assets/fonts/SourceCodePro-Bold.ttf'
 try:
-    FONT_MAIN = pygame.font.SysFont("consolas", 28, bold=True)
-    FONT_BIG = pygame.font.SysFont("consolas", 60, bold=True)
-    FONT_HUGE = pygame.font.SysFont("consolas", 100, bold=True)
-    FONT_SMALL = pygame.font.SysFont("consolas", 18)
+    FONT_MAIN = pygame.font.Font(FONT_FILE, 28)
+    FONT_BIG = pygame.font.Font(FONT_FILE, 60)
+    FONT_HUGE = pygame.font.Font(FONT_FILE, 100)
+    FONT_SMALL = pygame.font.Font(FONT_FILE, 18)
 except:
     FONT_MAIN = pygame.font.SysFont(None, 28)
     FONT_BIG = pygame.font.SysFont(None, 60)